@@ -58,6 +58,8 @@ class Settings(BaseSettings):
     llm_temperature: float = 0.1
     llm_max_tokens: int = 1000
     llm_timeout: int = 30
+    # Max in-flight LLM calls per PA endpoint; sized to upstream capacity
+    pa_max_concurrency: int = 16
     
     # Confidence Thresholds
     eligibility_confidence_threshold: float = 0.8
@@ -1,9 +1,30 @@
 """
 Base LLM client interface for multiple provider support
 """
+import json
+import re
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, List
 
+# orjson is a C-extension parser, 2-5x faster than stdlib json on the ~1 KB
+# JSON payloads LLMs return; fall back to stdlib if it is not installed.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so existing
+# exception handling works unchanged.
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# Matches the outermost JSON object when the LLM adds leading/trailing prose
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.S)
+
+
+def extract_json_object(content: str) -> Optional[str]:
+    """Extract the outermost JSON object from LLM output, if any"""
+    match = _JSON_OBJECT_RE.search(content)
+    return match.group(0) if match else None
+
 
 class BaseLLMClient(ABC):
     """Abstract base class for LLM providers"""
@@ -34,3 +55,24 @@ class BaseLLMClient(ABC):
     def parse_json_response(self, content: str) -> Dict[str, Any]:
         """Parse JSON response from LLM"""
         pass
+
+    def call_streaming(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        on_delta=None,
+    ) -> Dict[str, Any]:
+        """
+        Call LLM API, consuming the response incrementally
+
+        `on_delta` is invoked with each content chunk as it arrives so
+        callers can overlap parsing with network reception. Providers
+        without streaming support fall back to a blocking call.
+
+        Returns the same response dict shape as `call`.
+        """
+        result = self.call(messages=messages, temperature=temperature, max_tokens=max_tokens)
+        if on_delta and result.get("content"):
+            on_delta(result["content"])
+        return result
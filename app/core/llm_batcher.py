@@ -0,0 +1,110 @@
+"""
+Micro-batching queue for LLM calls
+
+Coalesces concurrent narrative generations within a small time window and
+dispatches them as one batch. The OpenAI-compatible providers used here have
+no multi-prompt completion endpoint, so a batch is dispatched as concurrent
+requests over a shared pool — callers still benefit from coalesced wake-ups
+and bounded concurrency under load.
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import monotonic
+from typing import Dict, Any, List, Optional
+
+from app.core.llm_client import get_llm_client
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBatcher:
+    """Batches concurrent LLM calls within a short collection window"""
+
+    def __init__(
+        self,
+        llm_client=None,
+        batch_size: int = 32,
+        window_ms: float = 20.0,
+        max_workers: int = 16,
+    ):
+        """
+        Args:
+            llm_client: LLM client to dispatch through (defaults to configured client)
+            batch_size: Maximum requests coalesced into one batch
+            window_ms: Collection window before a partial batch is dispatched
+            max_workers: Concurrent in-flight requests per batch dispatch
+        """
+        self._llm_client = llm_client
+        self.batch_size = batch_size
+        self.window_seconds = window_ms / 1000.0
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._dispatch_pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="llm-batch"
+        )
+        self._worker = threading.Thread(
+            target=self._worker_loop, name="llm-batcher", daemon=True
+        )
+        self._worker.start()
+
+    def submit(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Queue an LLM call and block until its result is available"""
+        future: Future = Future()
+        self._queue.put((future, messages, temperature, max_tokens))
+        return future.result()
+
+    def _worker_loop(self):
+        """Collect requests into batches and dispatch them concurrently"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = monotonic() + self.window_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            if len(batch) > 1:
+                logger.debug("Dispatching LLM micro-batch of %d requests", len(batch))
+
+            for item in batch:
+                self._dispatch_pool.submit(self._dispatch_one, item)
+
+    def _dispatch_one(self, item):
+        """Execute a single batched request and resolve its future"""
+        future, messages, temperature, max_tokens = item
+        try:
+            if self._llm_client is None:
+                self._llm_client = get_llm_client()
+            result = self._llm_client.call(
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            future.set_result(result)
+        except Exception as e:
+            future.set_exception(e)
+
+
+# Global batcher instance
+_llm_batcher: Optional[LLMBatcher] = None
+_llm_batcher_lock = threading.Lock()
+
+
+def get_llm_batcher() -> LLMBatcher:
+    """Get or create the global LLM micro-batcher"""
+    global _llm_batcher
+    if _llm_batcher is None:
+        with _llm_batcher_lock:
+            if _llm_batcher is None:
+                _llm_batcher = LLMBatcher()
+    return _llm_batcher
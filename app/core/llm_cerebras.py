@@ -8,7 +8,7 @@ import json
 from typing import Dict, Any, Optional, List
 from tenacity import retry, stop_after_attempt, wait_exponential
 
-from app.core.llm_base import BaseLLMClient
+from app.core.llm_base import BaseLLMClient, extract_json_object, json_loads
 from app.core.config import settings
 from app.core.monitoring import LLMCallMonitor, get_langfuse_client
 
@@ -173,6 +173,85 @@ class CerebrasLLMClient(BaseLLMClient):
             logger.error(f"Cerebras API error: {e}")
             raise
     
+    def call_streaming(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        on_delta=None,
+    ) -> Dict[str, Any]:
+        """
+        Call Cerebras API with streaming, invoking `on_delta` per content chunk
+
+        Overlaps network reception with caller-side parsing; the assembled
+        response dict matches the shape returned by `call`.
+        """
+        if not self.api_key:
+            raise ValueError(
+                "Cerebras API key not configured. Set CEREBRAS_API_KEY environment variable."
+            )
+
+        if temperature is None:
+            temperature = settings.llm_temperature
+        if max_tokens is None:
+            max_tokens = settings.llm_max_tokens
+
+        start_time = time.time()
+
+        import httpx
+        http_client = httpx.Client(proxy=None)
+
+        client = self.openai_lib.OpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_client=http_client
+        )
+
+        stream = client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=float(temperature),
+            max_tokens=int(max_tokens),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+
+        content_parts = []
+        usage = None
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                delta = chunk.choices[0].delta.content
+                content_parts.append(delta)
+                if on_delta:
+                    on_delta(delta)
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+
+        latency = time.time() - start_time
+
+        input_tokens = usage.prompt_tokens if usage else 0
+        output_tokens = usage.completion_tokens if usage else 0
+
+        result = {
+            "content": "".join(content_parts),
+            "model": self.model,
+            "latency_ms": round(latency * 1000, 2),
+            "tokens_used": {
+                "input": input_tokens,
+                "output": output_tokens,
+                "total": usage.total_tokens if usage else 0,
+            },
+            "cost": self._calculate_cost(input_tokens, output_tokens),
+        }
+
+        logger.info(
+            f"Cerebras LLM streaming call successful: {self.model} | "
+            f"Tokens: {result['tokens_used']['total']} | "
+            f"Latency: {result['latency_ms']}ms"
+        )
+
+        return result
+
     def _calculate_cost(self, input_tokens: int, output_tokens: int) -> float:
         """Calculate estimated cost for tokens"""
         pricing = self.PRICING.get(self.model)
@@ -207,8 +286,16 @@ class CerebrasLLMClient(BaseLLMClient):
                 content = content.split("```json")[1].split("```")[0]
             elif "```" in content:
                 content = content.split("```")[1].split("```")[0]
-            
-            return json.loads(content.strip())
+
+            return json_loads(content.strip())
         except json.JSONDecodeError as e:
+            # Fall back to extracting the outermost JSON object from
+            # responses with leading/trailing prose
+            extracted = extract_json_object(content)
+            if extracted:
+                try:
+                    return json_loads(extracted)
+                except json.JSONDecodeError:
+                    pass
             logger.error(f"Failed to parse JSON response: {e}")
             raise ValueError(f"Invalid JSON in LLM response: {content}") from e
@@ -8,7 +8,7 @@ import json
 from typing import Dict, Any, Optional, List
 from tenacity import retry, stop_after_attempt, wait_exponential
 
-from app.core.llm_base import BaseLLMClient
+from app.core.llm_base import BaseLLMClient, extract_json_object, json_loads
 from app.core.config import settings
 from app.core.monitoring import get_langfuse_client
 
@@ -210,7 +210,15 @@ class OpenRouterLLMClient(BaseLLMClient):
             elif "```" in content:
                 content = content.split("```")[1].split("```")[0]
             
-            return json.loads(content.strip())
+            return json_loads(content.strip())
         except json.JSONDecodeError as e:
+            # Fall back to extracting the outermost JSON object from
+            # responses with leading/trailing prose
+            extracted = extract_json_object(content)
+            if extracted:
+                try:
+                    return json_loads(extracted)
+                except json.JSONDecodeError:
+                    pass
             logger.error(f"Failed to parse JSON response: {e}")
             raise ValueError(f"Invalid JSON in LLM response: {content}") from e
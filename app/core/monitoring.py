@@ -3,8 +3,9 @@ Monitoring & Observability Module
 Integrates LogFire for validation tracking and Langfuse for LLM call monitoring
 """
 import logging
+import queue
+import threading
 import time
-import json
 from typing import Dict, Any, Optional, List, Callable
 from functools import wraps
 from datetime import datetime
@@ -12,6 +13,12 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Validation events are captured on the hot path (every model
+# validation) but shipped from a background thread; the queue bounds
+# memory and overflow drops rather than blocks
+_VALIDATION_QUEUE_MAX = 10_000
+_VALIDATION_DRAIN_BATCH = 100
+
 # Initialize LogFire if API key is available
 logfire = None
 langfuse_client = None
@@ -50,8 +57,17 @@ except Exception as e:
 
 
 class ValidationEventLogger:
-    """Logs validation events to LogFire"""
-    
+    """Logs validation events to LogFire
+
+    Events are enqueued on the caller's thread and shipped in batches by
+    a daemon consumer, so a validation never blocks on the LogFire SDK.
+    """
+
+    _queue: "queue.Queue" = queue.Queue(maxsize=_VALIDATION_QUEUE_MAX)
+    _drops = 0
+    _consumer: Optional[threading.Thread] = None
+    _consumer_lock = threading.Lock()
+
     @staticmethod
     def log_validation_event(
         event_type: str,
@@ -61,10 +77,10 @@ class ValidationEventLogger:
         details: Optional[Dict[str, Any]] = None,
         error_message: Optional[str] = None
     ):
-        """Log validation event to LogFire"""
+        """Queue a validation event for background shipping to LogFire"""
         if not logfire:
             return
-        
+
         event_data = {
             "event_type": event_type,
             "model": model_name,
@@ -72,20 +88,58 @@ class ValidationEventLogger:
             "status": status,
             "timestamp": datetime.now().isoformat(),
         }
-        
+
         if details:
             event_data["details"] = details
-        
+
         if error_message:
             event_data["error"] = error_message
-        
+
+        ValidationEventLogger._ensure_consumer()
         try:
-            logfire.info(
-                f"validation_{status}",
-                **event_data
-            )
-        except Exception as e:
-            logger.error(f"Failed to log validation event: {e}")
+            ValidationEventLogger._queue.put_nowait((status, event_data))
+        except queue.Full:
+            # Bounded overhead beats backpressure on the validation path
+            ValidationEventLogger._drops += 1
+            if ValidationEventLogger._drops % 1000 == 1:
+                logger.warning(
+                    f"Validation event queue full; "
+                    f"{ValidationEventLogger._drops} events dropped so far"
+                )
+
+    @staticmethod
+    def _ensure_consumer():
+        """Start the drain thread on first use (survives it dying, too)"""
+        consumer = ValidationEventLogger._consumer
+        if consumer is not None and consumer.is_alive():
+            return
+        with ValidationEventLogger._consumer_lock:
+            consumer = ValidationEventLogger._consumer
+            if consumer is None or not consumer.is_alive():
+                consumer = threading.Thread(
+                    target=ValidationEventLogger._drain,
+                    name="validation-event-drain",
+                    daemon=True,
+                )
+                ValidationEventLogger._consumer = consumer
+                consumer.start()
+
+    @staticmethod
+    def _drain():
+        """Ship queued events, batching whatever has accumulated"""
+        events = ValidationEventLogger._queue
+        while True:
+            batch = [events.get()]
+            while len(batch) < _VALIDATION_DRAIN_BATCH:
+                try:
+                    batch.append(events.get_nowait())
+                except queue.Empty:
+                    break
+            for status, event_data in batch:
+                try:
+                    logfire.info(f"validation_{status}", **event_data)
+                except Exception as e:
+                    logger.error(f"Failed to log validation event: {e}")
 
 
 class LLMCallMonitor:
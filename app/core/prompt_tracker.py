@@ -3,19 +3,138 @@ Prompt Tracking and Tuning Utilities
 Monitors prompt performance and integrates with Langfuse for optimization
 """
 import logging
+import os
+import threading
+import time
+from collections import deque
 from typing import Dict, Any, Optional
 from datetime import datetime
+
+import numpy as np
+
 from app.core.monitoring import LLMCallMonitor, PromptTuningTracker, get_langfuse_client
 
 logger = logging.getLogger(__name__)
 
+# Per-prompt ring buffer size for recent-execution sampling; aggregate stats
+# come from the numeric columns, so this only bounds memory
+_MAX_EXECUTIONS_PER_PROMPT = 1000
+
+
+# Log-spaced latency bin edges, 1ms to 60s; log spacing gives roughly
+# constant relative error on the percentile estimates across the range
+_LATENCY_BIN_EDGES = np.logspace(0, np.log10(60_000), 64)
+
+# Raw samples kept per prompt purely for debugging/inspection; the stats
+# come from the histogram and running sums, so this never grows
+_RAW_SAMPLE_BUFFER = 128
+
+
+class _PromptMetricColumns:
+    """Per-prompt fixed-size aggregates backing the stats reductions
+
+    Latencies land in a 64-bin log-spaced histogram (O(1) insert) with
+    exact running sums alongside, so memory stays constant regardless of
+    traffic while mean/min/max/totals remain exact; only the percentiles
+    are approximate, within one bin's width.
+    """
+
+    __slots__ = (
+        "latency_hist", "latency_sum", "latency_min", "latency_max",
+        "token_sum", "cost_sum", "count", "recent_latencies",
+    )
+
+    def __init__(self):
+        self.latency_hist = np.zeros(len(_LATENCY_BIN_EDGES) + 1, dtype=np.uint64)
+        self.latency_sum = 0.0
+        self.latency_min = float("inf")
+        self.latency_max = float("-inf")
+        self.token_sum = 0.0
+        self.cost_sum = 0.0
+        self.count = 0
+        self.recent_latencies = deque(maxlen=_RAW_SAMPLE_BUFFER)
+
+    def append(self, latency_ms: float, tokens: float, cost: float):
+        """Fold one execution into the histogram and running sums"""
+        self.latency_hist[np.searchsorted(_LATENCY_BIN_EDGES, latency_ms)] += 1
+        self.latency_sum += latency_ms
+        if latency_ms < self.latency_min:
+            self.latency_min = latency_ms
+        if latency_ms > self.latency_max:
+            self.latency_max = latency_ms
+        self.token_sum += tokens
+        self.cost_sum += cost
+        self.count += 1
+        self.recent_latencies.append(latency_ms)
+
+    def extend(self, latencies: np.ndarray, tokens: np.ndarray, costs: np.ndarray):
+        """Fold arrays of executions in one vectorized pass
+
+        Bin indices and sums come from NumPy reductions over the whole
+        batch instead of one append per event.
+        """
+        bins = np.searchsorted(_LATENCY_BIN_EDGES, latencies)
+        self.latency_hist += np.bincount(
+            bins, minlength=len(self.latency_hist)).astype(np.uint64)
+        self.latency_sum += float(latencies.sum())
+        self.latency_min = min(self.latency_min, float(latencies.min()))
+        self.latency_max = max(self.latency_max, float(latencies.max()))
+        self.token_sum += float(tokens.sum())
+        self.cost_sum += float(costs.sum())
+        self.count += len(latencies)
+        self.recent_latencies.extend(latencies[-_RAW_SAMPLE_BUFFER:].tolist())
+
+    def merge(self, other: "_PromptMetricColumns"):
+        """Fold another shard's aggregates into this one
+
+        Histograms add element-wise and the sums/extrema combine exactly,
+        which is what lets each writer thread keep its own copy.
+        """
+        self.latency_hist += other.latency_hist
+        self.latency_sum += other.latency_sum
+        self.latency_min = min(self.latency_min, other.latency_min)
+        self.latency_max = max(self.latency_max, other.latency_max)
+        self.token_sum += other.token_sum
+        self.cost_sum += other.cost_sum
+        self.count += other.count
+
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th percentile from the bin counts
+
+        Walks the cumulative counts to the bin holding the q-th sample
+        and reports that bin's upper edge, clamped to the observed
+        min/max so small populations don't overshoot.
+        """
+        rank = q / 100.0 * self.count
+        bin_idx = int(np.searchsorted(np.cumsum(self.latency_hist), rank))
+        edge = _LATENCY_BIN_EDGES[min(bin_idx, len(_LATENCY_BIN_EDGES) - 1)]
+        return float(min(max(edge, self.latency_min), self.latency_max))
+
+
+class _TrackerShard:
+    """One writer shard: a metrics dict behind its own lock
+
+    Threads hash onto shards by ident, so concurrent writers rarely
+    share a lock and the write path never serializes process-wide.
+    """
+
+    __slots__ = ("metrics", "lock")
+
+    def __init__(self):
+        self.metrics: Dict[str, _PromptMetricColumns] = {}
+        self.lock = threading.Lock()
+
 
 class PromptPerformanceTracker:
     """Tracks and analyzes prompt performance metrics"""
-    
+
     def __init__(self):
         """Initialize prompt tracker"""
         self.prompts = {}
+        # Metric columns are sharded per writer thread and merged only
+        # when the stats endpoints read, so concurrent request threads
+        # don't contend on one lock in track_prompt_execution
+        self._shards = [_TrackerShard() for _ in range(os.cpu_count() or 4)]
     
     def track_prompt_execution(
         self,
@@ -48,10 +167,25 @@ class PromptPerformanceTracker:
                 "metrics": metrics,
             }
             
-            # Store locally
+            # Store locally; recreating the buffer (e.g. after prompts.clear())
+            # also resets the metric columns so the two never drift
             if prompt_name not in self.prompts:
-                self.prompts[prompt_name] = []
+                self.prompts[prompt_name] = deque(maxlen=_MAX_EXECUTIONS_PER_PROMPT)
+                for shard in self._shards:
+                    with shard.lock:
+                        shard.metrics.pop(prompt_name, None)
             self.prompts[prompt_name].append(execution_log)
+
+            shard = self._shards[threading.get_ident() % len(self._shards)]
+            with shard.lock:
+                columns = shard.metrics.get(prompt_name)
+                if columns is None:
+                    columns = shard.metrics[prompt_name] = _PromptMetricColumns()
+                columns.append(
+                    metrics.get("latency_ms", 0),
+                    metrics.get("tokens_used", {}).get("total", 0),
+                    metrics.get("cost", 0),
+                )
             
             # Track with Langfuse
             PromptTuningTracker.track_prompt_variant(
@@ -70,32 +204,66 @@ class PromptPerformanceTracker:
         except Exception as e:
             logger.error(f"Failed to track prompt execution: {e}")
     
+    def bulk_load(
+        self,
+        prompt_name: str,
+        latencies: np.ndarray,
+        tokens: np.ndarray,
+        costs: np.ndarray,
+    ):
+        """Load a batch of executions straight into the metric columns
+
+        Batch-ingest fast path: no per-event log dict and no external
+        tracking call, just one vectorized fold into the calling
+        thread's shard. The per-event path remains track_prompt_execution.
+        """
+        if prompt_name not in self.prompts:
+            self.prompts[prompt_name] = deque(maxlen=_MAX_EXECUTIONS_PER_PROMPT)
+            for shard in self._shards:
+                with shard.lock:
+                    shard.metrics.pop(prompt_name, None)
+
+        shard = self._shards[threading.get_ident() % len(self._shards)]
+        with shard.lock:
+            columns = shard.metrics.get(prompt_name)
+            if columns is None:
+                columns = shard.metrics[prompt_name] = _PromptMetricColumns()
+            columns.extend(
+                np.asarray(latencies, dtype=float),
+                np.asarray(tokens, dtype=float),
+                np.asarray(costs, dtype=float),
+            )
+
     def get_prompt_stats(self, prompt_name: str) -> Dict[str, Any]:
-        """Get statistics for a specific prompt"""
+        """Get statistics for a specific prompt, merged across shards"""
         if prompt_name not in self.prompts:
             return {}
-        
-        executions = self.prompts[prompt_name]
-        if not executions:
+
+        columns = _PromptMetricColumns()
+        for shard in self._shards:
+            with shard.lock:
+                shard_columns = shard.metrics.get(prompt_name)
+                if shard_columns is not None:
+                    columns.merge(shard_columns)
+        if not columns.count:
             return {}
-        
-        latencies = [e["metrics"].get("latency_ms", 0) for e in executions]
-        costs = [e["metrics"].get("cost", 0) for e in executions]
-        tokens = [e["metrics"].get("tokens_used", {}).get("total", 0) for e in executions]
-        
+
+        count = columns.count
         return {
-            "execution_count": len(executions),
-            "avg_latency_ms": sum(latencies) / len(latencies) if latencies else 0,
-            "min_latency_ms": min(latencies) if latencies else 0,
-            "max_latency_ms": max(latencies) if latencies else 0,
-            "total_cost": sum(costs),
-            "avg_cost": sum(costs) / len(costs) if costs else 0,
-            "total_tokens": sum(tokens),
-            "avg_tokens": sum(tokens) / len(tokens) if tokens else 0,
+            "execution_count": count,
+            "avg_latency_ms": columns.latency_sum / count,
+            "p50_latency_ms": columns.percentile(50),
+            "p95_latency_ms": columns.percentile(95),
+            "min_latency_ms": columns.latency_min,
+            "max_latency_ms": columns.latency_max,
+            "total_cost": columns.cost_sum,
+            "avg_cost": columns.cost_sum / count,
+            "total_tokens": columns.token_sum,
+            "avg_tokens": columns.token_sum / count,
         }
-    
+
     def get_all_stats(self) -> Dict[str, Dict[str, Any]]:
-        """Get statistics for all tracked prompts"""
+        """Get statistics for all tracked prompts; O(prompts), not O(events)"""
         return {
             prompt_name: self.get_prompt_stats(prompt_name)
             for prompt_name in self.prompts.keys()
@@ -131,8 +299,6 @@ class PromptVariantTester:
             Comparison results with metrics
         """
         try:
-            import time
-            
             # Test Variant A
             start_a = time.time()
             messages_a = [
@@ -11,11 +11,26 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Pool sizing/behavior tuned for the per-request get_db_context pattern:
+# LIFO hands back the most recently released (warmest) connection, which
+# keeps the server-side catalog/plan caches hot; recycle guards against
+# idle connections being dropped by intermediaries. Only applied to the
+# queued pool - SQLite URLs (used in tests) take different pool classes.
+_POOL_KWARGS = {}
+if settings.database_url.startswith("postgresql"):
+    _POOL_KWARGS = {
+        "pool_size": 20,
+        "max_overflow": 30,
+        "pool_use_lifo": True,
+        "pool_recycle": 1800,
+    }
+
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,  # Verify connections before using
     echo=False,  # Set to True for SQL logging
+    **_POOL_KWARGS,
 )
 
 # Create SessionLocal class
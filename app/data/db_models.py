@@ -1,7 +1,7 @@
 """
 SQLAlchemy database models
 """
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, JSON, Text
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Index, JSON, Text
 from datetime import datetime
 from app.data.database import Base
 
@@ -9,7 +9,13 @@ from app.data.database import Base
 class InsurancePlan(Base):
     """Insurance plan coverage information"""
     __tablename__ = "insurance_plans"
-    
+
+    # Coverage checks always filter on (plan, drug) together; the composite
+    # index turns those lookups into an index search instead of a scan
+    __table_args__ = (
+        Index("ix_insurance_plan_drug", "plan", "drug", unique=True),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     plan = Column(String(100), nullable=False, index=True)
     drug = Column(String(100), nullable=False, index=True)
@@ -2,22 +2,221 @@
 Graph Database Manager using Neo4j for relationship-based RAG
 Handles patient networks, approval patterns, and similarity analysis
 """
-from neo4j import GraphDatabase, Session
+from neo4j import AsyncGraphDatabase, GraphDatabase, Session
 from neo4j.exceptions import ServiceUnavailable
 import logging
+from contextlib import contextmanager
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 from app.core.config import settings
+from app.modules._policy_cache import QueryCache
 
 logger = logging.getLogger(__name__)
 
 
+# Query text is parameterized ($...) and defined once, so Neo4j's
+# plan cache sees the identical string on every call
+FIND_SIMILAR_CYPHER = """
+MATCH (p:Patient {patient_id: $patient_id})-[s:SIMILAR_TO]->(similar:Patient)
+RETURN similar.patient_id as patient_id,
+       similar.name as name,
+       similar.age as age,
+       similar.hba1c as hba1c,
+       similar.bmi as bmi,
+       s.score as shared_diagnoses
+ORDER BY s.score DESC
+LIMIT $limit
+"""
+
+# On-the-fly fallback for graphs where the SIMILAR_TO projection has not
+# been materialized yet (e.g. ad-hoc test nodes); re-scans shared
+# diagnoses per call instead of following precomputed edges
+FIND_SIMILAR_SCAN_CYPHER = """
+MATCH (p:Patient {patient_id: $patient_id})-[:HAS_DIAGNOSIS]->(d:Diagnosis)
+MATCH (similar:Patient)-[:HAS_DIAGNOSIS]->(d)
+WHERE similar.patient_id <> p.patient_id
+  AND abs(similar.age - p.age) < 5
+  AND abs(similar.hba1c - p.hba1c) < 1.0
+  AND abs(similar.bmi - p.bmi) < 2.0
+WITH similar, COUNT(d) as shared_diagnoses
+ORDER BY shared_diagnoses DESC
+LIMIT $limit
+RETURN similar.patient_id as patient_id,
+       similar.name as name,
+       similar.age as age,
+       similar.hba1c as hba1c,
+       similar.bmi as bmi,
+       shared_diagnoses
+"""
+
+# One full pass writes the similarity projection; symmetric edges in
+# both directions so lookups never need an undirected match
+PRECOMPUTE_SIMILARITY_CYPHER = """
+MATCH (p:Patient)-[:HAS_DIAGNOSIS]->(d:Diagnosis)<-[:HAS_DIAGNOSIS]-(q:Patient)
+WHERE p.patient_id < q.patient_id
+  AND abs(p.age - q.age) < 5
+  AND abs(p.hba1c - q.hba1c) < 1.0
+  AND abs(p.bmi - q.bmi) < 2.0
+WITH p, q, COUNT(d) as shared_diagnoses
+MERGE (p)-[s:SIMILAR_TO]->(q)
+SET s.score = shared_diagnoses
+MERGE (q)-[t:SIMILAR_TO]->(p)
+SET t.score = shared_diagnoses
+"""
+
+TREATMENT_CHAIN_CYPHER = """
+MATCH (p:Patient {patient_id: $patient_id})-[r:TREATED_WITH]->(drug:Drug)
+RETURN drug.name as drug_name,
+       r.outcome as outcome,
+       r.date as date
+ORDER BY r.date DESC
+"""
+
+ELIGIBILITY_PATH_CYPHER = """
+MATCH (p:Patient {patient_id: $patient_id})
+       -[:ENROLLED_IN]->(plan:InsurancePlan)
+       -[covers:COVERS]->(drug:Drug {name: $drug_name})
+MATCH (p)-[:HAS_DIAGNOSIS]->(diagnosis:Diagnosis)
+RETURN plan.name as plan_name,
+       covers.pa_required as pa_required,
+       covers.criteria as criteria,
+       collect(diagnosis.name) as diagnoses
+LIMIT 1
+"""
+
+APPROVAL_STATS_CYPHER = """
+MATCH (p:Patient)-[:TREATED_WITH]->(drug:Drug {name: $drug_name})
+RETURN drug.name as drug_name,
+       COUNT(p) as patient_count,
+       COUNT(CASE WHEN p.approval_status = 'APPROVED' THEN 1 END) as approved_count
+LIMIT 1
+"""
+
+TREATMENT_PATTERNS_CYPHER = """
+MATCH (p:Patient)-[r1:TREATED_WITH {outcome: 'Inadequate response'}]->(drug1:Drug)
+MATCH (p)-[r2:TREATED_WITH {outcome: 'Partial response'}]->(drug2:Drug)
+WHERE drug1 <> drug2
+RETURN drug1.name as initial_drug,
+       drug2.name as follow_up_drug,
+       COUNT(p) as patient_count
+ORDER BY patient_count DESC
+LIMIT $limit
+"""
+
+
+# Write-path query text, likewise defined once (see the read constants
+# above) so neither Python nor the driver's statement cache sees a fresh
+# string per call
+CREATE_PATIENT_CYPHER = """
+MERGE (p:Patient {patient_id: $patient_id})
+SET p.name = $name,
+    p.age = $age,
+    p.gender = $gender,
+    p.hba1c = $hba1c,
+    p.bmi = $bmi,
+    p.insurance_plan = $insurance_plan,
+    p.updated_at = datetime()
+"""
+
+CREATE_DIAGNOSIS_CYPHER = """
+MERGE (d:Diagnosis {icd10: $icd10})
+SET d.name = $name
+"""
+
+CREATE_DRUG_CYPHER = """
+MERGE (drug:Drug {name: $name})
+"""
+
+CREATE_PLAN_CYPHER = """
+MERGE (plan:InsurancePlan {name: $name})
+"""
+
+ADD_PATIENT_DIAGNOSIS_CYPHER = """
+MATCH (p:Patient {patient_id: $patient_id})
+MATCH (d:Diagnosis {icd10: $icd10})
+MERGE (p)-[:HAS_DIAGNOSIS]->(d)
+"""
+
+ADD_PATIENT_INSURANCE_CYPHER = """
+MATCH (p:Patient {patient_id: $patient_id})
+MATCH (plan:InsurancePlan {name: $plan_name})
+MERGE (p)-[:ENROLLED_IN]->(plan)
+"""
+
+ADD_PATIENT_TREATMENT_CYPHER = """
+MATCH (p:Patient {patient_id: $patient_id})
+MATCH (drug:Drug {name: $drug_name})
+MERGE (p)-[r:TREATED_WITH]->(drug)
+SET r.outcome = $outcome,
+    r.date = datetime()
+"""
+
+ADD_PLAN_COVERAGE_CYPHER = """
+MATCH (plan:InsurancePlan {name: $plan_name})
+MATCH (drug:Drug {name: $drug_name})
+MERGE (plan)-[r:COVERS]->(drug)
+SET r.pa_required = $pa_required,
+    r.criteria = $criteria
+"""
+
+PATIENT_NODES_BULK_CYPHER = """
+UNWIND $rows AS r
+MERGE (p:Patient {patient_id: r.patient_id})
+SET p.name = r.name,
+    p.age = r.age,
+    p.gender = r.gender,
+    p.hba1c = r.hba1c,
+    p.bmi = r.bmi,
+    p.insurance_plan = r.insurance_plan,
+    p.updated_at = datetime()
+"""
+
+DIAGNOSIS_NODES_BULK_CYPHER = """
+UNWIND $rows AS r
+MERGE (d:Diagnosis {icd10: r.icd10})
+SET d.name = r.name
+"""
+
+DRUG_NODES_BULK_CYPHER = """
+UNWIND $rows AS r
+MERGE (drug:Drug {name: r.name})
+"""
+
+PLAN_NODES_BULK_CYPHER = """
+UNWIND $rows AS r
+MERGE (plan:InsurancePlan {name: r.name})
+"""
+
+PATIENT_DIAGNOSES_BULK_CYPHER = """
+UNWIND $rows AS r
+MATCH (p:Patient {patient_id: r.patient_id})
+MATCH (d:Diagnosis {icd10: r.icd10})
+MERGE (p)-[:HAS_DIAGNOSIS]->(d)
+"""
+
+PATIENT_TREATMENTS_BULK_CYPHER = """
+UNWIND $rows AS r
+MATCH (p:Patient {patient_id: r.patient_id})
+MATCH (drug:Drug {name: r.drug_name})
+MERGE (p)-[rel:TREATED_WITH]->(drug)
+SET rel.outcome = r.outcome,
+    rel.date = datetime()
+"""
+
+
 class GraphDatabaseManager:
     """Manages Neo4j graph database for relationship-based queries"""
     
     def __init__(self):
         """Initialize Neo4j connection"""
+        # Similarity lookups repeat heavily for the same patient; the short
+        # TTL bounds staleness while the patient-write methods clear the
+        # cache outright (one patient's update can change another's matches)
+        self._similar_cache = QueryCache(max_size=2048, ttl_seconds=60.0)
+        self._aio_driver = None
+        self._parallel_runtime = None  # detected lazily on first read
+        self._prefixed_queries = {}  # read query -> runtime-prefixed text
         try:
             # Use cloud URI with SSL encryption
             self.driver = GraphDatabase.driver(
@@ -37,27 +236,56 @@ class GraphDatabaseManager:
         """Close database connection"""
         if self.driver:
             self.driver.close()
+
+    @property
+    def aio_driver(self):
+        """Lazily created async driver for concurrent query fan-out
+
+        Shares the sync driver's connection settings; None whenever the
+        sync connection check failed, so async callers degrade the same
+        way the sync ones do.
+        """
+        if self.driver is None:
+            return None
+        if self._aio_driver is None:
+            self._aio_driver = AsyncGraphDatabase.driver(
+                settings.neo4j_uri,
+                auth=(settings.neo4j_user, settings.neo4j_password),
+                database=settings.neo4j_database
+            )
+        return self._aio_driver
+
+    async def aclose(self):
+        """Close the async driver, if one was created"""
+        if self._aio_driver is not None:
+            await self._aio_driver.close()
+            self._aio_driver = None
+
+    @contextmanager
+    def _session_scope(self, session: Optional[Session] = None):
+        """Yield the caller's session, or open and close a fresh one
+
+        Every read/write method below takes an optional session kwarg;
+        callers issuing many calls (tests, ingest) pass one shared
+        session so the Bolt handshake is paid once instead of per call.
+        """
+        if session is not None:
+            yield session
+        else:
+            with self.driver.session() as owned:
+                yield owned
     
     # ==================== Node Creation ====================
     
-    def create_patient_node(self, patient_data: Dict[str, Any]) -> bool:
+    def create_patient_node(self, patient_data: Dict[str, Any],
+                            session: Optional[Session] = None) -> bool:
         """Create or update patient node"""
         if not self.driver:
             return False
         
         try:
-            with self.driver.session() as session:
-                session.run("""
-                    MERGE (p:Patient {patient_id: $patient_id})
-                    SET p.name = $name,
-                        p.age = $age,
-                        p.gender = $gender,
-                        p.hba1c = $hba1c,
-                        p.bmi = $bmi,
-                        p.insurance_plan = $insurance_plan,
-                        p.updated_at = datetime()
-                    RETURN p
-                """, {
+            with self._session_scope(session) as session:
+                session.run(CREATE_PATIENT_CYPHER, {
                     "patient_id": patient_data["patient_id"],
                     "name": patient_data["name"],
                     "age": patient_data["age"],
@@ -67,55 +295,49 @@ class GraphDatabaseManager:
                     "insurance_plan": patient_data["insurance_plan"]
                 })
             logger.debug(f"Created patient node: {patient_data['patient_id']}")
+            self._similar_cache.invalidate()
             return True
         except Exception as e:
             logger.error(f"Error creating patient node: {e}")
             return False
     
-    def create_diagnosis_node(self, diagnosis: str, icd10: str) -> bool:
+    def create_diagnosis_node(self, diagnosis: str, icd10: str,
+                              session: Optional[Session] = None) -> bool:
         """Create or update diagnosis node"""
         if not self.driver:
             return False
         
         try:
-            with self.driver.session() as session:
-                session.run("""
-                    MERGE (d:Diagnosis {icd10: $icd10})
-                    SET d.name = $name
-                    RETURN d
-                """, {"icd10": icd10, "name": diagnosis})
+            with self._session_scope(session) as session:
+                session.run(CREATE_DIAGNOSIS_CYPHER, {"icd10": icd10, "name": diagnosis})
             return True
         except Exception as e:
             logger.error(f"Error creating diagnosis node: {e}")
             return False
     
-    def create_drug_node(self, drug_name: str) -> bool:
+    def create_drug_node(self, drug_name: str,
+                         session: Optional[Session] = None) -> bool:
         """Create or update drug node"""
         if not self.driver:
             return False
         
         try:
-            with self.driver.session() as session:
-                session.run("""
-                    MERGE (drug:Drug {name: $name})
-                    RETURN drug
-                """, {"name": drug_name})
+            with self._session_scope(session) as session:
+                session.run(CREATE_DRUG_CYPHER, {"name": drug_name})
             return True
         except Exception as e:
             logger.error(f"Error creating drug node: {e}")
             return False
     
-    def create_insurance_plan_node(self, plan_name: str) -> bool:
+    def create_insurance_plan_node(self, plan_name: str,
+                                   session: Optional[Session] = None) -> bool:
         """Create or update insurance plan node"""
         if not self.driver:
             return False
         
         try:
-            with self.driver.session() as session:
-                session.run("""
-                    MERGE (plan:InsurancePlan {name: $name})
-                    RETURN plan
-                """, {"name": plan_name})
+            with self._session_scope(session) as session:
+                session.run(CREATE_PLAN_CYPHER, {"name": plan_name})
             return True
         except Exception as e:
             logger.error(f"Error creating plan node: {e}")
@@ -123,54 +345,44 @@ class GraphDatabaseManager:
     
     # ==================== Relationship Creation ====================
     
-    def add_patient_diagnosis(self, patient_id: str, icd10: str) -> bool:
+    def add_patient_diagnosis(self, patient_id: str, icd10: str,
+                              session: Optional[Session] = None) -> bool:
         """Link patient to diagnosis"""
         if not self.driver:
             return False
         
         try:
-            with self.driver.session() as session:
-                session.run("""
-                    MATCH (p:Patient {patient_id: $patient_id})
-                    MATCH (d:Diagnosis {icd10: $icd10})
-                    MERGE (p)-[:HAS_DIAGNOSIS]->(d)
-                """, {"patient_id": patient_id, "icd10": icd10})
+            with self._session_scope(session) as session:
+                session.run(ADD_PATIENT_DIAGNOSIS_CYPHER, {"patient_id": patient_id, "icd10": icd10})
+            self._similar_cache.invalidate()
             return True
         except Exception as e:
             logger.error(f"Error linking patient to diagnosis: {e}")
             return False
     
-    def add_patient_insurance(self, patient_id: str, plan_name: str) -> bool:
+    def add_patient_insurance(self, patient_id: str, plan_name: str,
+                              session: Optional[Session] = None) -> bool:
         """Link patient to insurance plan"""
         if not self.driver:
             return False
         
         try:
-            with self.driver.session() as session:
-                session.run("""
-                    MATCH (p:Patient {patient_id: $patient_id})
-                    MATCH (plan:InsurancePlan {name: $plan_name})
-                    MERGE (p)-[:ENROLLED_IN]->(plan)
-                """, {"patient_id": patient_id, "plan_name": plan_name})
+            with self._session_scope(session) as session:
+                session.run(ADD_PATIENT_INSURANCE_CYPHER, {"patient_id": patient_id, "plan_name": plan_name})
             return True
         except Exception as e:
             logger.error(f"Error linking patient to plan: {e}")
             return False
     
-    def add_patient_treatment(self, patient_id: str, drug_name: str, outcome: str) -> bool:
+    def add_patient_treatment(self, patient_id: str, drug_name: str, outcome: str,
+                              session: Optional[Session] = None) -> bool:
         """Link patient to treatment drug"""
         if not self.driver:
             return False
         
         try:
-            with self.driver.session() as session:
-                session.run("""
-                    MATCH (p:Patient {patient_id: $patient_id})
-                    MATCH (drug:Drug {name: $drug_name})
-                    MERGE (p)-[r:TREATED_WITH]->(drug)
-                    SET r.outcome = $outcome,
-                        r.date = datetime()
-                """, {
+            with self._session_scope(session) as session:
+                session.run(ADD_PATIENT_TREATMENT_CYPHER, {
                     "patient_id": patient_id,
                     "drug_name": drug_name,
                     "outcome": outcome
@@ -181,20 +393,15 @@ class GraphDatabaseManager:
             return False
     
     def add_plan_drug_coverage(self, plan_name: str, drug_name: str, 
-                               pa_required: bool, criteria: str = None) -> bool:
+                               pa_required: bool, criteria: str = None,
+                               session: Optional[Session] = None) -> bool:
         """Link insurance plan to drug coverage"""
         if not self.driver:
             return False
         
         try:
-            with self.driver.session() as session:
-                session.run("""
-                    MATCH (plan:InsurancePlan {name: $plan_name})
-                    MATCH (drug:Drug {name: $drug_name})
-                    MERGE (plan)-[r:COVERS]->(drug)
-                    SET r.pa_required = $pa_required,
-                        r.criteria = $criteria
-                """, {
+            with self._session_scope(session) as session:
+                session.run(ADD_PLAN_COVERAGE_CYPHER, {
                     "plan_name": plan_name,
                     "drug_name": drug_name,
                     "pa_required": pa_required,
@@ -205,76 +412,239 @@ class GraphDatabaseManager:
             logger.error(f"Error linking plan to drug: {e}")
             return False
     
+    # ==================== Batch Creation ====================
+
+    # Batch variants of the creation methods above. Each collapses N
+    # driver round-trips into one UNWIND query, so callers with many
+    # records pay network latency once per entity type instead of per row.
+
+    def create_patient_nodes_batch(self, patients: List[Dict[str, Any]],
+                                   session: Optional[Session] = None) -> bool:
+        """Create or update many patient nodes in one round-trip"""
+        ok = self.run_bulk(PATIENT_NODES_BULK_CYPHER, [{
+            "patient_id": patient_data["patient_id"],
+            "name": patient_data["name"],
+            "age": patient_data["age"],
+            "gender": patient_data["gender"],
+            "hba1c": patient_data.get("labs", {}).get("HbA1c", 0),
+            "bmi": patient_data.get("labs", {}).get("BMI", 0),
+            "insurance_plan": patient_data["insurance_plan"]
+        } for patient_data in patients], session=session)
+        if ok:
+            self._similar_cache.invalidate()
+        return ok
+
+    def create_diagnosis_nodes_batch(self, diagnoses: List[Dict[str, str]],
+                                     session: Optional[Session] = None) -> bool:
+        """Create or update many diagnosis nodes ({name, icd10} dicts)"""
+        return self.run_bulk(DIAGNOSIS_NODES_BULK_CYPHER, diagnoses, session=session)
+
+    def create_drug_nodes_batch(self, drug_names: List[str],
+                                session: Optional[Session] = None) -> bool:
+        """Create or update many drug nodes in one round-trip"""
+        return self.run_bulk(DRUG_NODES_BULK_CYPHER, [{"name": name} for name in drug_names], session=session)
+
+    def create_insurance_plan_nodes_batch(self, plan_names: List[str],
+                                          session: Optional[Session] = None) -> bool:
+        """Create or update many insurance plan nodes in one round-trip"""
+        return self.run_bulk(PLAN_NODES_BULK_CYPHER, [{"name": name} for name in plan_names], session=session)
+
+    def add_patient_diagnoses_batch(self, pairs: List[Dict[str, str]],
+                                    session: Optional[Session] = None) -> bool:
+        """Link many patients to diagnoses ({patient_id, icd10} dicts)"""
+        ok = self.run_bulk(PATIENT_DIAGNOSES_BULK_CYPHER, pairs, session=session)
+        if ok:
+            self._similar_cache.invalidate()
+        return ok
+
+    def add_patient_treatments_batch(self, treatments: List[Dict[str, str]],
+                                     session: Optional[Session] = None) -> bool:
+        """Link many patients to treatments ({patient_id, drug_name, outcome})"""
+        return self.run_bulk(PATIENT_TREATMENTS_BULK_CYPHER, treatments, session=session)
+
+    def run_bulk(self, cypher: str, rows: List[Dict[str, Any]],
+                 session: Optional[Session] = None) -> bool:
+        """Run one UNWIND-style query over a batch of parameter rows
+
+        Ingest scripts pass all rows for an entity type in a single
+        round-trip instead of one driver call per row. The query receives
+        the batch as $rows.
+        """
+        if not self.driver or not rows:
+            return False
+
+        try:
+            with self._session_scope(session) as session:
+                session.run(cypher, {"rows": rows})
+            return True
+        except Exception as e:
+            logger.error(f"Error running bulk query: {e}")
+            return False
+
+    def execute_write(self, work) -> bool:
+        """Run `work(tx)` inside one session and one write transaction
+
+        Batch ingest wraps all of its UNWIND flushes in a single
+        transaction, so session setup and the commit fsync are paid once
+        instead of per flush. The driver may retry `work` on transient
+        errors, so it must be safe to call more than once.
+        """
+        if not self.driver:
+            return False
+
+        try:
+            with self.driver.session() as session:
+                session.execute_write(work)
+            return True
+        except Exception as e:
+            logger.error(f"Error executing write transaction: {e}")
+            return False
+
+    # Uniqueness constraints backing the MERGE keys; each implies an index
+    _CONSTRAINTS = [
+        "CREATE CONSTRAINT patient_id_unique IF NOT EXISTS "
+        "FOR (p:Patient) REQUIRE p.patient_id IS UNIQUE",
+        "CREATE CONSTRAINT diagnosis_icd10_unique IF NOT EXISTS "
+        "FOR (d:Diagnosis) REQUIRE d.icd10 IS UNIQUE",
+        "CREATE CONSTRAINT drug_name_unique IF NOT EXISTS "
+        "FOR (drug:Drug) REQUIRE drug.name IS UNIQUE",
+        "CREATE CONSTRAINT plan_name_unique IF NOT EXISTS "
+        "FOR (plan:InsurancePlan) REQUIRE plan.name IS UNIQUE",
+    ]
+
+    def ensure_constraints(self) -> bool:
+        """Create the uniqueness constraints for all MERGE key properties
+
+        Called after bulk ingest: the initial load runs index-free and
+        the constraints then back every later MERGE and lookup with an
+        index instead of a label scan. Schema operations cannot share a
+        transaction with data writes, so this runs on its own session.
+        """
+        if not self.driver:
+            return False
+
+        try:
+            with self.driver.session() as session:
+                for constraint in self._CONSTRAINTS:
+                    session.run(constraint)
+            return True
+        except Exception as e:
+            logger.error(f"Error creating constraints: {e}")
+            return False
+
+    def _parallel_prefix(self) -> str:
+        """Return the parallel-runtime prefix for read-only aggregations
+
+        Cypher executes single-threaded per query by default; Neo4j
+        5.13+ can fan the aggregation-heavy reads below across cores
+        with runtime=parallel. Detected once per manager and cached so
+        the prefixed query text stays stable for the plan cache.
+        """
+        if self._parallel_runtime is None:
+            try:
+                with self.driver.session() as session:
+                    record = session.run(
+                        "CALL dbms.components() YIELD versions "
+                        "RETURN versions[0] AS version"
+                    ).single()
+                    major, minor = (
+                        int(part) for part in record["version"].split(".")[:2]
+                    )
+                    self._parallel_runtime = (major, minor) >= (5, 13)
+            except Exception:
+                self._parallel_runtime = False
+        return "CYPHER runtime=parallel " if self._parallel_runtime else ""
+
+    def _read_query(self, cypher: str) -> str:
+        """Return the read query with the runtime prefix pre-applied
+
+        Memoized so repeated calls hand the driver the same string
+        object instead of concatenating a fresh one per call.
+        """
+        prefixed = self._prefixed_queries.get(cypher)
+        if prefixed is None:
+            prefixed = self._parallel_prefix() + cypher
+            self._prefixed_queries[cypher] = prefixed
+        return prefixed
+
     # ==================== Graph Queries ====================
     
-    def find_similar_patients(self, patient_id: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Find patients with similar diagnoses and clinical parameters"""
+    def find_similar_patients(self, patient_id: str, limit: int = 10,
+                              session: Optional[Session] = None) -> List[Dict[str, Any]]:
+        """Find patients with similar diagnoses and clinical parameters
+
+        Follows the SIMILAR_TO edges materialized at migration time
+        (see precompute_similarity), a 1-hop lookup instead of
+        re-counting shared diagnoses across the graph per call. Falls
+        back to the on-the-fly scan when no projection exists yet.
+        """
         if not self.driver:
             return []
-        
+
+        cache_key = (patient_id, limit)
+        cached = self._similar_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            with self.driver.session() as session:
-                results = session.run("""
-                    MATCH (p:Patient {patient_id: $patient_id})-[:HAS_DIAGNOSIS]->(d:Diagnosis)
-                    MATCH (similar:Patient)-[:HAS_DIAGNOSIS]->(d)
-                    WHERE similar.patient_id <> p.patient_id
-                      AND abs(similar.age - p.age) < 5
-                      AND abs(similar.hba1c - p.hba1c) < 1.0
-                      AND abs(similar.bmi - p.bmi) < 2.0
-                    WITH similar, COUNT(d) as shared_diagnoses
-                    ORDER BY shared_diagnoses DESC
-                    LIMIT $limit
-                    RETURN similar.patient_id as patient_id,
-                           similar.name as name,
-                           similar.age as age,
-                           similar.hba1c as hba1c,
-                           similar.bmi as bmi,
-                           shared_diagnoses
-                """, {"patient_id": patient_id, "limit": limit})
-                
-                return [dict(record) for record in results]
+            with self._session_scope(session) as session:
+                params = {"patient_id": patient_id, "limit": limit}
+                results = session.run(self._read_query(FIND_SIMILAR_CYPHER), params)
+                similar = results.data()
+                if not similar:
+                    results = session.run(
+                        self._read_query(FIND_SIMILAR_SCAN_CYPHER), params)
+                    similar = results.data()
+            self._similar_cache.put(cache_key, similar)
+            return similar
         except Exception as e:
             logger.error(f"Error finding similar patients: {e}")
             return []
+
+    def precompute_similarity(self) -> bool:
+        """Materialize pairwise patient similarity as SIMILAR_TO edges
+
+        Runs the shared-diagnosis count with the clinical thresholds once
+        over the whole graph and writes the score onto SIMILAR_TO edges,
+        so every later lookup is a direct edge traversal. Re-running
+        refreshes the scores (MERGE + SET). Called after migration.
+        """
+        if not self.driver:
+            return False
+
+        try:
+            with self.driver.session() as session:
+                session.run(PRECOMPUTE_SIMILARITY_CYPHER)
+            self._similar_cache.invalidate()
+            return True
+        except Exception as e:
+            logger.error(f"Error precomputing similarity: {e}")
+            return False
     
-    def get_patient_treatment_chain(self, patient_id: str) -> List[Dict[str, Any]]:
+    def get_patient_treatment_chain(self, patient_id: str,
+                                    session: Optional[Session] = None) -> List[Dict[str, Any]]:
         """Get patient's treatment history chain"""
         if not self.driver:
             return []
         
         try:
-            with self.driver.session() as session:
-                results = session.run("""
-                    MATCH (p:Patient {patient_id: $patient_id})-[r:TREATED_WITH]->(drug:Drug)
-                    RETURN drug.name as drug_name,
-                           r.outcome as outcome,
-                           r.date as date
-                    ORDER BY r.date DESC
-                """, {"patient_id": patient_id})
+            with self._session_scope(session) as session:
+                results = session.run(TREATMENT_CHAIN_CYPHER, {"patient_id": patient_id})
                 
-                return [dict(record) for record in results]
+                return results.data()
         except Exception as e:
             logger.error(f"Error getting treatment chain: {e}")
             return []
     
-    def find_drug_eligibility_path(self, patient_id: str, drug_name: str) -> Dict[str, Any]:
+    def find_drug_eligibility_path(self, patient_id: str, drug_name: str,
+                                   session: Optional[Session] = None) -> Dict[str, Any]:
         """Find if patient can access drug through insurance and clinical path"""
         if not self.driver:
             return {}
         
         try:
-            with self.driver.session() as session:
-                result = session.run("""
-                    MATCH (p:Patient {patient_id: $patient_id})
-                           -[:ENROLLED_IN]->(plan:InsurancePlan)
-                           -[covers:COVERS]->(drug:Drug {name: $drug_name})
-                    MATCH (p)-[:HAS_DIAGNOSIS]->(diagnosis:Diagnosis)
-                    RETURN plan.name as plan_name,
-                           covers.pa_required as pa_required,
-                           covers.criteria as criteria,
-                           collect(diagnosis.name) as diagnoses
-                    LIMIT 1
-                """, {"patient_id": patient_id, "drug_name": drug_name})
+            with self._session_scope(session) as session:
+                result = session.run(ELIGIBILITY_PATH_CYPHER, {"patient_id": patient_id, "drug_name": drug_name})
                 
                 record = result.single()
                 if record:
@@ -284,20 +654,15 @@ class GraphDatabaseManager:
             logger.error(f"Error finding drug eligibility: {e}")
             return {}
     
-    def get_approval_statistics(self, drug_name: str) -> Dict[str, Any]:
+    def get_approval_statistics(self, drug_name: str,
+                                session: Optional[Session] = None) -> Dict[str, Any]:
         """Get approval statistics for a drug"""
         if not self.driver:
             return {}
         
         try:
-            with self.driver.session() as session:
-                result = session.run("""
-                    MATCH (p:Patient)-[:TREATED_WITH]->(drug:Drug {name: $drug_name})
-                    RETURN drug.name as drug_name,
-                           COUNT(p) as patient_count,
-                           COUNT(CASE WHEN p.approval_status = 'APPROVED' THEN 1 END) as approved_count
-                    LIMIT 1
-                """, {"drug_name": drug_name})
+            with self._session_scope(session) as session:
+                result = session.run(APPROVAL_STATS_CYPHER, {"drug_name": drug_name})
                 
                 record = result.single()
                 if record:
@@ -307,29 +672,78 @@ class GraphDatabaseManager:
             logger.error(f"Error getting approval statistics: {e}")
             return {}
     
-    def find_treatment_patterns(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def find_treatment_patterns(self, limit: int = 10,
+                                session: Optional[Session] = None) -> List[Dict[str, Any]]:
         """Find common treatment sequences (failed → approved)"""
         if not self.driver:
             return []
         
         try:
-            with self.driver.session() as session:
-                results = session.run("""
-                    MATCH (p:Patient)-[r1:TREATED_WITH {outcome: 'Inadequate response'}]->(drug1:Drug)
-                    MATCH (p)-[r2:TREATED_WITH {outcome: 'Partial response'}]->(drug2:Drug)
-                    WHERE drug1 <> drug2
-                    RETURN drug1.name as initial_drug,
-                           drug2.name as follow_up_drug,
-                           COUNT(p) as patient_count
-                    ORDER BY patient_count DESC
-                    LIMIT $limit
-                """, {"limit": limit})
+            with self._session_scope(session) as session:
+                results = session.run(
+                    self._read_query(TREATMENT_PATTERNS_CYPHER),
+                    {"limit": limit})
                 
-                return [dict(record) for record in results]
+                return results.data()
         except Exception as e:
             logger.error(f"Error finding treatment patterns: {e}")
             return []
 
+    # ==================== Async Queries ====================
+
+    # Async counterparts of the read queries above, for callers that
+    # overlap independent round-trips with asyncio.gather - aggregate
+    # latency drops to the slowest query instead of the sum
+
+    async def afind_similar_patients(self, patient_id: str,
+                                     limit: int = 10) -> List[Dict[str, Any]]:
+        """Async variant of find_similar_patients"""
+        if not self.aio_driver:
+            return []
+
+        try:
+            async with self.aio_driver.session() as session:
+                results = await session.run(
+                    FIND_SIMILAR_CYPHER,
+                    {"patient_id": patient_id, "limit": limit})
+                return await results.data()
+        except Exception as e:
+            logger.error(f"Error finding similar patients: {e}")
+            return []
+
+    async def aget_patient_treatment_chain(self, patient_id: str) -> List[Dict[str, Any]]:
+        """Async variant of get_patient_treatment_chain"""
+        if not self.aio_driver:
+            return []
+
+        try:
+            async with self.aio_driver.session() as session:
+                results = await session.run(
+                    TREATMENT_CHAIN_CYPHER, {"patient_id": patient_id})
+                return await results.data()
+        except Exception as e:
+            logger.error(f"Error getting treatment chain: {e}")
+            return []
+
+    async def afind_drug_eligibility_path(self, patient_id: str,
+                                          drug_name: str) -> Dict[str, Any]:
+        """Async variant of find_drug_eligibility_path"""
+        if not self.aio_driver:
+            return {}
+
+        try:
+            async with self.aio_driver.session() as session:
+                result = await session.run(
+                    ELIGIBILITY_PATH_CYPHER,
+                    {"patient_id": patient_id, "drug_name": drug_name})
+                record = await result.single()
+                if record:
+                    return dict(record)
+                return {}
+        except Exception as e:
+            logger.error(f"Error finding drug eligibility: {e}")
+            return {}
+
 
 # ==================== Global Instance ====================
 
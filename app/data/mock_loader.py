@@ -1,13 +1,23 @@
 """
 Utility functions to load mock data from JSON files
 """
-import json
+import mmap
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any
 import logging
 
+import orjson
+
 from app.core.config import settings
 
+# ijson lets the ingest scripts stream large JSON arrays without holding
+# the parsed list plus the source text in memory at once; without it the
+# iterators fall back to a full json.load
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,11 +38,14 @@ def load_json_file(filename: str) -> List[Dict[str, Any]]:
         raise FileNotFoundError(f"Mock data file not found: {file_path}")
     
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        # Memory-map the file and hand the bytes straight to orjson's C
+        # parser; no Python-level read buffering or stdlib json overhead
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = orjson.loads(mm[:])
         logger.info(f"Loaded {len(data)} records from {filename}")
         return data
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"Error parsing JSON from {filename}: {e}")
         raise
     except Exception as e:
@@ -40,6 +53,51 @@ def load_json_file(filename: str) -> List[Dict[str, Any]]:
         raise
 
 
+def iter_json_file(filename: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield records from a JSON array file one at a time
+
+    Streams with ijson when available, so peak memory stays at one record
+    regardless of file size and callers can overlap parsing with their
+    own batched inserts. Falls back to load_json_file otherwise.
+
+    Args:
+        filename: Name of JSON file (e.g., 'patients.json')
+
+    Yields:
+        Dictionaries containing the data, in file order
+    """
+    if ijson is None:
+        yield from load_json_file(filename)
+        return
+
+    file_path = Path(settings.mock_data_dir) / filename
+
+    if not file_path.exists():
+        logger.error(f"File not found: {file_path}")
+        raise FileNotFoundError(f"Mock data file not found: {file_path}")
+
+    with open(file_path, 'rb') as f:
+        # use_float matches json.load semantics (floats, not Decimals),
+        # which the DB and Neo4j drivers expect
+        yield from ijson.items(f, "item", use_float=True)
+
+
+def iter_patients() -> Iterator[Dict[str, Any]]:
+    """Stream patient records from JSON"""
+    return iter_json_file("patients.json")
+
+
+def iter_plans() -> Iterator[Dict[str, Any]]:
+    """Stream insurance plan records from JSON"""
+    return iter_json_file("plans.json")
+
+
+def iter_forms() -> Iterator[Dict[str, Any]]:
+    """Stream PA form templates from JSON"""
+    return iter_json_file("forms.json")
+
+
 def load_patients() -> List[Dict[str, Any]]:
     """Load patient data from JSON"""
     return load_json_file("patients.json")
@@ -2,11 +2,28 @@
 Pydantic models for request/response validation
 Enhanced with LogFire validation tracking
 """
-from pydantic import BaseModel, Field, field_validator, model_validator
+import re
+
+from pydantic import BaseModel, Field, TypeAdapter, field_validator, model_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from app.core.monitoring import ValidationEventLogger
 
+# Validators run per request; compile their patterns and build their
+# membership sets once at import
+_ICD10_PATTERN = re.compile(r'^[A-Z]\d{2}(\.\d{1,2})?$')
+_EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+_VALID_STATES = frozenset([
+    'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
+    'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD',
+    'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ',
+    'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC',
+    'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY',
+])
+
+_VALID_GENDERS = frozenset(['M', 'F', 'Other', 'Prefer not to say'])
+
 
 # ==================== Common Models ====================
 
@@ -44,12 +61,7 @@ class Address(BaseModel):
     @classmethod
     def validate_state(cls, v):
         """Validate state code"""
-        valid_states = ['AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
-                       'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD',
-                       'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ',
-                       'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC',
-                       'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY']
-        if v.upper() not in valid_states:
+        if v.upper() not in _VALID_STATES:
             error_msg = f"Invalid state: {v}"
             ValidationEventLogger.log_validation_event(
                 event_type="validation",
@@ -79,9 +91,7 @@ class Diagnosis(BaseModel):
     def validate_icd10(cls, v):
         """Validate ICD-10 code format"""
         # Basic ICD-10 format: Letter followed by 2 digits, optionally dot and additional characters
-        import re
-        pattern = r'^[A-Z]\d{2}(\.\d{1,2})?$'
-        if not re.match(pattern, v):
+        if not _ICD10_PATTERN.match(v):
             error_msg = f"Invalid ICD-10 code format: {v}"
             ValidationEventLogger.log_validation_event(
                 event_type="validation",
@@ -241,8 +251,7 @@ class Patient(BaseModel):
     @classmethod
     def validate_gender(cls, v):
         """Validate gender field"""
-        valid_genders = ['M', 'F', 'Other', 'Prefer not to say']
-        if v not in valid_genders:
+        if v not in _VALID_GENDERS:
             error_msg = f"Invalid gender: {v}"
             ValidationEventLogger.log_validation_event(
                 event_type="validation",
@@ -265,9 +274,7 @@ class Patient(BaseModel):
     @classmethod
     def validate_email(cls, v):
         """Validate email format"""
-        import re
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(pattern, v):
+        if not _EMAIL_PATTERN.match(v):
             error_msg = f"Invalid email: {v}"
             ValidationEventLogger.log_validation_event(
                 event_type="validation",
@@ -285,6 +292,19 @@ class Patient(BaseModel):
         )
         return v
 
+    @classmethod
+    def validate_partial(cls, field: str, value: Any) -> Any:
+        """Validate a single sub-object without walking the whole Patient
+
+        Dispatches to the dedicated sub-model adapter (see the
+        _SUB_ADAPTERS table below), so an edit touching only the address
+        or labs re-validates just that subtree.
+        """
+        adapter = _SUB_ADAPTERS.get(field)
+        if adapter is None:
+            raise ValueError(f"No partial validator for field: {field}")
+        return adapter.validate_python(value)
+
     @model_validator(mode='after')
     def validate_diagnoses_not_empty(self):
         """Validate that patient has at least one diagnosis"""
@@ -308,6 +328,22 @@ class Patient(BaseModel):
         return self
 
 
+# Shared sub-model adapters: each compiles its core schema once, so
+# partial validations (edit forms, streaming ingest) skip the full
+# Patient tree walk
+ADDRESS_ADAPTER = TypeAdapter(Address)
+DIAGNOSIS_ADAPTER = TypeAdapter(Diagnosis)
+LAB_ADAPTER = TypeAdapter(LabResults)
+TREATMENT_ADAPTER = TypeAdapter(TreatmentHistory)
+
+_SUB_ADAPTERS = {
+    "address": ADDRESS_ADAPTER,
+    "diagnoses": TypeAdapter(List[Diagnosis]),
+    "labs": LAB_ADAPTER,
+    "treatment_history": TypeAdapter(List[TreatmentHistory]),
+}
+
+
 class PatientSummary(BaseModel):
     """Simplified patient summary"""
     patient_id: str
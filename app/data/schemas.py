@@ -0,0 +1,32 @@
+"""
+Lightweight transfer objects for workflow data
+
+Slotted dataclasses instead of per-request dict literals: cheaper attribute
+access on the hot orchestrator path and a fixed, documented field set.
+"""
+from dataclasses import asdict, dataclass
+from typing import Any, Dict
+
+
+@dataclass(frozen=True, slots=True)
+class PatientSnapshot:
+    """The patient fields the prescription workflow reads"""
+    patient_id: str
+    name: str
+    age: int
+    gender: str
+    diagnoses: Any
+    labs: Any
+    treatment_history: Any
+    insurance_plan: str
+    date_of_birth: Any = None
+    member_id: Any = None
+
+    @classmethod
+    def from_mapping(cls, mapping) -> "PatientSnapshot":
+        """Build a snapshot from a Row._mapping (or any dict of fields)"""
+        return cls(**mapping)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize a dict for callers that need keyed access"""
+        return asdict(self)
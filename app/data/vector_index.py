@@ -2,35 +2,109 @@
 Vector indexing using ChromaDB for semantic search of PA policies
 """
 import chromadb
+import orjson
+import re
+import numpy as np
+from chromadb.utils import embedding_functions
+from functools import lru_cache
 from pathlib import Path
 import logging
 import os
 from typing import List, Dict, Any
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the plain function works as-is
+    njit = None
+
 from app.core.config import settings
+from app.modules._policy_cache import QueryCache
 
 logger = logging.getLogger(__name__)
 
+# Texts per embedding call during batch ingest; amortizes tokenizer and
+# model overhead without building one giant tensor for large corpora
+_EMBED_BATCH_SIZE = 64
+
+# Chunk boundaries worth snapping to: line breaks and sentence ends
+_CHUNK_BREAK_RE = re.compile(r"\n|\. ")
+
+
+@lru_cache(maxsize=1)
+def _get_embedding_function():
+    """Return the process-wide embedding function
+
+    The default embedder loads a multi-hundred-MB ONNX model; caching it
+    here means every VectorIndexManager (and collection recreation)
+    shares one loaded model instead of paying the init cost again.
+    """
+    return embedding_functions.DefaultEmbeddingFunction()
+
 
 class VectorIndexManager:
     """Manages ChromaDB vector index for policy documents"""
     
-    def __init__(self):
-        """Initialize ChromaDB client with persistent storage"""
-        # Use new ChromaDB API (0.4+) with PersistentClient
-        self.client = chromadb.PersistentClient(
-            path=settings.chroma_persist_directory
-        )
+    def __init__(self, persist_directory: str = settings.chroma_persist_directory):
+        """Initialize ChromaDB client
+
+        Args:
+            persist_directory: On-disk index location; pass None for an
+                ephemeral in-memory client (tests, scratch indexes) that
+                skips the disk-write leg entirely.
+        """
+        self.persist_directory = persist_directory
+        # Use new ChromaDB API (0.4+)
+        if persist_directory is None:
+            self.client = chromadb.EphemeralClient()
+        else:
+            self.client = chromadb.PersistentClient(path=persist_directory)
         
-        # Get or create collection
+        # Get or create collection. HNSW parameters are sized for a corpus
+        # of thousands of policy chunks: construction_ef=200 buys graph
+        # quality at (one-time) build cost, search_ef=64 keeps interactive
+        # queries fast, M=16 balances recall against index memory. Only
+        # applied when the collection is first created; existing
+        # collections keep the parameters they were built with.
         self.collection_name = "pa_policies"
-        self.collection = self.client.get_or_create_collection(
+        self.collection = self._open_collection()
+
+        # Running document count: seeded once here, maintained on writes,
+        # so stats polling never pays collection.count() again
+        self._doc_count = self.collection.count()
+
+        # Repeat queries (hot drugs/plans build identical query strings) skip
+        # the embedding + ANN traversal entirely; invalidated on index writes
+        self._search_cache = QueryCache(max_size=2048, ttl_seconds=300.0)
+
+        logger.info(f"ChromaDB initialized with collection: {self.collection_name}")
+
+    def _open_collection(self):
+        """Get or create the policy collection with the shared embedder"""
+        return self.client.get_or_create_collection(
             name=self.collection_name,
-            metadata={"hnsw:space": "cosine"}  # Use cosine similarity
+            embedding_function=_get_embedding_function(),
+            metadata={
+                "hnsw:space": "cosine",
+                "hnsw:M": 16,
+                "hnsw:construction_ef": 200,
+                "hnsw:search_ef": 64,
+            }
         )
-        
-        logger.info(f"ChromaDB initialized with collection: {self.collection_name}")
-    
+
+    def reset(self) -> None:
+        """Drop and recreate the collection, keeping client and embedder
+
+        Cheap test/reload isolation: only the collection contents go; the
+        ChromaDB client and the cached embedding model stay warm.
+        """
+        try:
+            self.client.delete_collection(name=self.collection_name)
+        except Exception:
+            pass  # Collection may not exist yet
+        self.collection = self._open_collection()
+        self._doc_count = 0
+        self._search_cache.invalidate()
+
     def add_document(
         self,
         doc_id: str,
@@ -47,13 +121,15 @@ class VectorIndexManager:
         """
         if metadata is None:
             metadata = {}
-        
+
         self.collection.add(
             ids=[doc_id],
             documents=[text],
-            metadatas=[metadata]
+            metadatas=[self._normalize_metadata(metadata)]
         )
-        
+        self._doc_count += 1
+        self._search_cache.invalidate()
+
         logger.debug(f"Added document to index: {doc_id}")
     
     def add_documents_batch(
@@ -62,81 +138,290 @@ class VectorIndexManager:
     ) -> None:
         """
         Add multiple documents to the index
-        
+
+        Embeddings are computed up front in tuned batches with the
+        collection's own embedding function (keeping ingest and query
+        vectors consistent) and passed to Chroma explicitly, so add()
+        skips its internal per-call embedder.
+
         Args:
             documents: List of dicts with keys: id, text, metadata (optional)
         """
         ids = []
         texts = []
         metadatas = []
-        
+
         for doc in documents:
             ids.append(doc["id"])
             texts.append(doc["text"])
-            metadatas.append(doc.get("metadata", {}))
-        
+            metadatas.append(self._normalize_metadata(doc.get("metadata", {})))
+
+        embeddings = self._embed_batched(texts)
+
         self.collection.add(
             ids=ids,
             documents=texts,
-            metadatas=metadatas
+            metadatas=metadatas,
+            embeddings=embeddings
         )
-        
+        self._doc_count += len(ids)
+        self._search_cache.invalidate()
+
         logger.info(f"Added {len(documents)} documents to index")
-    
+
+    def _embed_batched(self, texts: List[str]):
+        """Embed texts in _EMBED_BATCH_SIZE slices via the collection's embedder
+
+        Returns None when the embedding function is not exposed (older or
+        remote collections), in which case Chroma embeds internally as before.
+        """
+        embedding_fn = getattr(self.collection, "_embedding_function", None)
+        if embedding_fn is None or not texts:
+            return None
+
+        embeddings = []
+        for start in range(0, len(texts), _EMBED_BATCH_SIZE):
+            embeddings.extend(embedding_fn(texts[start:start + _EMBED_BATCH_SIZE]))
+        return embeddings
+
+    @staticmethod
+    def _normalize_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Add lowercased copies of filterable fields for exact-match queries
+
+        ChromaDB where-filters are case-sensitive, so drug/plan names are
+        indexed alongside lowercased variants that the search routes can
+        filter on directly.
+        """
+        normalized = dict(metadata)
+        for key in ("drug", "plan"):
+            value = normalized.get(key)
+            if isinstance(value, str):
+                normalized[f"{key}_lc"] = value.lower()
+        return normalized
+
+    @staticmethod
+    def _keyword_prefilter(
+        matches: List[Dict[str, Any]],
+        terms: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Keep matches whose text contains any of the given terms
+
+        One np.char.find pass per term over the whole result column,
+        OR-ed into a single mask - no per-result Python substring loop.
+        """
+        if not matches or not terms:
+            return matches
+        texts = np.array([m["text"].lower() for m in matches])
+        mask = np.zeros(len(texts), dtype=bool)
+        for term in terms:
+            mask |= np.char.find(texts, term.lower()) >= 0
+        return [m for m, keep in zip(matches, mask.tolist()) if keep]
+
     def search(
         self,
         query: str,
         top_k: int = 5,
-        distance_threshold: float = 0.0
+        distance_threshold: float = 0.0,
+        where: Dict[str, Any] = None,
+        keyword_terms: List[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Semantic search for similar documents
-        
+
         Args:
             query: Search query (natural language)
             top_k: Number of results to return
             distance_threshold: Minimum similarity score (0-1)
-            
+            where: Optional ChromaDB metadata filter applied in the index
+            keyword_terms: Optional terms; results must contain at least
+                one (vectorized post-filter, cheap keyword rerank)
+
         Returns:
             List of matching documents with scores
         """
+        cache_key = self._search_cache_key(query, top_k, distance_threshold, where)
+        if keyword_terms:
+            cache_key = cache_key + (tuple(keyword_terms),)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         results = self.collection.query(
             query_texts=[query],
-            n_results=top_k
+            n_results=top_k,
+            where=where
         )
-        
-        # Parse results
-        matches = []
-        if results["ids"] and len(results["ids"]) > 0:
-            for i, doc_id in enumerate(results["ids"][0]):
-                distance = results["distances"][0][i] if results["distances"] else 0
-                # ChromaDB returns distances, convert to similarity (1 - distance for cosine)
-                similarity = 1 - distance
-                
-                if similarity >= distance_threshold:
-                    matches.append({
-                        "id": doc_id,
-                        "text": results["documents"][0][i],
-                        "metadata": results["metadatas"][0][i],
-                        "similarity": round(similarity, 4),
-                        "distance": round(distance, 4)
-                    })
-        
+
+        matches = self._parse_query_results(results, 0, distance_threshold)
+        if keyword_terms:
+            matches = self._keyword_prefilter(matches, keyword_terms)
+        self._search_cache.put(cache_key, matches)
         logger.debug(f"Search query: '{query}' returned {len(matches)} results")
         return matches
+
+    def embed(self, text: str) -> List[float]:
+        """Embed one text with the collection's embedding function
+
+        Lets callers compute a query vector once and reuse it across
+        search_by_vector calls instead of re-encoding per search.
+        """
+        return _get_embedding_function()([text])[0]
+
+    def search_by_vector(
+        self,
+        vector: List[float],
+        top_k: int = 5,
+        distance_threshold: float = 0.0,
+        where: Dict[str, Any] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Semantic search from a precomputed query embedding
+
+        Skips the encoder entirely - the dominant cost of search() for
+        repeat queries - and goes straight to the ANN lookup. No result
+        caching here: the text-keyed cache in search() already covers
+        the repeated-string case.
+
+        Args:
+            vector: Query embedding (as produced by embed())
+            top_k: Number of results to return
+            distance_threshold: Minimum similarity score (0-1)
+            where: Optional ChromaDB metadata filter applied in the index
+
+        Returns:
+            List of matching documents with scores
+        """
+        results = self.collection.query(
+            query_embeddings=[list(vector)],
+            n_results=top_k,
+            where=where
+        )
+        return self._parse_query_results(results, 0, distance_threshold)
+
+    def batch_search(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        distance_threshold: float = 0.0,
+        where: Dict[str, Any] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Semantic search for several queries in one index traversal
+
+        ChromaDB embeds and queries all texts in a single call, so this is
+        substantially cheaper than looping over search().
+
+        Args:
+            queries: Search queries (natural language)
+            top_k: Number of results to return per query
+            distance_threshold: Minimum similarity score (0-1)
+            where: Optional ChromaDB metadata filter applied in the index
+
+        Returns:
+            One list of matches per query, in input order
+        """
+        if not queries:
+            return []
+
+        results = self.collection.query(
+            query_texts=list(queries),
+            n_results=top_k,
+            where=where
+        )
+
+        batches = [
+            self._parse_query_results(results, i, distance_threshold)
+            for i in range(len(queries))
+        ]
+        logger.debug(f"Batch search of {len(queries)} queries complete")
+        return batches
+
+    @staticmethod
+    def _search_cache_key(
+        query: str,
+        top_k: int,
+        distance_threshold: float,
+        where: Dict[str, Any]
+    ) -> tuple:
+        """Build a hashable cache key covering every search parameter"""
+        where_key = orjson.dumps(where, option=orjson.OPT_SORT_KEYS) if where else None
+        return (query, top_k, distance_threshold, where_key)
+
+    @staticmethod
+    def _parse_query_results(
+        results: Dict[str, Any],
+        query_index: int,
+        distance_threshold: float
+    ) -> List[Dict[str, Any]]:
+        """Convert one query's slice of a ChromaDB response into match dicts
+
+        The similarity cutoff is applied as one vectorized mask over the
+        distance array, so match dicts are only ever built for rows that
+        survive the threshold.
+        """
+        if not results["ids"] or len(results["ids"]) <= query_index:
+            return []
+
+        ids = results["ids"][query_index]
+        if results["distances"]:
+            # ChromaDB returns distances; similarity = 1 - distance for cosine
+            distances = np.asarray(results["distances"][query_index])
+        else:
+            distances = np.zeros(len(ids))
+        similarities = 1.0 - distances
+        keep = np.nonzero(similarities >= distance_threshold)[0]
+
+        documents = results["documents"][query_index]
+        metadatas = results["metadatas"][query_index]
+        return [
+            {
+                "id": ids[i],
+                "text": documents[i],
+                "metadata": metadatas[i],
+                "similarity": round(float(similarities[i]), 4),
+                "distance": round(float(distances[i]), 4)
+            }
+            for i in keep.tolist()
+        ]
     
+    def warmup(self) -> None:
+        """Load the embedding model before the first real query
+
+        The default Chroma embedder lazily initializes its ONNX session;
+        embedding a throwaway string at startup moves that cost out of
+        the first user-facing search.
+        """
+        embedding_fn = getattr(self.collection, "_embedding_function", None)
+        if embedding_fn is not None:
+            embedding_fn(["warmup"])
+
+    def list_ids(self) -> List[str]:
+        """Return every document id in the collection (no payloads fetched)"""
+        return self.collection.get(include=[])["ids"]
+
+    def delete_documents(self, ids: List[str]) -> None:
+        """Remove the given document ids from the index"""
+        if not ids:
+            return
+        self.collection.delete(ids=ids)
+        # Deletes are rare and may name absent ids, so re-seed exactly
+        # rather than guessing a decrement
+        self._doc_count = self.collection.count()
+        self._search_cache.invalidate()
+        logger.info(f"Deleted {len(ids)} documents from index")
+
     def delete_collection(self) -> None:
         """Delete the current collection"""
         self.client.delete_collection(name=self.collection_name)
+        self._search_cache.invalidate()
         logger.info(f"Deleted collection: {self.collection_name}")
     
     def get_collection_stats(self) -> Dict[str, Any]:
-        """Get statistics about the collection"""
-        count = self.collection.count()
+        """Get statistics about the collection from the running counter"""
         return {
             "collection_name": self.collection_name,
-            "document_count": count,
-            "persist_directory": settings.chroma_persist_directory
+            "document_count": self._doc_count,
+            "persist_directory": self.persist_directory
         }
 
 
@@ -157,38 +442,69 @@ def initialize_vector_index() -> VectorIndexManager:
     return get_vector_manager()
 
 
+def _chunk_offsets(length, chunk_size, overlap, boundary_starts, boundary_ends):
+    """Compute (start, end) offsets for every chunk as int64 arrays
+
+    Pure scalar/array arithmetic with no string work, so numba can
+    compile it when installed; the interpreted version runs the same
+    code. Each window ends at chunk_size unless a break (whose match
+    falls inside the window) lands past the window midpoint.
+    """
+    step = max(1, chunk_size // 2 + 1 - overlap)
+    max_chunks = length // step + 2
+    starts = np.empty(max_chunks, dtype=np.int64)
+    ends = np.empty(max_chunks, dtype=np.int64)
+
+    count = 0
+    start = 0
+    while start < length:
+        end = start + chunk_size
+        if end < length:
+            idx = np.searchsorted(boundary_ends, end, side="right") - 1
+            if idx >= 0 and boundary_starts[idx] > start + chunk_size // 2:
+                end = boundary_starts[idx] + 1
+        starts[count] = start
+        ends[count] = end
+        count += 1
+        start = end - overlap
+
+    return starts[:count], ends[:count]
+
+
+if njit is not None:
+    _chunk_offsets = njit(cache=True)(_chunk_offsets)
+
+
 def chunk_document(text: str, chunk_size: int = 500, overlap: int = 100) -> List[str]:
     """
     Split document into chunks with overlap
-    
+
+    Break positions (newlines and sentence ends) are scanned once up
+    front; all offset arithmetic then runs over int arrays in
+    _chunk_offsets (JIT-compiled when numba is available), and the text
+    is sliced exactly once per chunk at the end.
+
     Args:
         text: Document text
         chunk_size: Size of each chunk (approximate)
         overlap: Overlap between chunks
-        
+
     Returns:
         List of text chunks
     """
-    chunks = []
-    start = 0
-    
-    while start < len(text):
-        # End at chunk_size, but try to break at sentence/line boundary
-        end = start + chunk_size
-        
-        if end < len(text):
-            # Look for nearest newline or period within reasonable range
-            search_end = min(end + 50, len(text))
-            last_break = max(
-                text.rfind('\n', start, end),
-                text.rfind('. ', start, end)
-            )
-            if last_break > start + chunk_size // 2:
-                end = last_break + 1
-        
-        chunks.append(text[start:end].strip())
-        
-        # Move to next chunk with overlap
-        start = end - overlap
-    
+    # Match start/end positions in document order; a break is usable for
+    # a window when the whole match falls before the window end
+    boundary_starts = []
+    boundary_ends = []
+    for m in _CHUNK_BREAK_RE.finditer(text):
+        boundary_starts.append(m.start())
+        boundary_ends.append(m.end())
+
+    starts, ends = _chunk_offsets(
+        len(text), chunk_size, overlap,
+        np.array(boundary_starts, dtype=np.int64),
+        np.array(boundary_ends, dtype=np.int64),
+    )
+
+    chunks = (text[s:e].strip() for s, e in zip(starts.tolist(), ends.tolist()))
     return [c for c in chunks if c]  # Filter empty chunks
@@ -3,7 +3,10 @@ FastAPI application entry point
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 from pathlib import Path
 
@@ -11,8 +14,10 @@ from app.core.config import settings
 from app.core.logger import setup_logging
 from app.data.models import HealthCheckResponse, SystemInfoResponse
 from app.data.database import check_db_connection
-from app.data.vector_index import initialize_vector_index
+from app.data.vector_index import initialize_vector_index, get_vector_manager
 from app.core.monitoring import initialize_monitoring
+from app.modules.orchestrator import get_orchestrator
+from app.modules.prior_authorization import get_pa_generator
 from app.routes import benefit_verification, policy_search, clinical_qualification, prior_authorization, orchestrator, monitoring_demo
 
 # Setup logging
@@ -41,6 +46,15 @@ async def lifespan(app: FastAPI):
     db_status = check_db_connection()
     if db_status:
         logger.info("✓ Database connection successful")
+        # Preload the formulary so coverage checks avoid per-request DB queries
+        try:
+            from app.data.database import get_db_context
+            from app.modules.benefit_verification import load_formulary_cache
+            with get_db_context() as db:
+                entries = load_formulary_cache(db)
+            logger.info(f"✓ Formulary cache loaded ({entries} entries)")
+        except Exception as e:
+            logger.warning(f"⚠ Formulary cache preload failed: {e}")
     else:
         logger.warning("⚠ Database connection failed - some features may not work")
         logger.warning("  Run 'docker-compose up -d' to start PostgreSQL")
@@ -49,6 +63,9 @@ async def lifespan(app: FastAPI):
     logger.info("Initializing ChromaDB vector index...")
     try:
         vector_manager = initialize_vector_index()
+        # Bind once so routes resolve the manager via app.state instead of
+        # calling the accessor per request
+        app.state.vector_manager = vector_manager
         stats = vector_manager.get_collection_stats()
         logger.info(f"✓ ChromaDB initialized with {stats['document_count']} documents")
         if stats['document_count'] == 0:
@@ -63,11 +80,28 @@ async def lifespan(app: FastAPI):
         logger.info("✓ Monitoring initialized")
     except Exception as e:
         logger.warning(f"⚠ Monitoring initialization warning: {e}")
-    
+
+    # Bind the orchestrator so its worker pools start with the app and can
+    # be torn down on shutdown
+    app.state.orchestrator = get_orchestrator()
+
+    # Pre-warm the embedder and LLM connection so the first request does
+    # not pay model-load and TLS-handshake latency
+    logger.info("Warming up embedding model and LLM connection...")
+    try:
+        await asyncio.gather(
+            run_in_threadpool(get_vector_manager().warmup),
+            run_in_threadpool(get_pa_generator().warmup),
+        )
+        logger.info("✓ Warmup complete")
+    except Exception as e:
+        logger.warning(f"⚠ Warmup skipped: {e}")
+
     yield
-    
+
     # Shutdown
     logger.info("Shutting down Develop Health MVP API...")
+    app.state.orchestrator.close()
 
 
 # Create FastAPI app
@@ -76,6 +110,9 @@ app = FastAPI(
     description="AI-powered healthcare automation for benefit verification, clinical qualification, and prior authorization",
     version="1.0.0",
     lifespan=lifespan,
+    # orjson serializes the large workflow/search payloads several times
+    # faster than the stdlib encoder and handles numpy scalars natively
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
 )
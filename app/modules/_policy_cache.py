@@ -0,0 +1,63 @@
+"""
+Process-local LRU+TTL cache for policy search results
+
+Drug names are heavily skewed (a few drugs dominate requests), so repeat
+lookups can skip the embedding + ANN traversal entirely.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class QueryCache:
+    """Thread-safe LRU cache with per-entry TTL expiry"""
+
+    def __init__(self, max_size: int = 512, ttl_seconds: float = 300.0):
+        """
+        Args:
+            max_size: Maximum number of entries before LRU eviction
+            ttl_seconds: Time-to-live for each entry
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Any, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop all cached entries (e.g. after an index rebuild)"""
+        with self._lock:
+            self._entries.clear()
+
+    def discard(self, predicate) -> None:
+        """Drop only the entries whose key matches the predicate
+
+        Lets callers with structured keys invalidate one record's entries
+        (e.g. everything keyed on a patient id) without emptying the cache.
+        """
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
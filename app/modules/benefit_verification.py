@@ -4,37 +4,213 @@ Benefit Verification Module
 Determines if a drug is covered under a patient's insurance plan
 and whether prior authorization is required.
 """
-from typing import Dict, Optional, List
-from sqlalchemy.orm import Session
+from dataclasses import dataclass
+from typing import Dict, Optional, List, Tuple
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, load_only
+import json
 import logging
 
+from app.core.config import settings
 from app.data.db_models import InsurancePlan, Patient
+from app.modules._policy_cache import QueryCache
 
 logger = logging.getLogger(__name__)
 
+# Prefer orjson for (de)serializing cached formulary entries; stdlib json is
+# the drop-in fallback
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps  # returns bytes, which Redis accepts directly
+except ImportError:
+    _json_loads = json.loads
 
+    def _json_dumps(obj):
+        return json.dumps(obj)
+
+# Optional shared Redis cache so formulary hits are shared across workers
+# (a per-process dict only helps a single Uvicorn/Gunicorn worker).
+_REDIS_KEY_PREFIX = "fml:"
+_REDIS_TTL_SECONDS = 3600
+
+_redis_client = None
+_redis_checked = False
+
+
+def _get_redis_client():
+    """Lazily connect to Redis; disable the layer if unavailable"""
+    global _redis_client, _redis_checked
+
+    if _redis_checked:
+        return _redis_client
+
+    _redis_checked = True
+    try:
+        import redis
+        client = redis.Redis.from_url(
+            settings.redis_url,
+            socket_connect_timeout=1,
+            socket_timeout=1,
+            decode_responses=True,
+        )
+        client.ping()
+        _redis_client = client
+        logger.info("✓ Redis formulary cache enabled")
+    except ImportError:
+        logger.warning("⚠ Redis not installed - formulary cache is per-process only")
+    except Exception as e:
+        logger.warning("⚠ Redis unavailable (%s) - formulary cache is per-process only", e)
+
+    return _redis_client
+
+# In-memory formulary cache keyed by (plan, drug), loaded once at startup.
+# The InsurancePlan table is small and effectively read-only in a deployment,
+# so the hot coverage path becomes an O(1) dict lookup instead of a DB query.
+_FORMULARY: Dict[Tuple[str, str], Dict] = {}
+_formulary_loaded = False
+
+# Covered alternatives per plan, computed on first access and invalidated
+# alongside the formulary cache on InsurancePlan mutations
+_ALTERNATIVES_CACHE: Dict[str, List[Dict]] = {}
+
+# Distinct plan/drug name lists for the listing endpoints; the TTL bounds
+# staleness from out-of-band DB edits that bypass the ORM event hooks
+_DISTINCT_NAMES_CACHE = QueryCache(max_size=4, ttl_seconds=300.0)
+
+
+def _normalize_key(value: str) -> str:
+    """
+    Normalize user-supplied plan/drug names for lookups and cache keys
+
+    "Ozempic" and "ozempic " otherwise produce separate DB hits and separate
+    cache entries across every caching layer.
+    """
+    return value.strip().lower()
+
+
+def _plan_coverage_entry(plan_coverage: InsurancePlan) -> Dict:
+    """Build a cache entry from an InsurancePlan row"""
+    return {
+        "covered": plan_coverage.covered,
+        "pa_required": plan_coverage.pa_required,
+        "criteria": plan_coverage.criteria,
+        "tier": plan_coverage.tier,
+        "estimated_copay": plan_coverage.estimated_copay,
+        "step_therapy_required": plan_coverage.step_therapy_required,
+        "quantity_limit": plan_coverage.quantity_limit,
+    }
+
+
+def load_formulary_cache(db: Session) -> int:
+    """
+    Preload the full insurance formulary into memory
+
+    Called once at app startup. Returns the number of cached entries.
+    """
+    global _formulary_loaded
+
+    _FORMULARY.clear()
+    for row in db.query(InsurancePlan).all():
+        _FORMULARY[(_normalize_key(row.plan), _normalize_key(row.drug))] = _plan_coverage_entry(row)
+
+    _formulary_loaded = True
+    logger.info("Formulary cache loaded: %d plan/drug entries", len(_FORMULARY))
+    return len(_FORMULARY)
+
+
+def _get_plan_coverage(plan_name: str, drug: str, db: Session) -> Optional[Dict]:
+    """
+    Look up plan coverage through the cache hierarchy:
+    in-process dict -> shared Redis -> database
+    """
+    plan_n = _normalize_key(plan_name)
+    drug_n = _normalize_key(drug)
+
+    if _formulary_loaded:
+        return _FORMULARY.get((plan_n, drug_n))
+
+    redis_client = _get_redis_client()
+    redis_key = f"{_REDIS_KEY_PREFIX}{plan_n}:{drug_n}"
+    if redis_client:
+        try:
+            cached = redis_client.get(redis_key)
+            if cached is not None:
+                entry = _json_loads(cached)
+                return entry or None  # empty dict marks a cached negative lookup
+        except Exception as e:
+            logger.warning("Redis formulary read failed: %s", e)
+
+    # Only materialize the columns the coverage result actually uses
+    plan_coverage = db.query(InsurancePlan).options(
+        load_only(
+            InsurancePlan.covered,
+            InsurancePlan.pa_required,
+            InsurancePlan.criteria,
+            InsurancePlan.tier,
+            InsurancePlan.estimated_copay,
+            InsurancePlan.step_therapy_required,
+            InsurancePlan.quantity_limit,
+        )
+    ).filter(
+        func.lower(InsurancePlan.plan) == plan_n,
+        func.lower(InsurancePlan.drug) == drug_n
+    ).first()
+
+    entry = _plan_coverage_entry(plan_coverage) if plan_coverage else None
+
+    if redis_client:
+        try:
+            redis_client.set(redis_key, _json_dumps(entry or {}), ex=_REDIS_TTL_SECONDS)
+        except Exception as e:
+            logger.warning("Redis formulary write failed: %s", e)
+
+    return entry
+
+
+@event.listens_for(InsurancePlan, "after_insert")
+@event.listens_for(InsurancePlan, "after_update")
+def _formulary_cache_upsert(mapper, connection, target):
+    """Keep the formulary cache in sync with InsurancePlan mutations"""
+    if _formulary_loaded:
+        _FORMULARY[(_normalize_key(target.plan), _normalize_key(target.drug))] = _plan_coverage_entry(target)
+    _ALTERNATIVES_CACHE.pop(_normalize_key(target.plan), None)
+    _DISTINCT_NAMES_CACHE.invalidate()
+    _invalidate_redis_entry(target.plan, target.drug)
+
+
+@event.listens_for(InsurancePlan, "after_delete")
+def _formulary_cache_evict(mapper, connection, target):
+    """Drop deleted InsurancePlan rows from the formulary cache"""
+    if _formulary_loaded:
+        _FORMULARY.pop((_normalize_key(target.plan), _normalize_key(target.drug)), None)
+    _ALTERNATIVES_CACHE.pop(_normalize_key(target.plan), None)
+    _DISTINCT_NAMES_CACHE.invalidate()
+    _invalidate_redis_entry(target.plan, target.drug)
+
+
+def _invalidate_redis_entry(plan_name: str, drug: str):
+    """Invalidate a shared Redis formulary entry after a mutation"""
+    redis_client = _redis_client  # only touch Redis if already connected
+    if redis_client:
+        try:
+            redis_client.delete(f"{_REDIS_KEY_PREFIX}{_normalize_key(plan_name)}:{_normalize_key(drug)}")
+        except Exception as e:
+            logger.warning("Redis formulary invalidation failed: %s", e)
+
+
+@dataclass(frozen=True, slots=True)
 class CoverageResult:
     """Coverage check result"""
-    def __init__(
-        self,
-        covered: bool,
-        pa_required: bool,
-        criteria: Optional[str] = None,
-        tier: Optional[int] = None,
-        estimated_copay: Optional[float] = None,
-        step_therapy_required: bool = False,
-        quantity_limit: Optional[str] = None,
-        reason: Optional[str] = None,
-    ):
-        self.covered = covered
-        self.pa_required = pa_required
-        self.criteria = criteria
-        self.tier = tier
-        self.estimated_copay = estimated_copay
-        self.step_therapy_required = step_therapy_required
-        self.quantity_limit = quantity_limit
-        self.reason = reason
-    
+    covered: bool
+    pa_required: bool
+    criteria: Optional[str] = None
+    tier: Optional[int] = None
+    estimated_copay: Optional[float] = None
+    step_therapy_required: bool = False
+    quantity_limit: Optional[str] = None
+    reason: Optional[str] = None
+
     def to_dict(self) -> Dict:
         """Convert to dictionary"""
         return {
@@ -65,52 +241,51 @@ def check_coverage(
     Returns:
         CoverageResult with coverage details
     """
-    logger.info(f"Checking coverage for patient {patient_id}, drug {drug}")
+    logger.info("Checking coverage for patient %s, drug %s", patient_id, drug)
     
-    # Get patient
-    patient = db.query(Patient).filter(Patient.patient_id == patient_id).first()
+    # Get patient (only the plan name is needed here)
+    patient = db.query(Patient).options(
+        load_only(Patient.patient_id, Patient.insurance_plan)
+    ).filter(Patient.patient_id == patient_id).first()
     if not patient:
-        logger.warning(f"Patient not found: {patient_id}")
+        logger.warning("Patient not found: %s", patient_id)
         return CoverageResult(
             covered=False,
             pa_required=False,
             reason=f"Patient not found: {patient_id}"
         )
     
-    # Get plan coverage for drug
-    plan_coverage = db.query(InsurancePlan).filter(
-        InsurancePlan.plan == patient.insurance_plan,
-        InsurancePlan.drug == drug
-    ).first()
-    
+    # Get plan coverage for drug (in-memory formulary with DB fallback)
+    plan_coverage = _get_plan_coverage(patient.insurance_plan, drug, db)
+
     if not plan_coverage:
-        logger.warning(f"Drug not in formulary: {drug} for plan {patient.insurance_plan}")
+        logger.warning("Drug not in formulary: %s for plan %s", drug, patient.insurance_plan)
         return CoverageResult(
             covered=False,
             pa_required=False,
             reason=f"Drug not in formulary for {patient.insurance_plan}"
         )
-    
+
     # Drug is in formulary
-    if not plan_coverage.covered:
+    if not plan_coverage["covered"]:
         return CoverageResult(
             covered=False,
             pa_required=False,
             reason=f"Drug not covered under {patient.insurance_plan}"
         )
-    
+
     # Drug is covered
-    logger.info(f"Drug covered: {drug}, PA required: {plan_coverage.pa_required}")
-    
+    logger.info("Drug covered: %s, PA required: %s", drug, plan_coverage["pa_required"])
+
     return CoverageResult(
         covered=True,
-        pa_required=plan_coverage.pa_required,
-        criteria=plan_coverage.criteria,
-        tier=plan_coverage.tier,
-        estimated_copay=plan_coverage.estimated_copay,
-        step_therapy_required=plan_coverage.step_therapy_required,
-        quantity_limit=plan_coverage.quantity_limit,
-        reason="Coverage found" if plan_coverage.pa_required else "Covered, no PA required"
+        pa_required=plan_coverage["pa_required"],
+        criteria=plan_coverage["criteria"],
+        tier=plan_coverage["tier"],
+        estimated_copay=plan_coverage["estimated_copay"],
+        step_therapy_required=plan_coverage["step_therapy_required"],
+        quantity_limit=plan_coverage["quantity_limit"],
+        reason="Coverage found" if plan_coverage["pa_required"] else "Covered, no PA required"
     )
 
 
@@ -130,36 +305,33 @@ def check_coverage_by_plan(
     Returns:
         CoverageResult with coverage details
     """
-    logger.info(f"Checking coverage for plan {plan_name}, drug {drug}")
-    
-    plan_coverage = db.query(InsurancePlan).filter(
-        InsurancePlan.plan == plan_name,
-        InsurancePlan.drug == drug
-    ).first()
-    
+    logger.info("Checking coverage for plan %s, drug %s", plan_name, drug)
+
+    plan_coverage = _get_plan_coverage(plan_name, drug, db)
+
     if not plan_coverage:
         return CoverageResult(
             covered=False,
             pa_required=False,
             reason=f"Drug not in formulary for {plan_name}"
         )
-    
-    if not plan_coverage.covered:
+
+    if not plan_coverage["covered"]:
         return CoverageResult(
             covered=False,
             pa_required=False,
             reason=f"Drug not covered under {plan_name}"
         )
-    
+
     return CoverageResult(
         covered=True,
-        pa_required=plan_coverage.pa_required,
-        criteria=plan_coverage.criteria,
-        tier=plan_coverage.tier,
-        estimated_copay=plan_coverage.estimated_copay,
-        step_therapy_required=plan_coverage.step_therapy_required,
-        quantity_limit=plan_coverage.quantity_limit,
-        reason="Coverage found" if plan_coverage.pa_required else "Covered, no PA required"
+        pa_required=plan_coverage["pa_required"],
+        criteria=plan_coverage["criteria"],
+        tier=plan_coverage["tier"],
+        estimated_copay=plan_coverage["estimated_copay"],
+        step_therapy_required=plan_coverage["step_therapy_required"],
+        quantity_limit=plan_coverage["quantity_limit"],
+        reason="Coverage found" if plan_coverage["pa_required"] else "Covered, no PA required"
     )
 
 
@@ -179,13 +351,21 @@ def get_covered_alternatives(
     Returns:
         List of alternative drugs
     """
+    plan_n = _normalize_key(plan_name)
+
+    # The formulary is effectively static, so alternatives per plan are
+    # computed once and served from memory afterwards
+    cached = _ALTERNATIVES_CACHE.get(plan_n)
+    if cached is not None:
+        return cached
+
     # For MVP, return all covered drugs under the plan
     alternatives = db.query(InsurancePlan).filter(
-        InsurancePlan.plan == plan_name,
+        func.lower(InsurancePlan.plan) == plan_n,
         InsurancePlan.covered == True
     ).limit(10).all()
-    
-    return [
+
+    result = [
         {
             "drug": alt.drug,
             "tier": alt.tier,
@@ -195,6 +375,55 @@ def get_covered_alternatives(
         for alt in alternatives
     ]
 
+    _ALTERNATIVES_CACHE[plan_n] = result
+    return result
+
+
+def list_plan_names(db: Session) -> List[str]:
+    """
+    List distinct insurance plan names, served from a short-TTL cache
+
+    The DISTINCT scan only reruns after a formulary mutation or TTL expiry,
+    which gives the list endpoints the read profile of a materialized view
+    without requiring Postgres-specific DDL (tests run on SQLite).
+
+    Args:
+        db: Database session
+
+    Returns:
+        Sorted list of plan names
+    """
+    cached = _DISTINCT_NAMES_CACHE.get("plans")
+    if cached is not None:
+        return cached
+
+    # Core select with SQL-side DISTINCT + ORDER BY: scalar rows straight
+    # from the driver, no Row wrapping and no Python re-sort
+    stmt = select(InsurancePlan.plan).distinct().order_by(InsurancePlan.plan)
+    names = db.execute(stmt).scalars().all()
+    _DISTINCT_NAMES_CACHE.put("plans", names)
+    return names
+
+
+def list_drug_names(db: Session) -> List[str]:
+    """
+    List distinct formulary drug names, served from a short-TTL cache
+
+    Args:
+        db: Database session
+
+    Returns:
+        Sorted list of drug names
+    """
+    cached = _DISTINCT_NAMES_CACHE.get("drugs")
+    if cached is not None:
+        return cached
+
+    stmt = select(InsurancePlan.drug).distinct().order_by(InsurancePlan.drug)
+    names = db.execute(stmt).scalars().all()
+    _DISTINCT_NAMES_CACHE.put("drugs", names)
+    return names
+
 
 def get_patient_insurance_info(patient_id: str, db: Session) -> Optional[Dict]:
     """
@@ -207,11 +436,13 @@ def get_patient_insurance_info(patient_id: str, db: Session) -> Optional[Dict]:
     Returns:
         Dictionary with insurance info or None
     """
-    patient = db.query(Patient).filter(Patient.patient_id == patient_id).first()
-    
+    patient = db.query(Patient).options(
+        load_only(Patient.patient_id, Patient.name, Patient.insurance_plan, Patient.member_id)
+    ).filter(Patient.patient_id == patient_id).first()
+
     if not patient:
         return None
-    
+
     return {
         "patient_id": patient.patient_id,
         "name": patient.name,
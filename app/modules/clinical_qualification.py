@@ -4,13 +4,18 @@ Clinical Qualification Module
 Determines if patients meet medical necessity criteria using LLM reasoning
 augmented with retrieved insurance policy context (RAG pattern).
 """
-from typing import Dict, Any, Optional, List
+from dataclasses import dataclass, field
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Dict, Any, Optional, List, Tuple
 from sqlalchemy.orm import Session
 import logging
-import json
+import orjson
 
+from app.core.config import settings
 from app.core.llm_client import get_llm_client
 from app.data.vector_index import get_vector_manager
+from app.modules._policy_cache import QueryCache
 from app.prompts.clinical_qualification import (
     get_rag_enhanced_prompt,
     SYSTEM_PROMPT
@@ -18,26 +23,51 @@ from app.prompts.clinical_qualification import (
 
 logger = logging.getLogger(__name__)
 
+# Identical eligibility checks (retries, quick-tests, repeat prescriptions)
+# skip the LLM round trip entirely; results for a given input set are
+# deterministic enough at temperature 0.1 to serve from cache for an hour
+_eligibility_cache = QueryCache(max_size=4096, ttl_seconds=3600.0)
 
+
+def _eligibility_cache_key(
+    patient_id: str,
+    patient_data: Dict[str, Any],
+    drug: str,
+    policy_criteria: str,
+    use_rag: bool,
+) -> str:
+    """Digest every input that shapes the LLM answer
+
+    The system prompt and provider are part of the key so prompt edits or
+    provider switches invalidate naturally.
+    """
+    # orjson returns bytes, which feed blake2b without the str detour
+    payload = orjson.dumps(
+        {
+            "patient_id": patient_id,
+            "patient_data": patient_data,
+            "drug": drug,
+            "policy_criteria": policy_criteria,
+            "use_rag": use_rag,
+            "provider": settings.llm_provider,
+            "system_prompt": SYSTEM_PROMPT,
+        },
+        option=orjson.OPT_SORT_KEYS,
+        default=str,
+    )
+    return blake2b(payload, digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
 class EligibilityResult:
     """Clinical eligibility determination result"""
-    
-    def __init__(
-        self,
-        meets_criteria: bool,
-        confidence_score: float,
-        clinical_justification: str,
-        recommendation: str,
-        reasoning_details: Optional[Dict[str, Any]] = None,
-        llm_metadata: Optional[Dict[str, Any]] = None,
-    ):
-        self.meets_criteria = meets_criteria
-        self.confidence_score = confidence_score
-        self.clinical_justification = clinical_justification
-        self.recommendation = recommendation
-        self.reasoning_details = reasoning_details or {}
-        self.llm_metadata = llm_metadata or {}
-    
+    meets_criteria: bool
+    confidence_score: float
+    clinical_justification: str
+    recommendation: str
+    reasoning_details: Dict[str, Any] = field(default_factory=dict)
+    llm_metadata: Dict[str, Any] = field(default_factory=dict)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
         return {
@@ -50,28 +80,49 @@ class EligibilityResult:
         }
 
 
+def build_rag_search_query(drug: str, diagnoses: List[Dict[str, str]]) -> str:
+    """Build the policy-retrieval query the RAG path uses
+
+    Exposed so callers that batch vector searches (the orchestrator) can
+    retrieve the same context up front and pass it in.
+    """
+    return f"{drug} {_format_diagnoses(diagnoses)} treatment criteria requirements"
+
+
 def check_clinical_eligibility(
     patient_id: str,
     patient_data: Dict[str, Any],
     drug: str,
     policy_criteria: str,
     use_rag: bool = True,
+    use_cache: bool = True,
+    policy_context_results: Optional[List[Dict[str, Any]]] = None,
 ) -> EligibilityResult:
     """
     Check if patient meets clinical eligibility criteria using LLM reasoning
-    
+
     Args:
         patient_id: Patient identifier
         patient_data: Patient clinical data
         drug: Requested drug
         policy_criteria: Insurance policy eligibility criteria
         use_rag: Whether to use RAG (retrieve policy context)
-        
+        use_cache: Whether to serve repeat checks from the result cache
+        policy_context_results: Pre-retrieved policy search results; when
+            given, the RAG path skips its own vector search
+
     Returns:
         EligibilityResult with determination
     """
-    logger.info(f"Checking eligibility for patient {patient_id}, drug {drug}")
-    
+    logger.info("Checking eligibility for patient %s, drug %s", patient_id, drug)
+
+    cache_key = _eligibility_cache_key(patient_id, patient_data, drug, policy_criteria, use_rag)
+    if use_cache:
+        cached = _eligibility_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Eligibility cache hit for patient %s, drug %s", patient_id, drug)
+            return cached
+
     # Get LLM client
     llm_client = get_llm_client()
     
@@ -84,15 +135,17 @@ def check_clinical_eligibility(
     # Retrieve policy context if RAG enabled
     policy_context = ""
     if use_rag:
-        logger.info(f"Retrieving policy context for {drug}...")
-        vector_manager = get_vector_manager()
-        
-        search_query = f"{drug} {diagnoses} treatment criteria requirements"
-        search_results = vector_manager.search(search_query, top_k=3)
-        
+        search_results = policy_context_results
+        if search_results is None:
+            logger.info("Retrieving policy context for %s...", drug)
+            vector_manager = get_vector_manager()
+
+            search_query = f"{drug} {diagnoses} treatment criteria requirements"
+            search_results = vector_manager.search(search_query, top_k=3)
+
         if search_results:
             policy_context = _format_policy_context(search_results)
-            logger.info(f"Retrieved {len(search_results)} policy context chunks")
+            logger.info("Using %d policy context chunks", len(search_results))
     
     # Build prompt
     prompt = get_rag_enhanced_prompt(
@@ -112,23 +165,39 @@ def check_clinical_eligibility(
         specific_requirements=policy_criteria,
     )
     
-    # Call LLM
+    # Call LLM (streamed so parsing overlaps with network reception)
     logger.info("Calling LLM for clinical reasoning...")
     try:
-        llm_response = llm_client.call(
+        early_parsed: Dict[str, Any] = {}
+        buffer_parts: List[str] = []
+
+        def _parse_incrementally(delta: str):
+            """Parse the response as soon as a complete JSON object has streamed in"""
+            if early_parsed:
+                return
+            buffer_parts.append(delta)
+            buffered = "".join(buffer_parts)
+            if "{" in buffered and buffered.count("{") == buffered.count("}"):
+                try:
+                    early_parsed.update(llm_client.parse_json_response(buffered))
+                except ValueError:
+                    pass
+
+        llm_response = llm_client.call_streaming(
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.1,  # Low temp for consistent reasoning
             max_tokens=1000,
+            on_delta=_parse_incrementally,
         )
-        
-        # Parse response
+
+        # Full response kept for audit logging; reuse the incremental parse
         response_content = llm_response["content"]
-        parsed_response = llm_client.parse_json_response(response_content)
+        parsed_response = early_parsed or llm_client.parse_json_response(response_content)
         
-        logger.info(f"LLM response: {parsed_response}")
+        logger.info("LLM response: %s", parsed_response)
         
         # Extract fields
         meets_criteria = parsed_response.get("meets_criteria", False)
@@ -151,50 +220,80 @@ def check_clinical_eligibility(
             }
         )
         
-        logger.info(f"Eligibility check complete: {recommendation} (confidence: {confidence_score})")
+        _eligibility_cache.put(cache_key, result)
+        logger.info("Eligibility check complete: %s (confidence: %s)", recommendation, confidence_score)
         return result
         
     except Exception as e:
-        logger.error(f"LLM call failed: {e}")
+        logger.error("LLM call failed: %s", e)
         raise
 
 
 def _format_treatment_history(treatment_history: List[Dict[str, Any]]) -> str:
     """Format treatment history for prompt"""
-    if not treatment_history:
+    return _format_treatment_history_cached(
+        tuple(
+            (t.get("drug", "Unknown"), t.get("duration_months", "Unknown"), t.get("outcome", "Unknown"))
+            for t in treatment_history
+        )
+    )
+
+
+@lru_cache(maxsize=4096)
+def _format_treatment_history_cached(treatments: Tuple[Tuple[str, Any, str], ...]) -> str:
+    """Format a hashable treatment history tuple (memoized across workflow phases)"""
+    if not treatments:
         return "No prior treatment history available"
-    
+
     lines = []
-    for i, treatment in enumerate(treatment_history, 1):
-        drug = treatment.get("drug", "Unknown")
-        months = treatment.get("duration_months", "Unknown")
-        outcome = treatment.get("outcome", "Unknown")
+    for i, (drug, months, outcome) in enumerate(treatments, 1):
         lines.append(f"{i}. {drug}: {months} months, outcome: {outcome}")
-    
+
     return "\n".join(lines)
 
 
 def _format_diagnoses(diagnoses: List[Dict[str, str]]) -> str:
     """Format diagnoses for prompt"""
+    return _format_diagnoses_cached(
+        tuple((d.get("name"), d.get("icd10", "N/A")) for d in diagnoses)
+    )
+
+
+@lru_cache(maxsize=4096)
+def _format_diagnoses_cached(diagnoses: Tuple[Tuple[str, str], ...]) -> str:
+    """Format a hashable diagnoses tuple (memoized across workflow phases)"""
     if not diagnoses:
         return "No diagnoses recorded"
-    
-    return ", ".join([f"{d.get('name')} ({d.get('icd10', 'N/A')})" for d in diagnoses])
+
+    return ", ".join([f"{name} ({icd10})" for name, icd10 in diagnoses])
 
 
 def _format_policy_context(search_results: List[Dict[str, Any]]) -> str:
     """Format retrieved policy context"""
-    if not search_results:
+    # The vector store returns the same passages repeatedly for repeat drugs,
+    # so truncate eagerly and memoize the formatted block per result set.
+    return _format_policy_context_cached(
+        tuple(
+            (
+                r.get("text", "")[:300],
+                r.get("metadata", {}).get("plan", "Unknown"),
+                r.get("metadata", {}).get("drug", "Unknown"),
+                r.get("similarity", 0),
+            )
+            for r in search_results
+        )
+    )
+
+
+@lru_cache(maxsize=1024)
+def _format_policy_context_cached(results: Tuple[Tuple[str, str, str, float], ...]) -> str:
+    """Format a hashable policy context tuple (memoized across LLM calls)"""
+    if not results:
         return ""
-    
+
     lines = ["Retrieved Policy Context:"]
-    for i, result in enumerate(search_results, 1):
-        text = result.get("text", "")[:300]  # Truncate
-        plan = result.get("metadata", {}).get("plan", "Unknown")
-        drug = result.get("metadata", {}).get("drug", "Unknown")
-        similarity = result.get("similarity", 0)
-        
+    for i, (text, plan, drug, similarity) in enumerate(results, 1):
         lines.append(f"\n[Context {i} - {plan}/{drug} ({similarity:.2%} match)]")
         lines.append(text + "...")
-    
+
     return "\n".join(lines)
@@ -3,12 +3,112 @@ Monitoring Integration for Clinical Modules
 Tracks clinical operations with Langfuse and LogFire
 """
 import logging
+import queue
+import threading
 from typing import Dict, Any, Optional
 from app.core.prompt_tracker import get_prompt_tracker
 from app.core.monitoring import get_langfuse_client
 
 logger = logging.getLogger(__name__)
 
+# Tracing is configured once at import (monitoring.py builds the client at
+# module load); when disabled, track_* functions skip payload construction
+# entirely instead of re-checking the client per workflow phase.
+_TRACING_ENABLED = get_langfuse_client() is not None
+
+# Background trace publishing: track_* functions enqueue payloads and return
+# immediately instead of blocking the request path on Langfuse network I/O.
+_TRACE_QUEUE_MAXSIZE = 10000
+_TRACE_BATCH_SIZE = 50
+_TRACE_BATCH_WAIT_SECONDS = 0.25
+
+_trace_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=_TRACE_QUEUE_MAXSIZE)
+_trace_worker: Optional[threading.Thread] = None
+_trace_worker_lock = threading.Lock()
+_dropped_traces = 0
+
+
+def _trace_worker_loop():
+    """Drain the trace queue in batches, flushing once per batch"""
+    while True:
+        batch = [_trace_queue.get()]
+        try:
+            while len(batch) < _TRACE_BATCH_SIZE:
+                batch.append(_trace_queue.get(timeout=_TRACE_BATCH_WAIT_SECONDS))
+        except queue.Empty:
+            pass
+
+        langfuse_client = get_langfuse_client()
+        if not langfuse_client:
+            continue
+
+        try:
+            for payload in batch:
+                trace = langfuse_client.trace(
+                    name=payload["name"],
+                    input=payload["input"],
+                )
+                trace.update(
+                    output=payload["output"],
+                    level="DEFAULT",
+                )
+            langfuse_client.flush()
+        except Exception as e:
+            logger.error("Failed to publish trace batch: %s", e)
+
+
+def _enqueue_trace(name: str, input_data: Dict[str, Any], output: Dict[str, Any]):
+    """Queue a trace payload for background publishing (non-blocking)"""
+    global _trace_worker, _dropped_traces
+
+    if not _TRACING_ENABLED:
+        return
+
+    if _trace_worker is None:
+        with _trace_worker_lock:
+            if _trace_worker is None:
+                _trace_worker = threading.Thread(
+                    target=_trace_worker_loop,
+                    name="langfuse-trace-worker",
+                    daemon=True,
+                )
+                _trace_worker.start()
+
+    try:
+        _trace_queue.put_nowait({"name": name, "input": input_data, "output": output})
+    except queue.Full:
+        _dropped_traces += 1
+        logger.warning("Trace queue full, dropped trace (%d dropped total)", _dropped_traces)
+
+
+def flush_workflow_traces():
+    """
+    Flush buffered Langfuse traces once at the end of a workflow
+
+    Individual track_* functions only buffer their traces; calling this once
+    per workflow replaces the former per-phase flush() round trips.
+    """
+    langfuse_client = get_langfuse_client()
+    if not langfuse_client:
+        return
+    try:
+        langfuse_client.flush()
+    except Exception as e:
+        logger.error("Failed to flush workflow traces: %s", e)
+
+
+# Pre-built payload templates: the trace shapes are fixed per tracker, so a
+# dict.copy() of a template is cheaper than rebuilding dict literals per call.
+_PATIENT_DRUG_INPUT_TMPL = {"patient_id": None, "drug": None}
+_PA_INPUT_TMPL = {"patient_id": None, "drug": None, "form_id": None}
+_ELIGIBILITY_OUTPUT_TMPL = {"meets_criteria": None, "confidence_score": None, "recommendation": None}
+_PA_OUTPUT_TMPL = {"narrative_generated": None, "content_length": None}
+_BENEFIT_OUTPUT_TMPL = {"covered": None, "pa_required": None, "tier": None, "copay": None}
+_POLICY_INPUT_TMPL = {"drug": None}
+_POLICY_OUTPUT_TMPL = {"policies_found": None, "search_time_ms": None}
+_WORKFLOW_INPUT_TMPL = {"workflow_id": None, "patient_id": None, "drug": None}
+_WORKFLOW_OUTPUT_TMPL = {"recommendation": None, "phases_completed": None, "total_phases": None}
+
 
 def track_clinical_eligibility_prompt(
     patient_id: str,
@@ -19,45 +119,39 @@ def track_clinical_eligibility_prompt(
 ):
     """Track clinical eligibility assessment prompt execution"""
     try:
+        inp = _PATIENT_DRUG_INPUT_TMPL.copy()
+        inp["patient_id"] = patient_id
+        inp["drug"] = drug
+
         tracker = get_prompt_tracker()
         tracker.track_prompt_execution(
             prompt_name="clinical_eligibility_assessment",
             prompt_type="clinical_qualification",
-            input_data={
-                "patient_id": patient_id,
-                "drug": drug,
-            },
+            input_data=inp,
             output=llm_response,
             metrics=metrics,
             variant=None
         )
-        
-        # Also log assessment result to Langfuse
-        langfuse_client = get_langfuse_client()
-        if langfuse_client:
-            trace = langfuse_client.trace(
+
+        # Also log assessment result to Langfuse (published in the background)
+        if _TRACING_ENABLED:
+            out = _ELIGIBILITY_OUTPUT_TMPL.copy()
+            out["meets_criteria"] = eligibility_assessment.get("meets_criteria")
+            out["confidence_score"] = eligibility_assessment.get("confidence_score")
+            out["recommendation"] = eligibility_assessment.get("recommendation")
+
+            _enqueue_trace(
                 name="clinical_eligibility_result",
-                input={
-                    "patient_id": patient_id,
-                    "drug": drug,
-                }
-            )
-            trace.update(
-                output={
-                    "meets_criteria": eligibility_assessment.get("meets_criteria"),
-                    "confidence_score": eligibility_assessment.get("confidence_score"),
-                    "recommendation": eligibility_assessment.get("recommendation"),
-                },
-                level="DEFAULT",
+                input_data=inp,
+                output=out,
             )
-            langfuse_client.flush()
         
         logger.info(
             f"Clinical eligibility tracked | Patient: {patient_id} | Drug: {drug} | "
             f"Meets Criteria: {eligibility_assessment.get('meets_criteria')}"
         )
     except Exception as e:
-        logger.error(f"Failed to track clinical eligibility: {e}")
+        logger.error("Failed to track clinical eligibility: %s", e)
 
 
 def track_prior_authorization_prompt(
@@ -69,46 +163,39 @@ def track_prior_authorization_prompt(
 ):
     """Track prior authorization form generation prompt execution"""
     try:
+        inp = _PA_INPUT_TMPL.copy()
+        inp["patient_id"] = patient_id
+        inp["drug"] = drug
+        inp["form_id"] = pa_form_id
+
         tracker = get_prompt_tracker()
         tracker.track_prompt_execution(
             prompt_name="prior_authorization_narrative",
             prompt_type="prior_authorization",
-            input_data={
-                "patient_id": patient_id,
-                "drug": drug,
-                "form_id": pa_form_id,
-            },
+            input_data=inp,
             output=llm_response,
             metrics=metrics,
             variant=None
         )
-        
-        # Log to Langfuse
-        langfuse_client = get_langfuse_client()
-        if langfuse_client:
-            trace = langfuse_client.trace(
+
+        # Log to Langfuse (published in the background)
+        if _TRACING_ENABLED:
+            out = _PA_OUTPUT_TMPL.copy()
+            out["narrative_generated"] = bool(llm_response)
+            out["content_length"] = len(llm_response)
+
+            _enqueue_trace(
                 name="prior_authorization_generation",
-                input={
-                    "patient_id": patient_id,
-                    "drug": drug,
-                    "form_id": pa_form_id,
-                }
-            )
-            trace.update(
-                output={
-                    "narrative_generated": bool(llm_response),
-                    "content_length": len(llm_response),
-                },
-                level="DEFAULT",
+                input_data=inp,
+                output=out,
             )
-            langfuse_client.flush()
         
         logger.info(
             f"PA narrative tracked | Form: {pa_form_id} | Drug: {drug} | "
             f"Content Length: {len(llm_response)} chars"
         )
     except Exception as e:
-        logger.error(f"Failed to track prior authorization prompt: {e}")
+        logger.error("Failed to track prior authorization prompt: %s", e)
 
 
 def track_benefit_verification_check(
@@ -117,33 +204,31 @@ def track_benefit_verification_check(
     coverage_result: Dict[str, Any]
 ):
     """Track benefit verification check results"""
+    if not _TRACING_ENABLED:
+        return
     try:
-        langfuse_client = get_langfuse_client()
-        if langfuse_client:
-            trace = langfuse_client.trace(
-                name="benefit_verification",
-                input={
-                    "patient_id": patient_id,
-                    "drug": drug,
-                }
-            )
-            trace.update(
-                output={
-                    "covered": coverage_result.get("covered"),
-                    "pa_required": coverage_result.get("pa_required"),
-                    "tier": coverage_result.get("tier"),
-                    "copay": coverage_result.get("estimated_copay"),
-                },
-                level="DEFAULT",
-            )
-            langfuse_client.flush()
+        inp = _PATIENT_DRUG_INPUT_TMPL.copy()
+        inp["patient_id"] = patient_id
+        inp["drug"] = drug
+
+        out = _BENEFIT_OUTPUT_TMPL.copy()
+        out["covered"] = coverage_result.get("covered")
+        out["pa_required"] = coverage_result.get("pa_required")
+        out["tier"] = coverage_result.get("tier")
+        out["copay"] = coverage_result.get("estimated_copay")
+
+        _enqueue_trace(
+            name="benefit_verification",
+            input_data=inp,
+            output=out,
+        )
         
         logger.info(
             f"Benefit verification tracked | Patient: {patient_id} | Drug: {drug} | "
             f"Covered: {coverage_result.get('covered')}"
         )
     except Exception as e:
-        logger.error(f"Failed to track benefit verification: {e}")
+        logger.error("Failed to track benefit verification: %s", e)
 
 
 def track_policy_search(
@@ -152,29 +237,27 @@ def track_policy_search(
     search_metrics: Dict[str, Any]
 ):
     """Track policy search results"""
+    if not _TRACING_ENABLED:
+        return
     try:
-        langfuse_client = get_langfuse_client()
-        if langfuse_client:
-            trace = langfuse_client.trace(
-                name="policy_search",
-                input={
-                    "drug": drug,
-                }
-            )
-            trace.update(
-                output={
-                    "policies_found": policies_found,
-                    "search_time_ms": search_metrics.get("latency_ms"),
-                },
-                level="DEFAULT",
-            )
-            langfuse_client.flush()
+        inp = _POLICY_INPUT_TMPL.copy()
+        inp["drug"] = drug
+
+        out = _POLICY_OUTPUT_TMPL.copy()
+        out["policies_found"] = policies_found
+        out["search_time_ms"] = search_metrics.get("latency_ms")
+
+        _enqueue_trace(
+            name="policy_search",
+            input_data=inp,
+            output=out,
+        )
         
         logger.info(
             f"Policy search tracked | Drug: {drug} | Policies Found: {policies_found}"
         )
     except Exception as e:
-        logger.error(f"Failed to track policy search: {e}")
+        logger.error("Failed to track policy search: %s", e)
 
 
 def track_orchestrator_workflow(
@@ -185,29 +268,27 @@ def track_orchestrator_workflow(
     phase_results: Dict[str, Any]
 ):
     """Track complete orchestrator workflow execution"""
+    if not _TRACING_ENABLED:
+        return
     try:
-        langfuse_client = get_langfuse_client()
-        if langfuse_client:
-            trace = langfuse_client.trace(
-                name="orchestrator_workflow",
-                input={
-                    "workflow_id": workflow_id,
-                    "patient_id": patient_id,
-                    "drug": drug,
-                }
-            )
-            trace.update(
-                output={
-                    "recommendation": final_recommendation,
-                    "phases_completed": len([p for p in phase_results.values() if p]),
-                    "total_phases": len(phase_results),
-                },
-                level="DEFAULT",
-            )
-            langfuse_client.flush()
+        inp = _WORKFLOW_INPUT_TMPL.copy()
+        inp["workflow_id"] = workflow_id
+        inp["patient_id"] = patient_id
+        inp["drug"] = drug
+
+        out = _WORKFLOW_OUTPUT_TMPL.copy()
+        out["recommendation"] = final_recommendation
+        out["phases_completed"] = len([p for p in phase_results.values() if p])
+        out["total_phases"] = len(phase_results)
+
+        _enqueue_trace(
+            name="orchestrator_workflow",
+            input_data=inp,
+            output=out,
+        )
         
         logger.info(
             f"Workflow tracked | ID: {workflow_id} | Recommendation: {final_recommendation}"
         )
     except Exception as e:
-        logger.error(f"Failed to track orchestrator workflow: {e}")
+        logger.error("Failed to track orchestrator workflow: %s", e)
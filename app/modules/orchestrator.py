@@ -2,36 +2,97 @@
 Orchestrator Module - Phase 6
 Unified workflow that chains all phases (2-5) into a single end-to-end process
 """
+import asyncio
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Sequence
 from uuid import uuid4
 
+from sqlalchemy import select
+
 from app.modules.benefit_verification import check_coverage
-from app.modules.clinical_qualification import check_clinical_eligibility
-from app.modules.prior_authorization import PriorAuthorizationGenerator
+from app.modules.clinical_qualification import build_rag_search_query, check_clinical_eligibility
+from app.modules._policy_cache import QueryCache
+from app.modules.monitoring_integration import flush_workflow_traces
+from app.modules.prior_authorization import get_pa_generator
 from app.data.database import get_db_context
 from app.data.db_models import Patient
-from app.data.vector_index import VectorIndexManager
+from app.data.schemas import PatientSnapshot
+from app.data.vector_index import get_vector_manager
 
 logger = logging.getLogger(__name__)
 
+# Patient columns the workflow needs; shared by the single and batch fetch paths
+_PATIENT_COLUMNS = (
+    Patient.patient_id,
+    Patient.name,
+    Patient.age,
+    Patient.gender,
+    Patient.diagnoses,
+    Patient.labs,
+    Patient.treatment_history,
+    Patient.insurance_plan,
+    Patient.date_of_birth,
+    Patient.member_id,
+)
+
+# Recommendation lookup indexed by
+# (coverage_ok << 3) | (covered << 2) | (eligibility_ok << 1) | meets_criteria.
+# Coverage failure or non-coverage always denies; a covered drug with a failed
+# eligibility check goes to review; only covered + criteria met approves.
+_RECS = (
+    "DENY", "DENY", "DENY", "DENY",        # coverage check failed
+    "DENY", "DENY", "DENY", "DENY",        # coverage check failed
+    "DENY", "DENY", "DENY", "DENY",        # coverage ok, drug not covered
+    "REVIEW", "REVIEW", "DENY", "APPROVE", # covered; keyed on eligibility
+)
+
+
+def _new_workflow_id(patient_id: str, drug: str) -> str:
+    """
+    Build a workflow tag without constructing a datetime object;
+    the random suffix guarantees uniqueness within the same second
+    """
+    timestamp = time.strftime("%Y%m%d%H%M%S", time.gmtime())
+    return f"WF_{timestamp}_{patient_id}_{drug.upper()}_{uuid4().hex[:8]}"
+
 
 class PrescriptionOrchestrator:
     """Orchestrates the complete prescription processing workflow (Phases 2-5)"""
     
     def __init__(self):
         """Initialize orchestrator with required modules"""
-        self.pa_generator = PriorAuthorizationGenerator()
-        self.vector_index = VectorIndexManager()
+        # Shared singletons: per-request orchestrator construction must not
+        # rebuild the LLM client or reload the vector index
+        self.pa_generator = get_pa_generator()
+        self.vector_index = get_vector_manager()
+        # Pool for running independent phases (coverage check, policy search)
+        # concurrently; both are I/O-bound and release the GIL
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="orchestrator")
+        # Separate pool for batch fan-out; batch items wait on phase futures,
+        # so sharing one pool could starve the phases and deadlock
+        self._batch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="orchestrator-batch")
+        # Policy search results per drug; invalidate() after index rebuilds
+        self._policy_cache = QueryCache(max_size=512, ttl_seconds=300)
         logger.info("Orchestrator initialized")
+
+    def close(self) -> None:
+        """Shut down the orchestrator's worker pools (app shutdown)"""
+        self._pool.shutdown(wait=False)
+        self._batch_pool.shutdown(wait=False)
+        logger.info("Orchestrator pools shut down")
     
     def process_prescription(
         self,
         patient_id: str,
         drug: str,
         provider_name: str = "Dr. Unknown",
-        npi: str = "0000000000"
+        npi: str = "0000000000",
+        stream_pa_form: bool = False
     ) -> Dict[str, Any]:
         """
         End-to-end prescription processing workflow
@@ -47,157 +108,492 @@ class PrescriptionOrchestrator:
             drug: Requested drug name
             provider_name: Prescribing provider name
             npi: Provider NPI
-        
+            stream_pa_form: When True, phase 5 returns an iterator of form
+                snapshots under "form_stream" instead of a finished form
+
         Returns:
             Complete workflow result with all phase outputs
         """
-        workflow_id = f"WF_{datetime.now().strftime('%Y%m%d%H%M%S')}_{patient_id}_{drug.upper()}"
-        
-        logger.info(f"[ORCHESTRATOR] Starting workflow: {workflow_id}")
+        workflow_id = _new_workflow_id(patient_id, drug)
+
+        logger.info("[ORCHESTRATOR] Starting workflow: %s", workflow_id)
         
         try:
-            # Fetch patient data
+            # One session covers the patient fetch and the coverage check;
+            # it is released before any LLM latency is incurred
             with get_db_context() as session:
-                patient = session.query(Patient).filter(Patient.patient_id == patient_id).first()
-                if not patient:
+                # Fetch patient data (column-level select: no ORM instance
+                # construction, only the fields the workflow uses)
+                row = session.execute(
+                    select(*_PATIENT_COLUMNS).where(Patient.patient_id == patient_id)
+                ).first()
+                if not row:
                     return self._error_response(workflow_id, f"Patient {patient_id} not found")
-                
-                patient_dict = {
-                    "patient_id": patient.patient_id,
-                    "name": patient.name,
-                    "age": patient.age,
-                    "gender": patient.gender,
-                    "diagnoses": patient.diagnoses,
-                    "labs": patient.labs,
-                    "treatment_history": patient.treatment_history,
-                    "insurance_plan": patient.insurance_plan,
-                }
-            
-            # ============ PHASE 2: Coverage Verification ============
-            logger.info(f"[ORCHESTRATOR] Phase 2: Checking coverage for {drug}...")
-            coverage_result = self._phase2_coverage_check(patient_dict, drug)
-            
-            if not coverage_result["covered"]:
-                logger.info(f"[ORCHESTRATOR] Drug not covered, workflow complete")
-                return {
-                    "workflow_id": workflow_id,
-                    "status": "completed",
-                    "result": "not_covered",
-                    "phases": {
-                        "phase2_coverage": coverage_result,
-                        "phase3_policy_search": None,
-                        "phase4_eligibility": None,
-                        "phase5_pa_form": None
-                    },
-                    "recommendation": "DENY",
-                    "reason": f"{drug} is not covered under {patient_dict['insurance_plan']}"
-                }
-            
-            # ============ PHASE 3: Policy Search ============
-            logger.info(f"[ORCHESTRATOR] Phase 3: Searching for relevant policies...")
-            policy_result = self._phase3_policy_search(drug)
-            
-            # Build policy criteria from search results
-            policy_criteria = self._extract_policy_criteria(policy_result)
-            
-            # ============ PHASE 4: Clinical Eligibility ============
-            logger.info(f"[ORCHESTRATOR] Phase 4: Checking clinical eligibility...")
-            eligibility_result = self._phase4_eligibility_check(
-                patient_dict=patient_dict,
-                drug=drug,
-                policy_criteria=policy_criteria
+
+                snapshot = PatientSnapshot.from_mapping(row._mapping)
+
+                # ============ PHASE 2 + 3: Coverage Verification & Policy Search ============
+                # Phase 3 needs no DB, so it runs on the pool while the
+                # coverage check reuses this session on the request thread
+                logger.info("[ORCHESTRATOR] Phase 2: Checking coverage for %s...", drug)
+                logger.info("[ORCHESTRATOR] Phase 3: Searching for relevant policies...")
+                policy_future = self._pool.submit(
+                    self._phase3_policy_search, drug,
+                    build_rag_search_query(drug, snapshot.diagnoses)
+                )
+                coverage_result = self._phase2_coverage_check(snapshot, drug, session=session)
+
+            return self._complete_workflow(
+                workflow_id, snapshot, drug, provider_name, npi,
+                coverage_result, policy_future, stream_pa_form
             )
-            
-            # ============ PHASE 5: PA Form Generation ============
-            logger.info(f"[ORCHESTRATOR] Phase 5: Generating PA form...")
-            pa_form_result = self._phase5_pa_generation(
+
+        except Exception as e:
+            logger.error("[ORCHESTRATOR] Workflow failed: %s", e)
+            return self._error_response(workflow_id, str(e))
+        finally:
+            # Single flush per workflow instead of one per tracked phase
+            flush_workflow_traces()
+
+    async def process_prescription_async(
+        self,
+        patient_id: str,
+        drug: str,
+        provider_name: str = "Dr. Unknown",
+        npi: str = "0000000000"
+    ) -> Dict[str, Any]:
+        """
+        Async entry point for the prescription workflow
+
+        The pipeline itself is synchronous (sync SQLAlchemy engine, sync LLM
+        SDK), so the workflow runs on the orchestrator's pool; awaiting the
+        future keeps the event loop free, letting many workflows overlap
+        under an async server instead of serializing behind one blocked loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._batch_pool,
+            partial(
+                self.process_prescription,
                 patient_id=patient_id,
                 drug=drug,
-                eligibility_result=eligibility_result,
                 provider_name=provider_name,
-                npi=npi
+                npi=npi,
+            ),
+        )
+
+    def process_prescription_stream(
+        self,
+        patient_id: str,
+        drug: str,
+        provider_name: str = "Dr. Unknown",
+        npi: str = "0000000000"
+    ):
+        """
+        Run the workflow, yielding one event dict per completed phase
+
+        The coverage result is available within milliseconds while the LLM
+        phases are still running, so streaming callers can surface progress
+        immediately. The last event is "workflow_complete" carrying the same
+        payload process_prescription returns.
+        """
+        workflow_id = _new_workflow_id(patient_id, drug)
+
+        logger.info("[ORCHESTRATOR] Starting streaming workflow: %s", workflow_id)
+
+        try:
+            with get_db_context() as session:
+                row = session.execute(
+                    select(*_PATIENT_COLUMNS).where(Patient.patient_id == patient_id)
+                ).first()
+                if not row:
+                    yield {"event": "error", **self._error_response(workflow_id, f"Patient {patient_id} not found")}
+                    return
+
+                snapshot = PatientSnapshot.from_mapping(row._mapping)
+
+                policy_future = self._pool.submit(
+                    self._phase3_policy_search, drug,
+                    build_rag_search_query(drug, snapshot.diagnoses)
+                )
+                coverage_result = self._phase2_coverage_check(snapshot, drug, session=session)
+
+            for event, payload in self._workflow_events(
+                workflow_id, snapshot, drug, provider_name, npi,
+                coverage_result, policy_future
+            ):
+                if event == "result":
+                    yield {"event": "workflow_complete", "data": payload}
+                else:
+                    yield {"event": event, "workflow_id": workflow_id, "data": payload}
+
+        except Exception as e:
+            logger.error("[ORCHESTRATOR] Streaming workflow failed: %s", e)
+            yield {"event": "error", **self._error_response(workflow_id, str(e))}
+        finally:
+            flush_workflow_traces()
+
+    def process_prescription_batch(
+        self,
+        items: Sequence[Sequence]
+    ) -> List[Dict[str, Any]]:
+        """
+        Process many prescriptions in one call (nightly re-adjudication,
+        batch refill PAs)
+
+        Shared work is batched up front: one IN-query fetches every patient,
+        and one vector-index call warms the policy cache for all requested
+        drugs. Items then run concurrently; narrative LLM calls coalesce in
+        the micro-batcher. Failures are isolated per item.
+
+        Args:
+            items: Sequences of (patient_id, drug[, provider_name[, npi]])
+
+        Returns:
+            One workflow result per item, in input order
+        """
+        if not items:
+            return []
+
+        normalized = [
+            (tuple(item) + ("Dr. Unknown", "0000000000"))[:4] for item in items
+        ]
+
+        logger.info("[ORCHESTRATOR] Starting batch of %d workflows", len(normalized))
+
+        # One round-trip for all patients in the batch
+        patient_ids = {patient_id for patient_id, _, _, _ in normalized}
+        with get_db_context() as session:
+            rows = session.execute(
+                select(*_PATIENT_COLUMNS).where(Patient.patient_id.in_(patient_ids))
+            ).all()
+            patients = {
+                row.patient_id: PatientSnapshot.from_mapping(row._mapping) for row in rows
+            }
+
+        # One batched vector search for all drugs not already cached
+        self._warm_policy_cache({drug for _, drug, _, _ in normalized})
+
+        try:
+            futures = [
+                self._batch_pool.submit(
+                    self._process_batch_item, item, patients.get(item[0])
+                )
+                for item in normalized
+            ]
+            return [future.result() for future in futures]
+        finally:
+            flush_workflow_traces()
+
+    def _process_batch_item(
+        self,
+        item: tuple,
+        snapshot: PatientSnapshot
+    ) -> Dict[str, Any]:
+        """Run one batch item with per-item error isolation"""
+        patient_id, drug, provider_name, npi = item
+        workflow_id = _new_workflow_id(patient_id, drug)
+        try:
+            if snapshot is None:
+                return self._error_response(workflow_id, f"Patient {patient_id} not found")
+            return self._run_workflow(workflow_id, snapshot, drug, provider_name, npi)
+        except Exception as e:
+            logger.error("[ORCHESTRATOR] Batch item failed (%s, %s): %s", patient_id, drug, e)
+            return self._error_response(workflow_id, str(e))
+
+    def _warm_policy_cache(self, drugs) -> None:
+        """Batch-search policies for any drugs missing from the cache"""
+        pending = [
+            drug for drug in drugs
+            if self._policy_cache.get(drug.strip().lower()) is None
+        ]
+        if not pending:
+            return
+
+        try:
+            batches = self.vector_index.batch_search(pending, top_k=3)
+        except Exception as e:
+            logger.error("Batch policy search failed: %s", e)
+            return
+
+        for drug, results in zip(pending, batches):
+            self._policy_cache.put(
+                drug.strip().lower(),
+                {
+                    "drug": drug,
+                    "policies_found": len(results),
+                    "results": results,
+                    "status": "success"
+                }
             )
-            
-            # ============ Determine Overall Recommendation ============
-            recommendation = self._determine_recommendation(
-                coverage_result,
-                eligibility_result
+
+    def _run_workflow(
+        self,
+        workflow_id: str,
+        snapshot: PatientSnapshot,
+        drug: str,
+        provider_name: str,
+        npi: str,
+        stream_pa_form: bool = False
+    ) -> Dict[str, Any]:
+        """Run phases 2-5 for an already-fetched patient (batch path)"""
+        # ============ PHASE 2 + 3: Coverage Verification & Policy Search ============
+        # Phase 3 only depends on the drug, so it runs concurrently with
+        # the coverage check instead of waiting for it
+        logger.info("[ORCHESTRATOR] Phase 2: Checking coverage for %s...", drug)
+        logger.info("[ORCHESTRATOR] Phase 3: Searching for relevant policies...")
+        policy_future = self._pool.submit(
+            self._phase3_policy_search, drug,
+            build_rag_search_query(drug, snapshot.diagnoses)
+        )
+        coverage_result = self._phase2_coverage_check(snapshot, drug)
+
+        return self._complete_workflow(
+            workflow_id, snapshot, drug, provider_name, npi,
+            coverage_result, policy_future, stream_pa_form
+        )
+
+    def _complete_workflow(
+        self,
+        workflow_id: str,
+        snapshot: PatientSnapshot,
+        drug: str,
+        provider_name: str,
+        npi: str,
+        coverage_result: Dict[str, Any],
+        policy_future,
+        stream_pa_form: bool = False
+    ) -> Dict[str, Any]:
+        """Run the LLM-bound phases (4-5) and compile the workflow result"""
+        result = None
+        for event, payload in self._workflow_events(
+            workflow_id, snapshot, drug, provider_name, npi,
+            coverage_result, policy_future, stream_pa_form
+        ):
+            if event == "result":
+                result = payload
+        return result
+
+    def _workflow_events(
+        self,
+        workflow_id: str,
+        snapshot: PatientSnapshot,
+        drug: str,
+        provider_name: str,
+        npi: str,
+        coverage_result: Dict[str, Any],
+        policy_future,
+        stream_pa_form: bool = False
+    ):
+        """Run phases 2-5, yielding (event_name, payload) as each completes
+
+        The final item is always ("result", workflow_result); streaming
+        callers forward the intermediate events, blocking callers keep only
+        the last one.
+        """
+        patient_id = snapshot.patient_id
+
+        yield "phase2_coverage", coverage_result
+
+        if not coverage_result["covered"]:
+            policy_future.cancel()
+            logger.info("[ORCHESTRATOR] Drug not covered, workflow complete")
+            yield "result", {
+                "workflow_id": workflow_id,
+                "status": "completed",
+                "result": "not_covered",
+                "phases": {
+                    "phase2_coverage": coverage_result,
+                    "phase3_policy_search": None,
+                    "phase4_eligibility": None,
+                    "phase5_pa_form": None
+                },
+                "recommendation": "DENY",
+                "reason": f"{drug} is not covered under {snapshot.insurance_plan}"
+            }
+            return
+        
+        if not coverage_result.get("pa_required"):
+            # Covered with no PA requirement: the plan itself encodes the
+            # approval, so phases 4-5 need no LLM. Eligibility is synthesized
+            # with status "skipped" and the form narrative is deterministic.
+            policy_future.cancel()
+            logger.info("[ORCHESTRATOR] No PA required, auto-approving without LLM phases")
+
+            eligibility_result = {
+                "status": "skipped",
+                "meets_criteria": True,
+                "confidence_score": 1.0,
+                "clinical_justification": "PA not required under plan",
+                "recommendation": "APPROVE"
+            }
+            yield "phase4_eligibility", eligibility_result
+
+            pa_form_result = self._phase5_auto_approval(
+                snapshot, drug, provider_name, npi
             )
-            
-            # ============ Compile Complete Workflow Result ============
-            workflow_result = {
+            yield "phase5_pa_form", pa_form_result
+
+            yield "result", {
                 "workflow_id": workflow_id,
                 "status": "completed",
-                "result": "success",
+                "result": "auto_approved",
                 "timestamp": datetime.now().isoformat(),
                 "patient": {
                     "id": patient_id,
-                    "name": patient_dict["name"],
-                    "age": patient_dict["age"],
-                    "insurance_plan": patient_dict["insurance_plan"]
+                    "name": snapshot.name,
+                    "age": snapshot.age,
+                    "insurance_plan": snapshot.insurance_plan
                 },
                 "phases": {
                     "phase2_coverage": coverage_result,
-                    "phase3_policy_search": policy_result,
+                    "phase3_policy_search": None,
                     "phase4_eligibility": eligibility_result,
                     "phase5_pa_form": pa_form_result
                 },
-                "recommendation": recommendation,
-                "summary": self._build_summary(
-                    coverage_result,
-                    eligibility_result,
-                    recommendation
-                )
+                "recommendation": "APPROVE",
+                "reason": f"{drug} is covered under {snapshot.insurance_plan} with no PA requirement"
             }
-            
-            logger.info(f"[ORCHESTRATOR] ✓ Workflow complete: {recommendation}")
-            return workflow_result
+            return
+
+        policy_result, rag_results = policy_future.result()
+        yield "phase3_policy_search", policy_result
+
+        # Build policy criteria from search results
+        policy_criteria = self._extract_policy_criteria(policy_result)
+
+        # ============ PHASE 4: Clinical Eligibility ============
+        # Phases 4 and 5 take keyed patient data; materialize the dict once
+        patient_dict = snapshot.to_dict()
+        logger.info("[ORCHESTRATOR] Phase 4: Checking clinical eligibility...")
+        eligibility_result = self._phase4_eligibility_check(
+            patient_dict=patient_dict,
+            drug=drug,
+            policy_criteria=policy_criteria,
+            policy_context_results=rag_results
+        )
+        yield "phase4_eligibility", eligibility_result
+
+        # ============ PHASE 5: PA Form Generation ============
+        logger.info("[ORCHESTRATOR] Phase 5: Generating PA form...")
+        pa_form_result = self._phase5_pa_generation(
+            patient_id=patient_id,
+            drug=drug,
+            eligibility_result=eligibility_result,
+            provider_name=provider_name,
+            npi=npi,
+            patient_dict=patient_dict,
+            stream=stream_pa_form
+        )
+        yield "phase5_pa_form", pa_form_result
+
+        # ============ Determine Overall Recommendation ============
+        recommendation = self._determine_recommendation(
+            coverage_result,
+            eligibility_result
+        )
         
-        except Exception as e:
-            logger.error(f"[ORCHESTRATOR] Workflow failed: {e}")
-            return self._error_response(workflow_id, str(e))
+        # ============ Compile Complete Workflow Result ============
+        workflow_result = {
+            "workflow_id": workflow_id,
+            "status": "completed",
+            "result": "success",
+            "timestamp": datetime.now().isoformat(),
+            "patient": {
+                "id": patient_id,
+                "name": snapshot.name,
+                "age": snapshot.age,
+                "insurance_plan": snapshot.insurance_plan
+            },
+            "phases": {
+                "phase2_coverage": coverage_result,
+                "phase3_policy_search": policy_result,
+                "phase4_eligibility": eligibility_result,
+                "phase5_pa_form": pa_form_result
+            },
+            "recommendation": recommendation,
+            "summary": self._build_summary(
+                coverage_result,
+                eligibility_result,
+                recommendation
+            )
+        }
+
+        logger.info("[ORCHESTRATOR] ✓ Workflow complete: %s", recommendation)
+        yield "result", workflow_result
+
     
-    def _phase2_coverage_check(self, patient_dict: Dict[str, Any], drug: str) -> Dict[str, Any]:
-        """Phase 2: Check coverage"""
+    def _phase2_coverage_check(
+        self,
+        snapshot: PatientSnapshot,
+        drug: str,
+        session=None
+    ) -> Dict[str, Any]:
+        """Phase 2: Check coverage, reusing the caller's session when given"""
         try:
-            with get_db_context() as session:
-                result = check_coverage(patient_dict["patient_id"], drug, session)
-            
-            # Convert result to dict if needed
-            if hasattr(result, '__dict__'):
-                result_dict = vars(result)
+            if session is not None:
+                result = check_coverage(snapshot.patient_id, drug, session)
             else:
-                result_dict = result
-            
+                with get_db_context() as db:
+                    result = check_coverage(snapshot.patient_id, drug, db)
+
+            # CoverageResult is a dataclass; read its fields directly
             return {
-                "covered": result_dict.get("covered", False),
-                "pa_required": result_dict.get("pa_required", False),
-                "criteria": result_dict.get("criteria", ""),
+                "covered": result.covered,
+                "pa_required": result.pa_required,
+                "criteria": result.criteria,
                 "status": "success"
             }
         except Exception as e:
-            logger.error(f"Phase 2 failed: {e}")
+            logger.error("Phase 2 failed: %s", e)
             return {"covered": False, "status": "error", "error": str(e)}
     
-    def _phase3_policy_search(self, drug: str) -> Dict[str, Any]:
-        """Phase 3: Search for relevant policies"""
+    def _phase3_policy_search(self, drug: str, rag_query: str = None) -> tuple:
+        """Phase 3: Search for relevant policies
+
+        When a RAG query is given, the drug policy search and the phase-4
+        context retrieval run as one batched index call (single embedding
+        pass) instead of two separate traversals.
+
+        Returns:
+            (policy_result, rag_results); rag_results is None when no RAG
+            query was given or the search failed
+        """
         try:
-            results = self.vector_index.search(drug, top_k=3)
-            return {
+            cache_key = drug.strip().lower()
+            cached = self._policy_cache.get(cache_key)
+            if cached is not None:
+                rag_results = (
+                    self.vector_index.search(rag_query, top_k=3) if rag_query else None
+                )
+                return cached, rag_results
+
+            if rag_query:
+                results, rag_results = self.vector_index.batch_search(
+                    [drug, rag_query], top_k=3
+                )
+            else:
+                results = self.vector_index.search(drug, top_k=3)
+                rag_results = None
+
+            policy_result = {
                 "drug": drug,
                 "policies_found": len(results),
                 "results": results,
                 "status": "success"
             }
+            self._policy_cache.put(cache_key, policy_result)
+            return policy_result, rag_results
         except Exception as e:
-            logger.error(f"Phase 3 failed: {e}")
-            return {"policies_found": 0, "status": "error", "error": str(e)}
+            logger.error("Phase 3 failed: %s", e)
+            return {"policies_found": 0, "status": "error", "error": str(e)}, None
     
     def _phase4_eligibility_check(
         self,
         patient_dict: Dict[str, Any],
         drug: str,
-        policy_criteria: str
+        policy_criteria: str,
+        policy_context_results: List[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Phase 4: Check clinical eligibility"""
         try:
@@ -206,24 +602,20 @@ class PrescriptionOrchestrator:
                 patient_data=patient_dict,
                 drug=drug,
                 policy_criteria=policy_criteria,
-                use_rag=True
+                use_rag=True,
+                policy_context_results=policy_context_results
             )
-            
-            # Convert EligibilityResult to dict if needed
-            if hasattr(result, '__dict__'):
-                result_dict = vars(result)
-            else:
-                result_dict = result
-            
+
+            # EligibilityResult is a dataclass; read its fields directly
             return {
-                "meets_criteria": result_dict.get("meets_criteria", False),
-                "confidence_score": result_dict.get("confidence_score", 0),
-                "clinical_justification": result_dict.get("clinical_justification", ""),
-                "recommendation": result_dict.get("recommendation", "REVIEW"),
+                "meets_criteria": result.meets_criteria,
+                "confidence_score": result.confidence_score,
+                "clinical_justification": result.clinical_justification,
+                "recommendation": result.recommendation,
                 "status": "success"
             }
         except Exception as e:
-            logger.error(f"Phase 4 failed: {e}")
+            logger.error("Phase 4 failed: %s", e)
             return {"meets_criteria": False, "status": "error", "error": str(e)}
     
     def _phase5_pa_generation(
@@ -232,16 +624,38 @@ class PrescriptionOrchestrator:
         drug: str,
         eligibility_result: Dict[str, Any],
         provider_name: str,
-        npi: str
+        npi: str,
+        patient_dict: Dict[str, Any] = None,
+        stream: bool = False
     ) -> Dict[str, Any]:
         """Phase 5: Generate PA form"""
         try:
+            if stream:
+                # Hand the snapshot iterator straight to the caller; the
+                # narrative grows with each snapshot and the last one is the
+                # finished form
+                form_stream = self.pa_generator.generate_form(
+                    patient_id=patient_id,
+                    drug=drug,
+                    eligibility_result=eligibility_result,
+                    provider_name=provider_name,
+                    npi=npi,
+                    patient_data=patient_dict,
+                    stream=True
+                )
+                return {
+                    "status": "streaming",
+                    "form_stream": form_stream,
+                    "api_status": "success"
+                }
+
             form_data = self.pa_generator.generate_form(
                 patient_id=patient_id,
                 drug=drug,
                 eligibility_result=eligibility_result,
                 provider_name=provider_name,
-                npi=npi
+                npi=npi,
+                patient_data=patient_dict
             )
             
             return {
@@ -253,9 +667,37 @@ class PrescriptionOrchestrator:
                 "api_status": "success"
             }
         except Exception as e:
-            logger.error(f"Phase 5 failed: {e}")
+            logger.error("Phase 5 failed: %s", e)
             return {"status": "error", "error": str(e)}
     
+    def _phase5_auto_approval(
+        self,
+        snapshot: PatientSnapshot,
+        drug: str,
+        provider_name: str,
+        npi: str
+    ) -> Dict[str, Any]:
+        """Phase 5 fast path: deterministic form, no LLM call"""
+        try:
+            form_data = self.pa_generator.generate_auto_approval_form(
+                patient_id=snapshot.patient_id,
+                drug=drug,
+                patient_data=snapshot.to_dict(),
+                provider_name=provider_name,
+                npi=npi
+            )
+            return {
+                "form_id": form_data.get("form_id"),
+                "status": "ready_for_submission",
+                "has_clinical_narrative": True,
+                "narrative_preview": form_data.get("clinical_narrative", "")[:100] + "...",
+                "full_form": form_data,
+                "api_status": "success"
+            }
+        except Exception as e:
+            logger.error("Phase 5 auto-approval failed: %s", e)
+            return {"status": "error", "error": str(e)}
+
     def _extract_policy_criteria(self, policy_result: Dict[str, Any]) -> str:
         """Extract policy criteria from search results"""
         if policy_result.get("status") != "success" or not policy_result.get("results"):
@@ -276,17 +718,14 @@ class PrescriptionOrchestrator:
         coverage_result: Dict[str, Any],
         eligibility_result: Dict[str, Any]
     ) -> str:
-        """Determine overall recommendation"""
-        if coverage_result.get("status") != "success" or not coverage_result.get("covered"):
-            return "DENY"
-        
-        if eligibility_result.get("status") != "success":
-            return "REVIEW"
-        
-        if eligibility_result.get("meets_criteria"):
-            return "APPROVE"
-        else:
-            return "DENY"
+        """Determine overall recommendation via the bit-packed lookup table"""
+        bits = (
+            ((coverage_result.get("status") == "success") << 3)
+            | (bool(coverage_result.get("covered")) << 2)
+            | ((eligibility_result.get("status") == "success") << 1)
+            | bool(eligibility_result.get("meets_criteria"))
+        )
+        return _RECS[bits]
     
     def _build_summary(
         self,
@@ -295,22 +734,25 @@ class PrescriptionOrchestrator:
         recommendation: str
     ) -> str:
         """Build human-readable summary"""
-        lines = []
-        
-        lines.append(f"Recommendation: {recommendation}")
-        
+        parts = [f"Recommendation: {recommendation}"]
+
         if coverage_result.get("status") == "success":
-            coverage_status = "Covered" if coverage_result.get("covered") else "Not Covered"
-            pa_req = "PA Required" if coverage_result.get("pa_required") else "No PA Required"
-            lines.append(f"Coverage: {coverage_status} ({pa_req})")
-        
+            parts.append(
+                f"Coverage: {'Covered' if coverage_result.get('covered') else 'Not Covered'} "
+                f"({'PA Required' if coverage_result.get('pa_required') else 'No PA Required'})"
+            )
+
         if eligibility_result.get("status") == "success":
-            criteria_status = "Meets" if eligibility_result.get("meets_criteria") else "Does Not Meet"
             confidence = eligibility_result.get("confidence_score", 0)
-            lines.append(f"Eligibility: {criteria_status} criteria (Confidence: {confidence*100:.0f}%)")
-            lines.append(f"Clinical Justification: {eligibility_result.get('clinical_justification', 'N/A')[:150]}...")
-        
-        return "\n".join(lines)
+            parts.append(
+                f"Eligibility: {'Meets' if eligibility_result.get('meets_criteria') else 'Does Not Meet'} "
+                f"criteria (Confidence: {confidence*100:.0f}%)"
+            )
+            parts.append(
+                f"Clinical Justification: {eligibility_result.get('clinical_justification', 'N/A')[:150]}..."
+            )
+
+        return "\n".join(parts)
     
     def _error_response(self, workflow_id: str, error_msg: str) -> Dict[str, Any]:
         """Create error response"""
@@ -326,3 +768,19 @@ class PrescriptionOrchestrator:
                 "phase5_pa_form": None
             }
         }
+
+
+# Global orchestrator instance; per-request construction would spin up new
+# worker pools and drop the warmed policy cache
+_orchestrator: PrescriptionOrchestrator = None
+_orchestrator_lock = threading.Lock()
+
+
+def get_orchestrator() -> PrescriptionOrchestrator:
+    """Get or create the global prescription orchestrator"""
+    global _orchestrator
+    if _orchestrator is None:
+        with _orchestrator_lock:
+            if _orchestrator is None:
+                _orchestrator = PrescriptionOrchestrator()
+    return _orchestrator
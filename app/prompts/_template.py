@@ -0,0 +1,52 @@
+"""
+Shared prompt-template precompilation
+
+`str.format` re-tokenizes a template on every call; parsing once with
+`string.Formatter` and joining precomputed segments skips that work on the
+hot prompt-building paths.
+"""
+from string import Formatter
+from typing import Any, Callable, Dict
+
+
+def compile_template(template: str) -> Callable[..., str]:
+    """Parse a format string once and return a fast keyword renderer"""
+    segments = [
+        (literal, field_name)
+        for literal, field_name, _spec, _conv in Formatter().parse(template)
+    ]
+
+    def render(**fields) -> str:
+        parts = []
+        for literal, field_name in segments:
+            if literal:
+                parts.append(literal)
+            if field_name is not None:
+                parts.append(str(fields[field_name]))
+        return "".join(parts)
+
+    return render
+
+
+def compile_structured_template(template: Dict[str, Any]) -> Callable[..., Dict[str, Any]]:
+    """Precompile a nested dict of format strings into a keyword renderer
+
+    Walks the template once at import time, compiling each leaf string with
+    compile_template, so rendering is a dict rebuild with precomputed
+    segment joins — no per-call template parsing.
+    """
+    def compile_node(node: Any) -> Callable[[Dict[str, Any]], Any]:
+        if isinstance(node, dict):
+            compiled = {key: compile_node(value) for key, value in node.items()}
+            return lambda fields: {key: build(fields) for key, build in compiled.items()}
+        if isinstance(node, str):
+            leaf = compile_template(node)
+            return lambda fields: leaf(**fields)
+        return lambda fields: node
+
+    root = compile_node(template)
+
+    def render(**fields) -> Dict[str, Any]:
+        return root(fields)
+
+    return render
@@ -1,6 +1,11 @@
 """
 Prompt templates for clinical qualification and eligibility determination
+
+Templates are parsed once at import time into (literal, field) segment lists,
+so building a prompt is a single join over precomputed pieces instead of
+re-parsing the format string on every call.
 """
+from app.prompts._template import compile_template as _compile_template
 
 SYSTEM_PROMPT = """You are an expert medical utilization review specialist with 15+ years of experience evaluating prior authorization requests for insurance companies.
 
@@ -140,6 +145,11 @@ Format: Plain text, no bullets, suitable for insurance review.
 Narrative:
 """
 
+_render_clinical_qualification = _compile_template(CLINICAL_QUALIFICATION_PROMPT)
+_render_rag_enhanced = _compile_template(RAG_ENHANCED_PROMPT)
+_render_narrative = _compile_template(NARRATIVE_GENERATION_PROMPT)
+
+
 def get_clinical_qualification_prompt(
     policy_criteria: str,
     patient_id: str,
@@ -153,7 +163,7 @@ def get_clinical_qualification_prompt(
     **kwargs
 ) -> str:
     """Build clinical qualification prompt"""
-    return CLINICAL_QUALIFICATION_PROMPT.format(
+    return _render_clinical_qualification(
         policy_criteria=policy_criteria,
         patient_id=patient_id,
         age=age,
@@ -185,7 +195,7 @@ def get_rag_enhanced_prompt(
     **kwargs
 ) -> str:
     """Build RAG-enhanced prompt with policy context"""
-    return RAG_ENHANCED_PROMPT.format(
+    return _render_rag_enhanced(
         policy_context=policy_context,
         policy_criteria=policy_criteria,
         patient_id=patient_id,
@@ -219,7 +229,7 @@ def get_narrative_prompt(
     **kwargs
 ) -> str:
     """Build narrative generation prompt"""
-    return NARRATIVE_GENERATION_PROMPT.format(
+    return _render_narrative(
         patient_name=patient_name,
         age=age,
         diagnoses=diagnoses,
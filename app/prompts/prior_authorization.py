@@ -2,6 +2,10 @@
 Prior Authorization (PA) Form Prompt Templates
 Generates clinical justification narratives for PA submissions
 """
+from app.prompts._template import (
+    compile_structured_template as _compile_structured_template,
+    compile_template as _compile_template,
+)
 
 # System prompt for PA narrative generation
 PA_NARRATIVE_SYSTEM_PROMPT = """You are a clinical documentation specialist who writes professional medical justifications for insurance prior authorization requests. Your narratives must be:
@@ -40,6 +44,80 @@ CLINICAL REASONING:
 
 Generate a professional clinical justification narrative that explains why this patient needs this drug. Focus on clinical necessity and policy compliance."""
 
+_render_pa_narrative = _compile_template(PA_NARRATIVE_USER_TEMPLATE)
+
+
+def get_pa_narrative_prompt(
+    patient_name: str,
+    patient_age,
+    patient_gender: str,
+    diagnosis: str,
+    drug_name: str,
+    indication: str = "As clinically indicated",
+    current_medications: str = "See medical record",
+    previous_trials: str = "See medical record",
+    clinical_findings: str = "See medical record",
+    policy_requirements: str = "Standard medical necessity",
+    clinical_reasoning: str = "",
+) -> str:
+    """Build the PA narrative user prompt from the canonical template"""
+    return _render_pa_narrative(
+        patient_name=patient_name,
+        patient_age=patient_age,
+        patient_gender=patient_gender,
+        diagnosis=diagnosis,
+        drug_name=drug_name,
+        indication=indication,
+        current_medications=current_medications,
+        previous_trials=previous_trials,
+        clinical_findings=clinical_findings,
+        policy_requirements=policy_requirements,
+        clinical_reasoning=clinical_reasoning,
+    )
+
+
+# Deterministic narrative for drugs covered without a PA requirement; no LLM
+# call is needed when the plan itself already encodes the approval
+PA_AUTO_APPROVE_NARRATIVE_TEMPLATE = """{drug_name} is covered under {insurance_plan} with no prior authorization requirement. Formulary verification confirms coverage for {patient_name} (diagnosis: {diagnosis}); no additional clinical review is required and the prescription may be dispensed per plan terms."""
+
+_render_auto_approve_narrative = _compile_template(PA_AUTO_APPROVE_NARRATIVE_TEMPLATE)
+
+
+def get_auto_approve_narrative(
+    patient_name: str,
+    drug_name: str,
+    insurance_plan: str,
+    diagnosis: str,
+) -> str:
+    """Build the deterministic no-PA-required narrative"""
+    return _render_auto_approve_narrative(
+        patient_name=patient_name,
+        drug_name=drug_name,
+        insurance_plan=insurance_plan,
+        diagnosis=diagnosis,
+    )
+
+
+PA_DENIAL_NARRATIVE_TEMPLATE = """Clinical review determined that {patient_name} does not meet the eligibility criteria for {drug_name} (diagnosis: {diagnosis}). {clinical_justification} The request is recommended for denial; the prescriber may appeal with additional clinical documentation."""
+
+_render_denial_narrative = _compile_template(PA_DENIAL_NARRATIVE_TEMPLATE)
+
+
+def get_denial_narrative(
+    patient_name: str,
+    drug_name: str,
+    diagnosis: str,
+    clinical_justification: str,
+) -> str:
+    """Build the deterministic high-confidence-denial narrative"""
+    return _render_denial_narrative(
+        patient_name=patient_name,
+        drug_name=drug_name,
+        diagnosis=diagnosis,
+        clinical_justification=clinical_justification,
+    )
+
+
 # System prompt for form metadata extraction
 PA_FORM_METADATA_SYSTEM_PROMPT = """You are extracting structured data for a Prior Authorization form. Extract the following information and return as JSON:
 - drug_name: The requested medication name
@@ -86,6 +164,15 @@ PA_FORM_TEMPLATE = {
     }
 }
 
+# The placeholder set is fixed at import time, so the nested template is
+# precompiled once; rendering is a plain dict rebuild per form
+_render_pa_form_structure = _compile_structured_template(PA_FORM_TEMPLATE)
+
+
+def render_pa_form_structure(**ctx) -> dict:
+    """Render PA_FORM_TEMPLATE with the given field values"""
+    return _render_pa_form_structure(**ctx)
+
 # Template for markdown form output
 PA_MARKDOWN_TEMPLATE = """# PRIOR AUTHORIZATION REQUEST
 
@@ -123,3 +210,22 @@ PA_MARKDOWN_TEMPLATE = """# PRIOR AUTHORIZATION REQUEST
 ---
 **Confidential - For Insurance Use Only**
 """
+
+_render_pa_markdown = _compile_template(PA_MARKDOWN_TEMPLATE)
+
+# The template split at the narrative placeholder, for streaming: the
+# prefix and suffix are static per form, only the narrative arrives
+# incrementally
+_MD_PREFIX, _MD_SUFFIX = PA_MARKDOWN_TEMPLATE.split("{clinical_narrative}")
+_render_pa_markdown_prefix = _compile_template(_MD_PREFIX)
+_render_pa_markdown_suffix = _compile_template(_MD_SUFFIX)
+
+
+def render_pa_markdown(**ctx) -> str:
+    """Render the markdown PA form from the precompiled template"""
+    return _render_pa_markdown(**ctx)
+
+
+def render_pa_markdown_parts(**ctx) -> tuple:
+    """Render the markdown form as (prefix, suffix) around the narrative"""
+    return _render_pa_markdown_prefix(**ctx), _render_pa_markdown_suffix(**ctx)
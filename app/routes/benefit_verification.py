@@ -12,6 +12,8 @@ from app.modules.benefit_verification import (
     check_coverage_by_plan,
     get_covered_alternatives,
     get_patient_insurance_info,
+    list_drug_names,
+    list_plan_names,
 )
 
 router = APIRouter(prefix="/benefit-verification", tags=["Benefit Verification"])
@@ -56,7 +58,7 @@ class PatientInsuranceResponse(BaseModel):
 # ==================== Endpoints ====================
 
 @router.post("/check-coverage", response_model=CoverageResponse)
-async def check_patient_coverage(
+def check_patient_coverage(
     request: CoverageCheckRequest,
     db: Session = Depends(get_db)
 ):
@@ -78,7 +80,7 @@ async def check_patient_coverage(
 
 
 @router.post("/check-plan-coverage", response_model=CoverageResponse)
-async def check_plan_drug_coverage(
+def check_plan_drug_coverage(
     request: PlanCoverageRequest,
     db: Session = Depends(get_db)
 ):
@@ -100,7 +102,7 @@ async def check_plan_drug_coverage(
 
 
 @router.get("/patient/{patient_id}/insurance", response_model=PatientInsuranceResponse)
-async def get_patient_insurance(
+def get_patient_insurance(
     patient_id: str,
     db: Session = Depends(get_db)
 ):
@@ -120,7 +122,7 @@ async def get_patient_insurance(
 
 
 @router.get("/plan/{plan_name}/alternatives")
-async def get_alternative_drugs(
+def get_alternative_drugs(
     plan_name: str,
     drug_class: str = "GLP-1",
     db: Session = Depends(get_db)
@@ -147,39 +149,31 @@ async def get_alternative_drugs(
 
 
 @router.get("/plans")
-async def list_insurance_plans(db: Session = Depends(get_db)):
+def list_insurance_plans(db: Session = Depends(get_db)):
     """
     List all available insurance plans
     
     Returns distinct list of insurance plan names in the system
     """
-    from app.data.db_models import InsurancePlan
-    from sqlalchemy import distinct
-    
-    plans = db.query(distinct(InsurancePlan.plan)).all()
-    plan_names = [p[0] for p in plans]
-    
+    plan_names = list_plan_names(db)
+
     return {
-        "plans": sorted(plan_names),
+        "plans": plan_names,
         "count": len(plan_names)
     }
 
 
 @router.get("/drugs")
-async def list_drugs(db: Session = Depends(get_db)):
+def list_drugs(db: Session = Depends(get_db)):
     """
     List all drugs in the formulary
     
     Returns distinct list of drug names in the system
     """
-    from app.data.db_models import InsurancePlan
-    from sqlalchemy import distinct
-    
-    drugs = db.query(distinct(InsurancePlan.drug)).all()
-    drug_names = [d[0] for d in drugs]
-    
+    drug_names = list_drug_names(db)
+
     return {
-        "drugs": sorted(drug_names),
+        "drugs": drug_names,
         "count": len(drug_names)
     }
 
@@ -1,7 +1,9 @@
 """
 API routes for clinical qualification and eligibility determination
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
@@ -42,7 +44,8 @@ class EligibilityCheckResponse(BaseModel):
 @router.post("/check-eligibility", response_model=EligibilityCheckResponse)
 async def check_eligibility(
     request: EligibilityCheckRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    x_no_cache: Optional[str] = Header(None)
 ):
     """
     Check if patient meets clinical eligibility criteria for requested drug
@@ -56,30 +59,39 @@ async def check_eligibility(
     
     Returns eligibility determination with clinical reasoning and confidence score.
     """
-    # Get patient from database
-    patient = db.query(Patient).filter(Patient.patient_id == request.patient_id).first()
-    
-    if not patient:
+    # Fetch only the columns the eligibility check reads; the unique index
+    # on patient_id makes this a single indexed round trip. Run it off the
+    # event loop alongside the LLM work below
+    def fetch_patient():
+        return db.execute(
+            select(
+                Patient.age,
+                Patient.gender,
+                Patient.diagnoses,
+                Patient.labs,
+                Patient.treatment_history,
+                Patient.allergies,
+            ).where(Patient.patient_id == request.patient_id)
+        ).first()
+
+    row = await run_in_threadpool(fetch_patient)
+
+    if not row:
         raise HTTPException(status_code=404, detail=f"Patient not found: {request.patient_id}")
-    
-    # Convert patient DB record to dict
-    patient_data = {
-        "age": patient.age,
-        "gender": patient.gender,
-        "diagnoses": patient.diagnoses,
-        "labs": patient.labs,
-        "treatment_history": patient.treatment_history,
-        "allergies": patient.allergies,
-    }
+
+    patient_data = dict(row._mapping)
     
     # Check eligibility using LLM
     try:
-        result = check_clinical_eligibility(
+        # LLM + vector search are blocking; keep them off the event loop
+        result = await run_in_threadpool(
+            check_clinical_eligibility,
             patient_id=request.patient_id,
             patient_data=patient_data,
             drug=request.drug,
             policy_criteria=request.policy_criteria,
             use_rag=request.use_rag,
+            use_cache=x_no_cache is None,
         )
         
         return EligibilityCheckResponse(
@@ -123,4 +135,4 @@ async def check_patient_eligibility(
         use_rag=use_rag,
     )
     
-    return await check_eligibility(request, db)
+    return await check_eligibility(request, db, None)
@@ -3,9 +3,11 @@ Monitoring Demo Routes
 Demonstrates LogFire validation and Langfuse LLM monitoring
 """
 from fastapi import APIRouter, HTTPException, Body
+from pydantic import TypeAdapter, ValidationError
 from typing import Dict, Any, Optional
 import logging
 
+from app.core.config import settings
 from app.data.models import Patient, Address, Diagnosis, LabResults, TreatmentHistory
 from app.core.monitoring import ValidationEventLogger, LLMCallMonitor, get_langfuse_client
 from app.core.prompt_tracker import get_prompt_tracker
@@ -14,6 +16,10 @@ from app.core.llm_client import get_llm_client
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/monitoring", tags=["Monitoring"])
 
+# Validate through the compiled core-schema validator directly instead of
+# kwargs-unpacking into Patient(**...) on every request
+_PATIENT_ADAPTER = TypeAdapter(Patient)
+
 
 @router.post("/validate-patient", response_model=Dict[str, Any])
 async def validate_patient(patient_data: Dict[str, Any] = Body(...)):
@@ -24,8 +30,8 @@ async def validate_patient(patient_data: Dict[str, Any] = Body(...)):
     """
     try:
         # This will trigger all Pydantic validators and log to LogFire
-        patient = Patient(**patient_data)
-        
+        patient = _PATIENT_ADAPTER.validate_python(patient_data)
+
         return {
             "status": "success",
             "message": "Patient validated successfully",
@@ -34,7 +40,7 @@ async def validate_patient(patient_data: Dict[str, Any] = Body(...)):
             "age": patient.age,
             "diagnoses_count": len(patient.diagnoses),
         }
-    except ValueError as e:
+    except ValidationError as e:
         logger.error(f"Patient validation error: {e}")
         raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
@@ -134,9 +140,10 @@ async def get_monitoring_status():
     Shows if LogFire and Langfuse are enabled
     """
     try:
+        # logfire stays a local import: it is an optional dependency probed
+        # per call, and the handler's except reports absence as a 500
         import logfire
-        from app.core.config import settings
-        
+
         langfuse_client = get_langfuse_client()
         
         return {
@@ -3,17 +3,27 @@ Orchestrator API Routes - Phase 6
 Unified endpoint for end-to-end prescription processing
 """
 import logging
-from fastapi import APIRouter, HTTPException
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from app.modules.orchestrator import PrescriptionOrchestrator
+from app.modules.orchestrator import PrescriptionOrchestrator, get_orchestrator
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/orchestration", tags=["Orchestration"])
 
-# Initialize orchestrator
-orchestrator = PrescriptionOrchestrator()
+
+def _orchestrator_dep(request: Request) -> PrescriptionOrchestrator:
+    """Resolve the orchestrator bound to the app at startup.
+
+    Falls back to the module singleton when the app state is not populated
+    (e.g. in tests that mount the router without the lifespan).
+    """
+    orch = getattr(request.app.state, "orchestrator", None)
+    return orch if orch is not None else get_orchestrator()
 
 
 # ==================== Request/Response Models ====================
@@ -41,7 +51,10 @@ class ProcessPrescriptionResponse(BaseModel):
 # ==================== Endpoints ====================
 
 @router.post("/process-prescription", response_model=ProcessPrescriptionResponse)
-async def process_prescription(request: ProcessPrescriptionRequest):
+async def process_prescription(
+    request: ProcessPrescriptionRequest,
+    orchestrator: PrescriptionOrchestrator = Depends(_orchestrator_dep),
+):
     """
     End-to-end prescription processing workflow
     
@@ -52,7 +65,12 @@ async def process_prescription(request: ProcessPrescriptionRequest):
     - Phase 5: PA form generation
     
     This is the main entry point for prescription processing.
-    
+
+    Not every response carries all four phases: when the drug is not
+    covered the workflow stops after phase 2, and when no PA is required
+    it skips the LLM eligibility call, so "phases" may omit the
+    phase3/phase4/phase5 keys.
+
     Args:
         patient_id: Patient identifier (e.g., "P001")
         drug: Requested drug name (e.g., "Ozempic")
@@ -81,8 +99,8 @@ async def process_prescription(request: ProcessPrescriptionRequest):
     try:
         logger.info(f"[API] Received prescription processing request: {request.patient_id}, {request.drug}")
         
-        # Call orchestrator
-        result = orchestrator.process_prescription(
+        # Call orchestrator off the event loop so concurrent requests overlap
+        result = await orchestrator.process_prescription_async(
             patient_id=request.patient_id,
             drug=request.drug,
             provider_name=request.provider_name,
@@ -104,6 +122,38 @@ async def process_prescription(request: ProcessPrescriptionRequest):
         raise HTTPException(status_code=500, detail=f"Workflow failed: {str(e)}")
 
 
+@router.post("/process-prescription/stream")
+async def process_prescription_stream(
+    request: ProcessPrescriptionRequest,
+    orchestrator: PrescriptionOrchestrator = Depends(_orchestrator_dep),
+):
+    """
+    Streaming variant of the prescription workflow (NDJSON)
+
+    Emits one JSON line per completed phase, so clients see the coverage
+    result within milliseconds while the LLM phases are still running.
+    The final line is a "workflow_complete" event carrying the same payload
+    /process-prescription returns.
+    """
+    logger.info(f"[API] Received streaming prescription request: {request.patient_id}, {request.drug}")
+
+    def event_lines():
+        for event in orchestrator.process_prescription_stream(
+            patient_id=request.patient_id,
+            drug=request.drug,
+            provider_name=request.provider_name,
+            npi=request.npi
+        ):
+            yield orjson.dumps(
+                event,
+                default=str,
+                option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY,
+            )
+
+    # Starlette iterates sync generators in its threadpool, keeping the loop free
+    return StreamingResponse(event_lines(), media_type="application/x-ndjson")
+
+
 @router.get("/workflow/{workflow_id}")
 async def get_workflow_status(workflow_id: str):
     """
@@ -119,7 +169,9 @@ async def get_workflow_status(workflow_id: str):
 
 
 @router.post("/process-prescription/quick-test")
-async def quick_test():
+async def quick_test(
+    orchestrator: PrescriptionOrchestrator = Depends(_orchestrator_dep),
+):
     """
     Quick test endpoint - processes a sample prescription
     """
@@ -129,5 +181,6 @@ async def quick_test():
             drug="Ozempic",
             provider_name="Dr. Test",
             npi="0000000000"
-        )
+        ),
+        orchestrator
     )
@@ -1,19 +1,34 @@
 """
 API routes for semantic policy search
 """
-from fastapi import APIRouter, Query, Path
+from fastapi import APIRouter, Depends, Query, Path, Request
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 
-from app.data.vector_index import get_vector_manager
+from app.data.vector_index import VectorIndexManager, get_vector_manager
 
 router = APIRouter(prefix="/policies", tags=["Policy Search"])
 
 
+def _vector_manager_dep(request: Request) -> VectorIndexManager:
+    """Resolve the vector manager bound to the app at startup.
+
+    Falls back to the module singleton when the app state is not populated
+    (e.g. in tests that mount the router without the lifespan).
+    """
+    manager = getattr(request.app.state, "vector_manager", None)
+    return manager if manager is not None else get_vector_manager()
+
+
 # ==================== Response Models ====================
 
 class SearchResultItem(BaseModel):
-    """Single search result"""
+    """Single search result
+
+    Built with model_construct: the dicts come straight from
+    VectorIndexManager.search, whose shape we control, so revalidating
+    every hit per request buys nothing.
+    """
     id: str
     text: str
     metadata: Dict[str, Any]
@@ -39,10 +54,11 @@ class VectorIndexStats(BaseModel):
 # ==================== Endpoints ====================
 
 @router.get("/search", response_model=PolicySearchResponse)
-async def search_policies(
+def search_policies(
     query: str = Query(..., description="Search query (natural language)"),
     top_k: int = Query(5, ge=1, le=20, description="Number of results"),
-    min_similarity: float = Query(0.0, ge=0.0, le=1.0, description="Minimum similarity threshold")
+    min_similarity: float = Query(0.0, ge=0.0, le=1.0, description="Minimum similarity threshold"),
+    vector_manager: VectorIndexManager = Depends(_vector_manager_dep),
 ):
     """
     Semantic search for PA policy documents
@@ -53,8 +69,6 @@ async def search_policies(
     
     Returns matching policy sections with similarity scores
     """
-    vector_manager = get_vector_manager()
-    
     results = vector_manager.search(
         query=query,
         top_k=top_k,
@@ -64,15 +78,16 @@ async def search_policies(
     return PolicySearchResponse(
         query=query,
         results_count=len(results),
-        results=[SearchResultItem(**r) for r in results],
+        results=[SearchResultItem.model_construct(**r) for r in results],
         message=f"Found {len(results)} relevant policy sections"
     )
 
 
 @router.get("/search/drug/{drug}", response_model=PolicySearchResponse)
-async def search_policies_by_drug(
+def search_policies_by_drug(
     drug: str = Path(..., description="Drug name (e.g., Ozempic, Trulicity)"),
     top_k: int = Query(5, ge=1, le=20, description="Number of results"),
+    vector_manager: VectorIndexManager = Depends(_vector_manager_dep),
 ):
     """
     Search for PA policies specific to a drug
@@ -82,38 +97,38 @@ async def search_policies_by_drug(
     
     Returns policy sections related to the specified drug
     """
-    vector_manager = get_vector_manager()
-    
     query = f"{drug} prior authorization coverage criteria requirements"
-    
+
+    # Filter in the index via the lowercased metadata written at ingest
     results = vector_manager.search(
         query=query,
         top_k=top_k,
-        distance_threshold=0.0
+        distance_threshold=0.0,
+        where={"drug_lc": {"$eq": drug.lower()}}
     )
-    
-    # Filter results to drug-related ones
-    filtered_results = [
-        r for r in results 
-        if drug.lower() in r["metadata"].get("drug", "").lower()
-    ]
-    
-    # If no exact matches, return top results
-    if not filtered_results:
-        filtered_results = results[:top_k]
-    
+
+    # If no exact matches (or index predates the normalized metadata),
+    # fall back to an unfiltered search
+    if not results:
+        results = vector_manager.search(
+            query=query,
+            top_k=top_k,
+            distance_threshold=0.0
+        )
+
     return PolicySearchResponse(
         query=query,
-        results_count=len(filtered_results),
-        results=[SearchResultItem(**r) for r in filtered_results],
-        message=f"Found {len(filtered_results)} policy sections for {drug}"
+        results_count=len(results),
+        results=[SearchResultItem.model_construct(**r) for r in results],
+        message=f"Found {len(results)} policy sections for {drug}"
     )
 
 
 @router.get("/search/plan/{plan}", response_model=PolicySearchResponse)
-async def search_policies_by_plan(
+def search_policies_by_plan(
     plan: str = Path(..., description="Insurance plan name"),
     top_k: int = Query(5, ge=1, le=20, description="Number of results"),
+    vector_manager: VectorIndexManager = Depends(_vector_manager_dep),
 ):
     """
     Search for PA policies from a specific insurance plan
@@ -123,42 +138,43 @@ async def search_policies_by_plan(
     
     Returns all policy sections from the specified plan
     """
-    vector_manager = get_vector_manager()
-    
     query = f"{plan} insurance coverage prior authorization requirements"
-    
+
+    # Filter in the index via the lowercased metadata written at ingest;
+    # no over-fetch is needed when the index does the filtering
     results = vector_manager.search(
         query=query,
-        top_k=top_k * 2,  # Get more to filter
-        distance_threshold=0.0
+        top_k=top_k,
+        distance_threshold=0.0,
+        where={"plan_lc": {"$eq": plan.lower()}}
     )
-    
-    # Filter results to plan-related ones
-    filtered_results = [
-        r for r in results 
-        if plan.lower() in r["metadata"].get("plan", "").lower()
-    ]
-    
-    # If no exact matches, return top results
-    if not filtered_results:
-        filtered_results = results[:top_k]
-    
+
+    # If no exact matches (or index predates the normalized metadata),
+    # fall back to an unfiltered search
+    if not results:
+        results = vector_manager.search(
+            query=query,
+            top_k=top_k,
+            distance_threshold=0.0
+        )
+
     return PolicySearchResponse(
         query=query,
-        results_count=len(filtered_results),
-        results=[SearchResultItem(**r) for r in filtered_results],
-        message=f"Found {len(filtered_results)} policy sections for {plan}"
+        results_count=len(results),
+        results=[SearchResultItem.model_construct(**r) for r in results],
+        message=f"Found {len(results)} policy sections for {plan}"
     )
 
 
 @router.get("/stats", response_model=VectorIndexStats)
-async def get_index_stats():
+def get_index_stats(
+    vector_manager: VectorIndexManager = Depends(_vector_manager_dep),
+):
     """
     Get statistics about the vector index
-    
+
     Returns information about indexed documents and storage location
     """
-    vector_manager = get_vector_manager()
     stats = vector_manager.get_collection_stats()
     
     return VectorIndexStats(**stats)
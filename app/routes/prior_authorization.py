@@ -2,28 +2,112 @@
 Prior Authorization API Routes
 Endpoints for generating PA forms with clinical narratives
 """
+import asyncio
 import logging
+import orjson
+from hashlib import blake2b
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.data.database import get_db_context
 from app.data.db_models import Patient
-from app.modules.prior_authorization import PriorAuthorizationGenerator
+from app.data.vector_index import get_vector_manager
+from app.modules.prior_authorization import get_pa_generator
 from app.modules.clinical_qualification import check_clinical_eligibility
+from app.modules._policy_cache import QueryCache
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/prior-authorization", tags=["prior-authorization"])
 
-# Initialize generators
-pa_generator = PriorAuthorizationGenerator()
+# Shared generator singleton (same instance the orchestrator uses)
+pa_generator = get_pa_generator()
+
+# Patient rows change rarely relative to PA traffic; a short TTL keeps
+# repeat form/markdown requests for the same patient off the database
+_PATIENT_CACHE = QueryCache(max_size=1024, ttl_seconds=60.0)
+
+# Caps in-flight LLM work from these endpoints so a burst of PA requests
+# queues here instead of exhausting the threadpool and the provider's
+# rate limit. The stack's LLM clients are synchronous, so the gate wraps
+# the threadpool dispatch rather than an async HTTP client.
+_LLM_SEMAPHORE = asyncio.Semaphore(settings.pa_max_concurrency)
+
+# Content-addressed form cache: retries, duplicate submissions, and
+# polling UIs resend identical request bodies; a hit skips the DB fetch
+# and both LLM calls. Keyed over the full request so any field change
+# (criteria, provider, RAG toggle) produces a distinct entry.
+_FORM_CACHE = QueryCache(max_size=2048, ttl_seconds=300.0)
+
+# Above this confidence, a DENY is final enough that the narrative comes
+# from a template instead of an LLM call
+_DENY_SHORT_CIRCUIT_CONFIDENCE = 0.9
+
+
+def _form_cache_key(request: "PAFormGenerationRequest") -> str:
+    """Stable digest of the normalized request body"""
+    payload = orjson.dumps(request.model_dump(), option=orjson.OPT_SORT_KEYS)
+    return blake2b(payload, digest_size=16).hexdigest()
+
+
+def _fetch_patient_dict(patient_id: str) -> dict:
+    """Load the patient fields the PA flow needs; raises ValueError if absent
+
+    Results are served from a short-TTL cache; misses (unknown patients)
+    are never cached, so a patient added mid-window shows up immediately.
+    """
+    cached = _PATIENT_CACHE.get(patient_id)
+    if cached is not None:
+        return cached
+
+    with get_db_context() as session:
+        # Column-level select: the PA flow only reads these seven fields,
+        # so skip full ORM hydration of the Patient row. patient_id is
+        # unique-indexed but not the PK, hence no session.get here.
+        row = session.execute(
+            select(
+                Patient.patient_id,
+                Patient.name,
+                Patient.age,
+                Patient.gender,
+                Patient.diagnoses,
+                Patient.labs,
+                Patient.treatment_history,
+            ).where(Patient.patient_id == patient_id)
+        ).first()
+
+        if row is None:
+            raise ValueError(f"Patient {patient_id} not found")
+
+        patient_dict = {
+            "patient_id": row.patient_id,
+            "name": row.name,
+            "age": row.age,
+            "gender": row.gender,
+            "diagnoses": row.diagnoses or [],
+            "labs": row.labs or {},
+            "treatment_history": row.treatment_history or []
+        }
+
+    _PATIENT_CACHE.put(patient_id, patient_dict)
+    return patient_dict
 
 
 
 # Request/Response Models
 class PAFormGenerationRequest(BaseModel):
-    """Request to generate a PA form"""
+    """Request to generate a PA form
+
+    Frozen so instances hash cleanly for the form cache; unknown fields
+    are rejected rather than silently dropped.
+    """
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     patient_id: str
     drug: str
     policy_criteria: str = "Standard medical necessity"
@@ -34,6 +118,8 @@ class PAFormGenerationRequest(BaseModel):
 
 class PAFormGenerationResponse(BaseModel):
     """Response containing generated PA form"""
+    model_config = ConfigDict(frozen=True)
+
     form_id: str
     patient_name: str
     drug_name: str
@@ -46,11 +132,100 @@ class PAFormGenerationResponse(BaseModel):
 
 class PAFormMarkdownResponse(BaseModel):
     """Response containing markdown PA form"""
+    model_config = ConfigDict(frozen=True)
+
     form_id: str
     markdown: str
     llm_metadata: dict
 
 
+def _policy_context(drug: str) -> list:
+    """Retrieve policy chunks for a drug, filtered in the index
+
+    The metadata filter confines the ANN traversal to this drug's chunks;
+    indexes built before the lowercased metadata fields fall back to a
+    plain semantic search (same pattern as the policy search routes).
+    """
+    vector_manager = get_vector_manager()
+    query = f"{drug} treatment criteria requirements"
+    results = vector_manager.search(
+        query, top_k=3, where={"drug_lc": {"$eq": drug.lower()}}
+    )
+    if not results:
+        results = vector_manager.search(query, top_k=3)
+    return results
+
+
+async def _fetch_inputs(request: PAFormGenerationRequest) -> tuple:
+    """Load the patient dict, prefetching policy context when RAG is on"""
+    if request.use_rag:
+        patient_dict, policy_results = await asyncio.gather(
+            run_in_threadpool(_fetch_patient_dict, request.patient_id),
+            run_in_threadpool(_policy_context, request.drug),
+        )
+    else:
+        patient_dict = await run_in_threadpool(_fetch_patient_dict, request.patient_id)
+        policy_results = None
+    return patient_dict, policy_results
+
+
+async def _build_form_data(request: PAFormGenerationRequest) -> dict:
+    """Run the shared eligibility -> form pipeline for both PA endpoints
+
+    Every blocking step (patient fetch, eligibility LLM call, form LLM
+    call) runs off the event loop. The markdown endpoint previously
+    duplicated this whole sequence inline.
+
+    With RAG on, the policy vector search runs concurrently with the
+    patient fetch instead of inside the eligibility call. The prefetch
+    query is drug-led (diagnoses are not known until the fetch resolves),
+    which is what dominates retrieval against per-drug policy documents.
+
+    Identical request bodies within the cache TTL return the previously
+    built form_data without touching the database or the LLM.
+    """
+    cache_key = _form_cache_key(request)
+    cached = _FORM_CACHE.get(cache_key)
+    if cached is not None:
+        logger.info("[PA] Serving form for %s from cache", request.patient_id)
+        return cached
+
+    patient_dict, policy_results = await _fetch_inputs(request)
+
+    async with _LLM_SEMAPHORE:
+        eligibility_check = await run_in_threadpool(
+            check_clinical_eligibility,
+            patient_id=request.patient_id,
+            patient_data=patient_dict,
+            drug=request.drug,
+            policy_criteria=request.policy_criteria,
+            use_rag=request.use_rag,
+            policy_context_results=policy_results
+        )
+
+        # A confident deny gets a templated narrative - no reason to pay
+        # for LLM prose the reviewer will discard
+        if (
+            getattr(eligibility_check, "recommendation", None) == "DENY"
+            and getattr(eligibility_check, "confidence_score", 0) >= _DENY_SHORT_CIRCUIT_CONFIDENCE
+        ):
+            form_builder = pa_generator.generate_denial_form
+        else:
+            form_builder = pa_generator.generate_form
+
+        form_data = await run_in_threadpool(
+            form_builder,
+            patient_id=request.patient_id,
+            drug=request.drug,
+            eligibility_result=eligibility_check,
+            provider_name=request.provider_name,
+            npi=request.npi
+        )
+
+    _FORM_CACHE.put(cache_key, form_data)
+    return form_data
+
+
 @router.post("/generate-form", response_model=PAFormGenerationResponse)
 async def generate_pa_form(request: PAFormGenerationRequest):
     """
@@ -73,48 +248,15 @@ async def generate_pa_form(request: PAFormGenerationRequest):
         Complete PA form with clinical narrative
     """
     try:
-        logger.info(f"[PA] Generating form for {request.patient_id}, drug: {request.drug}")
-        
-        # Step 1: Check clinical eligibility (Phase 4)
-        logger.info("[PA] Step 1: Checking clinical eligibility...")
-
-        # Fetch patient data
-        with get_db_context() as session:
-            patient_obj = session.query(Patient).filter(Patient.patient_id == request.patient_id).first()
-            
-            if not patient_obj:
-                raise ValueError(f"Patient {request.patient_id} not found")
-            
-            # Extract all data while session is active
-            patient_dict = {
-                "patient_id": patient_obj.patient_id,
-                "name": patient_obj.name,
-                "age": patient_obj.age,
-                "gender": patient_obj.gender,
-                "diagnoses": patient_obj.diagnoses or [],
-                "labs": patient_obj.labs or {},
-                "treatment_history": patient_obj.treatment_history or []
-            }
-
-        eligibility_check = check_clinical_eligibility(
-            patient_id=request.patient_id,
-            patient_data=patient_dict,
-            drug=request.drug,
-            policy_criteria=request.policy_criteria,
-            use_rag=request.use_rag
-        )
-        logger.info("[PA] Step 2: Generating PA form with clinical narrative...")
-        form_data = pa_generator.generate_form(
-            patient_id=request.patient_id,
-            drug=request.drug,
-            eligibility_result=eligibility_check,
-            provider_name=request.provider_name,
-            npi=request.npi
-        )
+        logger.info("[PA] Generating form for %s, drug: %s", request.patient_id, request.drug)
         
+        form_data = await _build_form_data(request)
+
         # Return response
-        logger.info(f"[PA] ✓ Form generated: {form_data['form_id']}")
-        return PAFormGenerationResponse(
+        logger.info("[PA] ✓ Form generated: %s", form_data["form_id"])
+        # form_data is produced in-process with a fixed shape, so skip
+        # a redundant validation pass (same pattern as the search routes)
+        return PAFormGenerationResponse.model_construct(
             form_id=form_data["form_id"],
             patient_name=form_data["patient_name"],
             drug_name=form_data["drug_name"],
@@ -126,10 +268,10 @@ async def generate_pa_form(request: PAFormGenerationRequest):
         )
     
     except ValueError as e:
-        logger.error(f"[PA] Validation error: {e}")
+        logger.error("[PA] Validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"[PA] Form generation failed: {e}")
+        logger.error("[PA] Form generation failed: %s", e)
         raise HTTPException(status_code=500, detail=f"PA form generation failed: {str(e)}")
 
 
@@ -145,56 +287,65 @@ async def generate_pa_form_markdown(request: PAFormGenerationRequest):
         Markdown-formatted PA form suitable for display/printing
     """
     try:
-        logger.info(f"[PA-Markdown] Generating markdown form for {request.patient_id}")
-        
-        # Fetch patient data
-        with get_db_context() as session:
-            patient_obj = session.query(Patient).filter(Patient.patient_id == request.patient_id).first()
-            
-            if not patient_obj:
-                raise ValueError(f"Patient {request.patient_id} not found")
-            
-            # Extract all data while session is active
-            patient_dict = {
-                "patient_id": patient_obj.patient_id,
-                "name": patient_obj.name,
-                "age": patient_obj.age,
-                "gender": patient_obj.gender,
-                "diagnoses": patient_obj.diagnoses or [],
-                "labs": patient_obj.labs or {},
-                "treatment_history": patient_obj.treatment_history or []
-            }
-        
-        eligibility_check = check_clinical_eligibility(
-            patient_id=request.patient_id,
-            patient_data=patient_dict,
-            drug=request.drug,
-            policy_criteria=request.policy_criteria,
-            use_rag=request.use_rag
-        )
-        
-        # Generate form
-        form_data = pa_generator.generate_form(
-            patient_id=request.patient_id,
-            drug=request.drug,
-            eligibility_result=eligibility_check,
-            provider_name=request.provider_name,
-            npi=request.npi
-        )
-        
-        # Generate markdown
+        logger.info("[PA-Markdown] Generating markdown form for %s", request.patient_id)
+
+        form_data = await _build_form_data(request)
+
+        # Markdown rendering is pure string formatting on top of form_data
         markdown = pa_generator.generate_markdown_form(form_data)
         
-        logger.info(f"[PA-Markdown] ✓ Markdown form generated")
-        return PAFormMarkdownResponse(
+        logger.info("[PA-Markdown] ✓ Markdown form generated")
+        return PAFormMarkdownResponse.model_construct(
             form_id=form_data["form_id"],
             markdown=markdown,
             llm_metadata=form_data["llm_metadata"]
         )
     
     except ValueError as e:
-        logger.error(f"[PA-Markdown] Validation error: {e}")
+        logger.error("[PA-Markdown] Validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"[PA-Markdown] Form generation failed: {e}")
+        logger.error("[PA-Markdown] Form generation failed: %s", e)
         raise HTTPException(status_code=500, detail=f"PA markdown generation failed: {str(e)}")
+
+
+@router.post("/generate-form-markdown/stream")
+async def generate_pa_form_markdown_stream(request: PAFormGenerationRequest):
+    """
+    Streaming variant of the markdown form (text/markdown)
+
+    The form header is sent as soon as eligibility completes and the
+    narrative streams token-by-token, so clients render content while the
+    LLM is still writing. Starlette iterates the sync generator in its
+    threadpool and closes it if the client disconnects, which cancels the
+    remaining work.
+    """
+    try:
+        logger.info("[PA-Markdown] Streaming markdown form for %s", request.patient_id)
+
+        patient_dict, policy_results = await _fetch_inputs(request)
+
+        async with _LLM_SEMAPHORE:
+            eligibility_check = await run_in_threadpool(
+                check_clinical_eligibility,
+                patient_id=request.patient_id,
+                patient_data=patient_dict,
+                drug=request.drug,
+                policy_criteria=request.policy_criteria,
+                use_rag=request.use_rag,
+                policy_context_results=policy_results
+            )
+
+        markdown_stream = pa_generator.stream_markdown_form(
+            patient_id=request.patient_id,
+            drug=request.drug,
+            eligibility_result=eligibility_check,
+            provider_name=request.provider_name,
+            npi=request.npi,
+            patient_data=patient_dict
+        )
+        return StreamingResponse(markdown_stream, media_type="text/markdown")
+
+    except ValueError as e:
+        logger.error("[PA-Markdown] Validation error: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
@@ -4,6 +4,8 @@ Build ChromaDB vector index from PA policy documents
 This script reads policy documents and indexes them for semantic search.
 """
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import blake2b
 from pathlib import Path
 
 # Add parent directory to path
@@ -17,47 +19,65 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _process_file(policy_file: Path) -> list:
+    """Read, chunk, and annotate one policy file (runs in a worker process)"""
+    # One unbuffered read + explicit decode instead of locale-aware
+    # buffered text I/O; policy files are plain UTF-8/ASCII
+    content = policy_file.read_bytes().decode("utf-8", errors="replace")
+
+    # Extract metadata from filename
+    parts = policy_file.stem.split("_")
+    plan = parts[0].replace("_", " ").title() if len(parts) > 0 else "Unknown"
+    drug = parts[-2] if len(parts) >= 2 else "Unknown"
+
+    # Chunk the document
+    chunks = chunk_document(content, chunk_size=800, overlap=150)
+
+    documents = []
+    for i, chunk in enumerate(chunks):
+        # Content-addressed id: unchanged chunks keep their id across
+        # rebuilds, so incremental runs skip re-embedding them. The stem
+        # and index disambiguate identical boilerplate between files.
+        digest = blake2b(
+            f"{policy_file.stem}:{i}:{chunk}".encode(), digest_size=16
+        ).hexdigest()
+        doc_id = f"{policy_file.stem}_{digest}"
+        documents.append({
+            "id": doc_id,
+            "text": chunk,
+            "metadata": {
+                "source_file": policy_file.name,
+                "plan": plan,
+                "drug": drug,
+                "chunk_index": i,
+                "total_chunks": len(chunks)
+            }
+        })
+    return documents
+
+
 def load_policy_documents():
-    """Load policy documents from mock_data/policies/ directory"""
+    """Load policy documents from mock_data/policies/ directory
+
+    Files are independent and chunking is CPU-bound string work, so they
+    are processed across cores with a ProcessPoolExecutor.
+    """
     policies_dir = Path(settings.mock_data_dir) / "policies"
-    
+
     if not policies_dir.exists():
         logger.error(f"Policies directory not found: {policies_dir}")
         return []
-    
+
+    # Walk the directory once; the summary line below reuses this list
+    policy_files = sorted(policies_dir.glob("*.txt"))
+
     documents = []
-    
-    for policy_file in policies_dir.glob("*.txt"):
-        logger.info(f"Loading policy: {policy_file.name}")
-        
-        with open(policy_file, 'r') as f:
-            content = f.read()
-        
-        # Extract metadata from filename
-        parts = policy_file.stem.split("_")
-        plan = parts[0].replace("_", " ").title() if len(parts) > 0 else "Unknown"
-        drug = parts[-2] if len(parts) >= 2 else "Unknown"
-        
-        # Chunk the document
-        chunks = chunk_document(content, chunk_size=800, overlap=150)
-        
-        logger.info(f"  → Created {len(chunks)} chunks for {drug}")
-        
-        for i, chunk in enumerate(chunks):
-            doc_id = f"{policy_file.stem}_chunk_{i}"
-            documents.append({
-                "id": doc_id,
-                "text": chunk,
-                "metadata": {
-                    "source_file": policy_file.name,
-                    "plan": plan,
-                    "drug": drug,
-                    "chunk_index": i,
-                    "total_chunks": len(chunks)
-                }
-            })
-    
-    logger.info(f"\nLoaded {len(documents)} document chunks from {len(list(policies_dir.glob('*.txt')))} files")
+    with ProcessPoolExecutor() as executor:
+        for policy_file, docs in zip(policy_files, executor.map(_process_file, policy_files)):
+            logger.info(f"Loaded policy: {policy_file.name} → {len(docs)} chunks")
+            documents.extend(docs)
+
+    logger.info(f"\nLoaded {len(documents)} document chunks from {len(policy_files)} files")
     return documents
 
 
@@ -70,26 +90,33 @@ def main():
     # Get vector manager
     logger.info("Initializing ChromaDB...")
     vector_manager = get_vector_manager()
-    
-    # Check current collection stats
-    stats = vector_manager.get_collection_stats()
-    if stats["document_count"] > 0:
-        logger.warning(f"⚠️  Collection already has {stats['document_count']} documents")
-        logger.warning("   Clearing old collection...")
-        vector_manager.delete_collection()
-        vector_manager = get_vector_manager()  # Reinitialize
-    
+
     # Load documents
     logger.info("\nLoading policy documents...")
     documents = load_policy_documents()
-    
+
     if not documents:
         logger.error("❌ No documents found!")
         sys.exit(1)
-    
-    # Index documents
-    logger.info(f"\nIndexing {len(documents)} document chunks...")
-    vector_manager.add_documents_batch(documents)
+
+    # Incremental build: ids are content-addressed, so only chunks whose
+    # text changed need embedding; ids missing from the sources are stale
+    # and get dropped. Unchanged corpora cost no embedding work at all.
+    existing_ids = set(vector_manager.list_ids())
+    current_ids = {doc["id"] for doc in documents}
+
+    stale_ids = sorted(existing_ids - current_ids)
+    if stale_ids:
+        logger.info(f"\nRemoving {len(stale_ids)} stale chunks...")
+        vector_manager.delete_documents(stale_ids)
+
+    new_documents = [doc for doc in documents if doc["id"] not in existing_ids]
+    if new_documents:
+        logger.info(f"\nIndexing {len(new_documents)} new/changed chunks "
+                    f"({len(documents) - len(new_documents)} unchanged)...")
+        vector_manager.add_documents_batch(new_documents)
+    else:
+        logger.info("\nIndex already up to date - no chunks to embed")
     
     # Verify
     stats = vector_manager.get_collection_stats()
@@ -5,135 +5,252 @@ Loads patients, diagnoses, drugs, insurance plans, and relationships
 into Neo4j for Graph RAG capabilities.
 """
 import sys
-import json
+from itertools import islice
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.data.graph_index import get_graph_manager
-from app.core.config import settings
+from app.data.mock_loader import iter_patients, iter_plans
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows per UNWIND flush; keeps each driver call bounded while the JSON
+# source streams record-by-record
+BATCH_SIZE = 500
 
-def load_patients_from_json():
-    """Load patient data from mock_data/patients.json"""
-    patients_file = Path(settings.mock_data_dir) / "patients.json"
-    
-    if not patients_file.exists():
-        logger.error(f"Patients file not found: {patients_file}")
-        return []
-    
-    with open(patients_file) as f:
-        return json.load(f)
 
+# One UNWIND query per entity/relationship type; each replaces N per-row
+# driver round-trips with a single call carrying the batch as $rows
+PATIENT_BULK_CYPHER = """
+UNWIND $rows AS r
+MERGE (p:Patient {patient_id: r.patient_id})
+SET p.name = r.name,
+    p.age = r.age,
+    p.gender = r.gender,
+    p.hba1c = r.hba1c,
+    p.bmi = r.bmi,
+    p.insurance_plan = r.insurance_plan,
+    p.updated_at = datetime()
+"""
 
-def load_plans_from_json():
-    """Load insurance plans from mock_data/plans.json"""
-    plans_file = Path(settings.mock_data_dir) / "plans.json"
-    
-    if not plans_file.exists():
-        logger.error(f"Plans file not found: {plans_file}")
-        return []
-    
-    with open(plans_file) as f:
-        return json.load(f)
+DIAGNOSIS_BULK_CYPHER = """
+UNWIND $rows AS r
+MERGE (d:Diagnosis {icd10: r.icd10})
+SET d.name = r.name
+"""
+
+DRUG_BULK_CYPHER = """
+UNWIND $rows AS r
+MERGE (drug:Drug {name: r.name})
+"""
+
+PLAN_BULK_CYPHER = """
+UNWIND $rows AS r
+MERGE (plan:InsurancePlan {name: r.name})
+"""
+
+PATIENT_DIAGNOSIS_BULK_CYPHER = """
+UNWIND $rows AS r
+MATCH (p:Patient {patient_id: r.patient_id})
+MATCH (d:Diagnosis {icd10: r.icd10})
+MERGE (p)-[:HAS_DIAGNOSIS]->(d)
+"""
+
+TREATMENT_BULK_CYPHER = """
+UNWIND $rows AS r
+MATCH (p:Patient {patient_id: r.patient_id})
+MATCH (drug:Drug {name: r.drug_name})
+MERGE (p)-[rel:TREATED_WITH]->(drug)
+SET rel.outcome = r.outcome,
+    rel.date = datetime()
+"""
+
+COVERAGE_BULK_CYPHER = """
+UNWIND $rows AS r
+MATCH (plan:InsurancePlan {name: r.plan_name})
+MATCH (drug:Drug {name: r.drug_name})
+MERGE (plan)-[rel:COVERS]->(drug)
+SET rel.pa_required = r.pa_required,
+    rel.criteria = r.criteria
+"""
+
+PATIENT_INSURANCE_BULK_CYPHER = """
+UNWIND $rows AS r
+MATCH (p:Patient {patient_id: r.patient_id})
+MATCH (plan:InsurancePlan {name: r.plan_name})
+MERGE (p)-[:ENROLLED_IN]->(plan)
+"""
+
+
+def _chunks(records, size=BATCH_SIZE):
+    """Yield lists of up to `size` records from a streaming iterator"""
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _flush(tx, cypher, rows):
+    """Run one UNWIND batch inside the shared write transaction"""
+    if rows:
+        tx.run(cypher, {"rows": rows})
+
+
+def _ingest_all(tx):
+    """Stream both JSON files into the graph within one transaction
+
+    Called by the driver's execute_write, so it may run more than once
+    on transient errors - the iterators and counters are created fresh
+    per attempt. Returns the summary stats for the report.
+    """
+    # Dedup sets span chunks; they hold only names/codes, not records
+    seen_plans = set()
+    seen_drugs = set()
+    seen_diagnoses = set()
+    patient_count = 0
+    plan_count = 0
+    link_count = 0
+
+    logger.info("Loading insurance plans...")
+    for chunk in _chunks(iter_plans()):
+        new_plans = []
+        new_drugs = []
+        coverage_rows = []
+        for plan in chunk:
+            if plan["plan"] not in seen_plans:
+                seen_plans.add(plan["plan"])
+                new_plans.append({"name": plan["plan"]})
+            if plan["drug"] not in seen_drugs:
+                seen_drugs.add(plan["drug"])
+                new_drugs.append({"name": plan["drug"]})
+            if plan["covered"]:
+                coverage_rows.append({
+                    "plan_name": plan["plan"],
+                    "drug_name": plan["drug"],
+                    "pa_required": plan["pa_required"],
+                    "criteria": plan.get("criteria"),
+                })
+
+        # Nodes first so the relationship MATCHes find their endpoints
+        _flush(tx, PLAN_BULK_CYPHER, new_plans)
+        _flush(tx, DRUG_BULK_CYPHER, new_drugs)
+        _flush(tx, COVERAGE_BULK_CYPHER, coverage_rows)
+        plan_count += len(coverage_rows)
+
+    logger.info("Loading patients...")
+    for chunk in _chunks(iter_patients()):
+        patient_rows = []
+        new_diagnoses = []
+        new_drugs = []
+        diagnosis_rows = []
+        treatment_rows = []
+        insurance_rows = []
+        for patient in chunk:
+            patient_rows.append({
+                "patient_id": patient["patient_id"],
+                "name": patient["name"],
+                "age": patient["age"],
+                "gender": patient["gender"],
+                "hba1c": patient.get("labs", {}).get("HbA1c", 0),
+                "bmi": patient.get("labs", {}).get("BMI", 0),
+                "insurance_plan": patient["insurance_plan"],
+            })
+            for diagnosis in patient.get("diagnoses", []):
+                if diagnosis["icd10"] not in seen_diagnoses:
+                    seen_diagnoses.add(diagnosis["icd10"])
+                    new_diagnoses.append({
+                        "icd10": diagnosis["icd10"],
+                        "name": diagnosis["name"],
+                    })
+                diagnosis_rows.append({
+                    "patient_id": patient["patient_id"],
+                    "icd10": diagnosis["icd10"],
+                })
+            for treatment in patient.get("treatment_history", []):
+                if treatment["drug"] not in seen_drugs:
+                    seen_drugs.add(treatment["drug"])
+                    new_drugs.append({"name": treatment["drug"]})
+                treatment_rows.append({
+                    "patient_id": patient["patient_id"],
+                    "drug_name": treatment["drug"],
+                    "outcome": treatment["outcome"],
+                })
+            insurance_rows.append({
+                "patient_id": patient["patient_id"],
+                "plan_name": patient["insurance_plan"],
+            })
+
+        _flush(tx, PATIENT_BULK_CYPHER, patient_rows)
+        _flush(tx, DIAGNOSIS_BULK_CYPHER, new_diagnoses)
+        _flush(tx, DRUG_BULK_CYPHER, new_drugs)
+        _flush(tx, PATIENT_DIAGNOSIS_BULK_CYPHER, diagnosis_rows)
+        _flush(tx, TREATMENT_BULK_CYPHER, treatment_rows)
+        _flush(tx, PATIENT_INSURANCE_BULK_CYPHER, insurance_rows)
+        patient_count += len(patient_rows)
+        link_count += len(insurance_rows)
+        logger.info(f"  ✓ Migrated {patient_count} patients...")
+
+    return {
+        "patient_count": patient_count,
+        "plan_count": plan_count,
+        "link_count": link_count,
+        "unique_plans": len(seen_plans),
+        "unique_drugs": len(seen_drugs),
+    }
 
 
 def migrate_patients_to_graph():
-    """Migrate all patients to Neo4j"""
+    """Migrate all patients to Neo4j using batched UNWIND queries
+
+    Both JSON files are streamed record-by-record (see iter_json_file)
+    and flushed in BATCH_SIZE chunks, so peak memory stays at one chunk
+    plus the small dedup sets regardless of dataset size. Plans go first
+    so the InsurancePlan nodes exist when patient enrollment edges flush.
+    All flushes share one session and one write transaction, so commit
+    cost is paid once for the whole migration.
+    """
     print("\n" + "=" * 60)
     print("🏥 MIGRATING PATIENTS TO NEO4J")
     print("=" * 60 + "\n")
-    
+
     graph_manager = get_graph_manager()
     if not graph_manager.driver:
         logger.error("❌ Neo4j not connected!")
         return
-    
-    # Load data
-    patients = load_patients_from_json()
-    plans = load_plans_from_json()
-    
-    logger.info(f"Loading {len(patients)} patients...")
-    
-    # Create patient nodes
-    patient_count = 0
-    for patient in patients:
-        if graph_manager.create_patient_node(patient):
-            patient_count += 1
-            
-            # Create diagnosis nodes and relationships
-            for diagnosis in patient.get("diagnoses", []):
-                graph_manager.create_diagnosis_node(
-                    diagnosis["name"], 
-                    diagnosis["icd10"]
-                )
-                graph_manager.add_patient_diagnosis(
-                    patient["patient_id"],
-                    diagnosis["icd10"]
-                )
-            
-            # Create treatment relationships
-            for treatment in patient.get("treatment_history", []):
-                drug_name = treatment["drug"]
-                graph_manager.create_drug_node(drug_name)
-                graph_manager.add_patient_treatment(
-                    patient["patient_id"],
-                    drug_name,
-                    treatment["outcome"]
-                )
-        
-        if patient_count % 20 == 0:
-            logger.info(f"  ✓ Created {patient_count} patients...")
-    
+
+    stats = {}
+
+    def _run(tx):
+        stats.clear()
+        stats.update(_ingest_all(tx))
+
+    if not graph_manager.execute_write(_run):
+        logger.error("❌ Migration transaction failed!")
+        return
+
+    # Constraints go on after the load so the bulk ingest itself runs
+    # index-free; every later MERGE/lookup then has an index behind it
+    if graph_manager.ensure_constraints():
+        logger.info("✅ Uniqueness constraints in place")
+
+    # One similarity pass here turns every later find_similar_patients
+    # call into a 1-hop SIMILAR_TO traversal
+    if graph_manager.precompute_similarity():
+        logger.info("✅ Patient similarity projection materialized")
+
+    patient_count = stats["patient_count"]
+    plan_count = stats["plan_count"]
+    link_count = stats["link_count"]
+    unique_plans = stats["unique_plans"]
+    unique_drugs = stats["unique_drugs"]
+
     logger.info(f"✅ Created {patient_count} patient nodes")
-    
-    # Create insurance plan nodes
-    logger.info(f"\nLoading {len(plans)} insurance plans...")
-    plan_count = 0
-    unique_plans = set()
-    unique_drugs = set()
-    
-    for plan in plans:
-        plan_name = plan["plan"]
-        drug_name = plan["drug"]
-        
-        if plan_name not in unique_plans:
-            graph_manager.create_insurance_plan_node(plan_name)
-            unique_plans.add(plan_name)
-        
-        if drug_name not in unique_drugs:
-            graph_manager.create_drug_node(drug_name)
-            unique_drugs.add(drug_name)
-        
-        # Link plan to drug with coverage info
-        if plan["covered"]:
-            graph_manager.add_plan_drug_coverage(
-                plan_name,
-                drug_name,
-                plan["pa_required"],
-                plan.get("criteria")
-            )
-            plan_count += 1
-    
-    logger.info(f"✅ Created {len(unique_plans)} insurance plan nodes")
-    logger.info(f"✅ Created {len(unique_drugs)} drug nodes")
+    logger.info(f"✅ Created {unique_plans} insurance plan nodes")
+    logger.info(f"✅ Created {unique_drugs} drug nodes")
     logger.info(f"✅ Created {plan_count} plan→drug coverage relationships")
-    
-    # Link patients to insurance plans
-    logger.info(f"\nLinking patients to insurance plans...")
-    link_count = 0
-    for patient in patients:
-        if graph_manager.add_patient_insurance(
-            patient["patient_id"],
-            patient["insurance_plan"]
-        ):
-            link_count += 1
-    
     logger.info(f"✅ Linked {link_count} patients to insurance plans")
     
     # Summary
@@ -142,8 +259,8 @@ def migrate_patients_to_graph():
     print("=" * 60)
     print(f"\nGraph Statistics:")
     print(f"  • Patients: {patient_count}")
-    print(f"  • Insurance Plans: {len(unique_plans)}")
-    print(f"  • Drugs: {len(unique_drugs)}")
+    print(f"  • Insurance Plans: {unique_plans}")
+    print(f"  • Drugs: {unique_drugs}")
     print(f"  • Plan/Drug Combinations: {plan_count}")
     print(f"\n💡 Next Steps:")
     print(f"  1. Test graph queries: python -m pytest tests/test_graph_rag.py")
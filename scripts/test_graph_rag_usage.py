@@ -3,7 +3,12 @@ Example usage of Graph RAG for clinical decision making
 
 This script demonstrates how to use the Graph RAG components
 to enhance clinical decisions with network analysis.
+
+All examples share one result bundle fetched in a single Neo4j
+transaction (see GraphAnalytics.get_full_demo_bundle), instead of each
+example paying its own round-trips for the same patient/drug pair.
 """
+import asyncio
 import sys
 from pathlib import Path
 
@@ -13,20 +18,17 @@ from app.data.graph_analytics import get_graph_analytics
 from app.data.graph_index import get_graph_manager
 
 
-def example_patient_context():
+def example_patient_context(patient_context):
     """Example: Get comprehensive patient context"""
     print("\n" + "="*70)
     print("EXAMPLE 1: Get Patient Context")
     print("="*70)
-    
-    analytics = get_graph_analytics()
-    patient_context = analytics.get_patient_context("P001")
-    
+
     if patient_context:
         print(f"Patient: P001")
         print(f"Similar patients found: {len(patient_context.get('similar_patients', []))}")
         print(f"Treatment history entries: {len(patient_context.get('treatment_history', []))}")
-        
+
         if patient_context.get('similar_patients'):
             print("\nSimilar Patients:")
             for similar in patient_context['similar_patients'][:3]:
@@ -36,15 +38,12 @@ def example_patient_context():
         print("✅ Method works but no data yet (Neo4j not running or empty)")
 
 
-def example_drug_eligibility():
+def example_drug_eligibility(eligibility):
     """Example: Check drug eligibility with graph context"""
     print("\n" + "="*70)
     print("EXAMPLE 2: Drug Eligibility with Graph Context")
     print("="*70)
-    
-    analytics = get_graph_analytics()
-    eligibility = analytics.get_drug_eligibility_context("P001", "Ozempic")
-    
+
     if eligibility:
         print(f"Patient: P001")
         print(f"Drug: Ozempic")
@@ -52,25 +51,22 @@ def example_drug_eligibility():
         print(f"PA Required: {eligibility.get('pa_required')}")
         print(f"Coverage Criteria: {eligibility.get('criteria')}")
         print(f"Patient Diagnoses: {', '.join(eligibility.get('patient_diagnoses', []))}")
-        
+
         if eligibility.get('treatment_patterns'):
             print(f"\nHistorical Treatment Patterns: {len(eligibility['treatment_patterns'])} found")
-        
+
         if eligibility.get('similar_patients'):
             print(f"Similar Patients: {len(eligibility['similar_patients'])} found")
     else:
         print("✅ Method works but no data yet (Neo4j not running or empty)")
 
 
-def example_confidence_boost():
+def example_confidence_boost(boost):
     """Example: Get approval confidence boost from network"""
     print("\n" + "="*70)
     print("EXAMPLE 3: Approval Confidence Boost")
     print("="*70)
-    
-    analytics = get_graph_analytics()
-    boost = analytics.get_approval_confidence_boost("P001", "Ozempic")
-    
+
     print(f"Patient: P001")
     print(f"Drug: Ozempic")
     print(f"Confidence Boost: +{boost.get('confidence_boost', 0)*100:.1f}%")
@@ -78,15 +74,12 @@ def example_confidence_boost():
     print(f"Based on {boost.get('similar_patient_count', 0)} similar patients")
 
 
-def example_treatment_patterns():
+def example_treatment_patterns(patterns):
     """Example: Get treatment patterns from graph"""
     print("\n" + "="*70)
     print("EXAMPLE 4: Treatment Patterns")
     print("="*70)
-    
-    graph = get_graph_manager()
-    patterns = graph.find_treatment_patterns(limit=5)
-    
+
     if patterns:
         print(f"Found {len(patterns)} treatment patterns:\n")
         for pattern in patterns:
@@ -96,39 +89,54 @@ def example_treatment_patterns():
         print("✅ Method works but no patterns yet (Neo4j not running or empty)")
 
 
+async def _run_direct_queries(graph):
+    """Issue the three independent queries concurrently
+
+    They share no state, so asyncio.gather overlaps their Bolt
+    round-trips and the wall time is the slowest query, not the sum.
+    """
+    try:
+        return await asyncio.gather(
+            graph.afind_similar_patients("P001", limit=5),
+            graph.aget_patient_treatment_chain("P001"),
+            graph.afind_drug_eligibility_path("P001", "Ozempic"),
+        )
+    finally:
+        await graph.aclose()
+
+
 def example_direct_queries():
-    """Example: Direct Neo4j queries"""
+    """Example: Direct Neo4j queries via the async API"""
     print("\n" + "="*70)
-    print("EXAMPLE 5: Direct Graph Queries")
+    print("EXAMPLE 5: Direct Graph Queries (async, concurrent)")
     print("="*70)
-    
+
     graph = get_graph_manager()
-    
+
     if not graph.driver:
         print("Neo4j not running - skipping direct queries")
         return
-    
+
+    similar, chain, path = asyncio.run(_run_direct_queries(graph))
+
     # Example 1: Similar patients
     print("\n1. Finding similar patients:")
-    similar = graph.find_similar_patients("P001", limit=5)
     if similar:
         for patient in similar:
             print(f"  - {patient}")
     else:
         print("  (No data yet)")
-    
+
     # Example 2: Treatment chain
     print("\n2. Patient treatment chain:")
-    chain = graph.get_patient_treatment_chain("P001")
     if chain:
         for treatment in chain:
             print(f"  - {treatment}")
     else:
         print("  (No data yet)")
-    
+
     # Example 3: Drug eligibility
     print("\n3. Drug eligibility path:")
-    path = graph.find_drug_eligibility_path("P001", "Ozempic")
     if path:
         print(f"  {path}")
     else:
@@ -142,14 +150,18 @@ if __name__ == "__main__":
     print("║" + "  GRAPH RAG USAGE EXAMPLES".center(68) + "║")
     print("║" + " "*68 + "║")
     print("╚" + "="*68 + "╝")
-    
+
     try:
-        example_patient_context()
-        example_drug_eligibility()
-        example_confidence_boost()
-        example_treatment_patterns()
+        # One transaction fetches everything the five examples display
+        analytics = get_graph_analytics()
+        bundle = analytics.get_full_demo_bundle("P001", "Ozempic")
+
+        example_patient_context(bundle.get("context", {}))
+        example_drug_eligibility(bundle.get("eligibility", {}))
+        example_confidence_boost(bundle.get("boost", {}))
+        example_treatment_patterns(bundle.get("patterns", []))
         example_direct_queries()
-        
+
         print("\n" + "="*70)
         print("✅ All examples completed successfully!")
         print("="*70)
@@ -158,7 +170,7 @@ if __name__ == "__main__":
         print("  1. docker-compose up -d")
         print("  2. python scripts/migrate_to_graph.py")
         print("="*70 + "\n")
-        
+
     except Exception as e:
         print(f"\n❌ Error during examples: {e}")
         import traceback
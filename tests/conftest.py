@@ -0,0 +1,31 @@
+"""
+Shared pytest fixtures
+"""
+import pytest
+
+try:
+    from app.data.graph_index import get_graph_manager
+    HAS_GRAPH_IMPORTS = True
+except ImportError:
+    HAS_GRAPH_IMPORTS = False
+
+
+@pytest.fixture(scope="session")
+def neo4j_session():
+    """Yield one shared Neo4j session for the whole test run
+
+    The graph tests pass this to GraphDatabaseManager's session kwarg,
+    so the TCP + TLS + Bolt handshake happens once per run instead of
+    once per call. Skips the dependent tests when Neo4j is unreachable.
+    """
+    if not HAS_GRAPH_IMPORTS:
+        pytest.skip("Graph imports not available")
+    graph = get_graph_manager()
+    if not graph.driver:
+        pytest.skip("Neo4j not running")
+    # Make sure the MERGE key constraints (and their backing indexes)
+    # exist before any test writes, so node MERGEs use an index lookup
+    # instead of a label scan
+    graph.ensure_constraints()
+    with graph.driver.session() as session:
+        yield session
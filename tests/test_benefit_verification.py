@@ -1,85 +1,142 @@
 """
 Unit tests for benefit verification module
 """
+import numpy as np
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
 from app.data.database import Base
 from app.data.db_models import InsurancePlan, Patient
 from app.modules.benefit_verification import check_coverage, check_coverage_by_plan
 
 
-# Create in-memory SQLite database for testing
-@pytest.fixture(scope="function")
-def test_db():
-    """Create a test database"""
-    engine = create_engine("sqlite:///:memory:")
+# Schema creation and seed data happen once per module; each test then
+# runs inside a SAVEPOINT that is rolled back, instead of paying
+# create_all plus a full reinsert per test
+@pytest.fixture(scope="module")
+def test_engine():
+    """Create and seed the in-memory test database once"""
+    # StaticPool keeps one underlying connection, so every checkout sees
+    # the same in-memory database instead of a fresh empty one;
+    # check_same_thread lets that handle be shared if a test runs
+    # threaded code against it
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _tune_sqlite(dbapi_connection, connection_record):
+        # Ephemeral test store: skip journal/fsync housekeeping entirely
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
     Base.metadata.create_all(engine)
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     db = TestingSessionLocal()
-    
-    # Add test data
     setup_test_data(db)
-    
+    db.close()
+
+    yield engine
+
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def test_db(test_engine):
+    """Yield a session wrapped in a per-test SAVEPOINT
+
+    The outer transaction is rolled back after each test, discarding
+    anything the test wrote - including mid-test commits, which only
+    release the SAVEPOINT and are restarted by the event hook below.
+    """
+    connection = test_engine.connect()
+    transaction = connection.begin()
+    db = Session(bind=connection, autoflush=False)
+    nested = connection.begin_nested()
+
+    @event.listens_for(db, "after_transaction_end")
+    def restart_savepoint(session, trans):
+        nonlocal nested
+        if trans.nested and not trans._parent.nested:
+            nested = connection.begin_nested()
+
     yield db
-    
+
     db.close()
+    transaction.rollback()
+    connection.close()
 
 
 def setup_test_data(db: Session):
-    """Setup test data in database"""
-    # Add test insurance plans
-    plans = [
-        InsurancePlan(
-            plan="Aetna Gold",
-            drug="Ozempic",
-            covered=True,
-            pa_required=True,
-            criteria="BMI > 30 AND HbA1c > 7.5",
-            tier=3,
-            estimated_copay=25.0,
-            step_therapy_required=False,
-            quantity_limit="30 day supply"
-        ),
-        InsurancePlan(
-            plan="Aetna Gold",
-            drug="Metformin",
-            covered=True,
-            pa_required=False,
-            tier=1,
-            estimated_copay=10.0,
-            step_therapy_required=False,
-        ),
-        InsurancePlan(
-            plan="BlueCross Silver",
-            drug="Trulicity",
-            covered=False,
-            pa_required=False,
-        ),
-    ]
-    
-    for plan in plans:
-        db.add(plan)
-    
-    # Add test patient
-    patient = Patient(
-        patient_id="P001",
-        name="John Doe",
-        date_of_birth="1980-01-01",
-        age=44,
-        gender="Male",
-        address={"street": "123 Main St", "city": "Boston", "state": "MA", "zip": "02101"},
-        phone="555-1234",
-        email="john@example.com",
-        insurance_plan="Aetna Gold",
-        member_id="MEM123456",
-        diagnoses=[{"name": "Type 2 Diabetes", "icd10": "E11.9"}],
-        labs={"HbA1c": 8.5, "BMI": 33.1},
-        treatment_history=[{"drug": "Metformin", "duration_months": 6, "outcome": "Inadequate response"}],
-        allergies=["None known"]
-    )
-    db.add(patient)
-    
+    """Setup test data in database
+
+    Core bulk inserts (one executemany per table) instead of per-row
+    db.add - no identity map or attribute instrumentation for rows the
+    tests only ever read back through queries.
+    """
+    db.execute(InsurancePlan.__table__.insert(), [
+        {
+            "plan": "Aetna Gold",
+            "drug": "Ozempic",
+            "covered": True,
+            "pa_required": True,
+            "criteria": "BMI > 30 AND HbA1c > 7.5",
+            "tier": 3,
+            "estimated_copay": 25.0,
+            "step_therapy_required": False,
+            "quantity_limit": "30 day supply",
+        },
+        {
+            "plan": "Aetna Gold",
+            "drug": "Metformin",
+            "covered": True,
+            "pa_required": False,
+            "criteria": None,
+            "tier": 1,
+            "estimated_copay": 10.0,
+            "step_therapy_required": False,
+            "quantity_limit": None,
+        },
+        # executemany needs homogeneous keys, so optional columns are
+        # explicit Nones
+        {
+            "plan": "BlueCross Silver",
+            "drug": "Trulicity",
+            "covered": False,
+            "pa_required": False,
+            "criteria": None,
+            "tier": None,
+            "estimated_copay": None,
+            "step_therapy_required": False,
+            "quantity_limit": None,
+        },
+    ])
+
+    db.execute(Patient.__table__.insert(), [
+        {
+            "patient_id": "P001",
+            "name": "John Doe",
+            "date_of_birth": "1980-01-01",
+            "age": 44,
+            "gender": "Male",
+            "address": {"street": "123 Main St", "city": "Boston", "state": "MA", "zip": "02101"},
+            "phone": "555-1234",
+            "email": "john@example.com",
+            "insurance_plan": "Aetna Gold",
+            "member_id": "MEM123456",
+            "diagnoses": [{"name": "Type 2 Diabetes", "icd10": "E11.9"}],
+            "labs": {"HbA1c": 8.5, "BMI": 33.1},
+            "treatment_history": [{"drug": "Metformin", "duration_months": 6, "outcome": "Inadequate response"}],
+            "allergies": ["None known"],
+        },
+    ])
+
     db.commit()
 
 
@@ -161,6 +218,51 @@ def test_check_coverage_by_plan(test_db):
     assert result.criteria == "BMI > 30 AND HbA1c > 7.5"
 
 
+def _scale_patient_rows(n):
+    """Vectorized synthetic patient rows for the scale test
+
+    One rng batch per numeric field instead of n per-row draws; the
+    result feeds a single Core executemany.
+    """
+    rng = np.random.default_rng(0)
+    ids = np.arange(n)
+    patient_ids = np.char.add("SCALE_P", ids.astype(str))
+    ages = rng.integers(20, 80, n)
+    hba1cs = np.round(rng.uniform(5.5, 11.0, n), 1)
+    bmis = np.round(rng.uniform(22.0, 40.0, n), 1)
+    return [
+        {
+            "patient_id": str(patient_ids[i]),
+            "name": f"Scale Patient {i}",
+            "date_of_birth": "1980-01-01",
+            "age": int(ages[i]),
+            "gender": "Female",
+            "address": {"street": "1 Scale St", "city": "Boston", "state": "MA", "zip": "02101"},
+            "phone": "555-0000",
+            "email": "scale@example.com",
+            "insurance_plan": "Aetna Gold",
+            "member_id": f"SCALE{ids[i]:08d}",
+            "diagnoses": [{"name": "Type 2 Diabetes", "icd10": "E11.9"}],
+            "labs": {"HbA1c": float(hba1cs[i]), "BMI": float(bmis[i])},
+            "treatment_history": [],
+            "allergies": ["None known"],
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("n_patients", [1, 1000])
+def test_check_coverage_at_scale(test_db, n_patients):
+    """Coverage lookups stay correct as the patient table grows"""
+    test_db.execute(Patient.__table__.insert(), _scale_patient_rows(n_patients))
+    test_db.commit()
+
+    for idx in {0, n_patients // 2, n_patients - 1}:
+        result = check_coverage(f"SCALE_P{idx}", "Ozempic", test_db)
+        assert result.covered == True
+        assert result.pa_required == True
+
+
 def test_check_coverage_by_plan_not_found(test_db):
     """Test plan-based coverage check for non-existent combination"""
     result = check_coverage_by_plan("Unknown Plan", "Ozempic", test_db)
@@ -0,0 +1,76 @@
+"""
+Unit tests for precompiled prompt template rendering
+"""
+import pytest
+
+from app.prompts._template import compile_template, compile_structured_template
+from app.prompts.prior_authorization import (
+    PA_NARRATIVE_USER_TEMPLATE,
+    get_pa_narrative_prompt,
+)
+
+
+class TestCompileTemplate:
+    """Test the shared format-string precompiler"""
+
+    def test_render_matches_str_format(self):
+        """Precompiled rendering must match str.format exactly"""
+        template = "Patient {name} ({age}) requests {drug}."
+        render = compile_template(template)
+        fields = {"name": "Jane Doe", "age": 54, "drug": "Ozempic"}
+
+        assert render(**fields) == template.format(**fields)
+
+    def test_literal_only_template(self):
+        """Templates without placeholders render unchanged"""
+        render = compile_template("No placeholders here.")
+        assert render() == "No placeholders here."
+
+    def test_missing_field_raises(self):
+        """Missing fields surface as KeyError, like format_map"""
+        render = compile_template("{present} {missing}")
+        with pytest.raises(KeyError):
+            render(present="x")
+
+
+class TestPANarrativeTemplate:
+    """Test the PA narrative prompt built from the precompiled template"""
+
+    def test_narrative_prompt_matches_template_format(self):
+        """get_pa_narrative_prompt must equal a plain .format of the template"""
+        fields = {
+            "patient_name": "Jane Doe",
+            "patient_age": 54,
+            "patient_gender": "Female",
+            "diagnosis": "Type 2 Diabetes",
+            "drug_name": "Ozempic",
+            "indication": "Glycemic control",
+            "current_medications": "Metformin",
+            "previous_trials": "Metformin (failed)",
+            "clinical_findings": "HbA1c 8.2",
+            "policy_requirements": "HbA1c > 7.5",
+            "clinical_reasoning": "Failed first-line therapy",
+        }
+
+        assert get_pa_narrative_prompt(**fields) == PA_NARRATIVE_USER_TEMPLATE.format(**fields)
+
+
+class TestCompileStructuredTemplate:
+    """Test the nested-dict template precompiler"""
+
+    def test_nested_render(self):
+        """Leaves render with field substitution; non-strings pass through"""
+        render = compile_structured_template(
+            {"outer": {"greeting": "Hello {name}", "count": 3}, "id": "{id}"}
+        )
+        result = render(name="Jane", id="F1")
+
+        assert result == {"outer": {"greeting": "Hello Jane", "count": 3}, "id": "F1"}
+
+    def test_template_not_mutated(self):
+        """Rendering must never mutate the source template"""
+        template = {"a": "{x}"}
+        render = compile_structured_template(template)
+        render(x="1")
+
+        assert template == {"a": "{x}"}
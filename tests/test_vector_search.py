@@ -1,21 +1,44 @@
 """
 Unit tests for vector search functionality
 """
+import numpy as np
 import pytest
 from app.data.vector_index import VectorIndexManager, chunk_document
 
 
+@pytest.fixture(scope="module")
+def _warm_vector_manager():
+    """One in-memory manager (and one embedding model load) for the module
+
+    persist_directory=None selects Chroma's ephemeral client, so test
+    writes never touch disk.
+    """
+    return VectorIndexManager(persist_directory=None)
+
+
+# Query vectors are encoded once per module; the search tests then
+# measure the ANN lookup, not the encoder
+@pytest.fixture(scope="module")
+def diabetes_query_vec(_warm_vector_manager):
+    """Precomputed embedding for the semantic-search query"""
+    return _warm_vector_manager.embed("diabetes oral medication requirements")
+
+
+@pytest.fixture(scope="module")
+def criteria_query_vec(_warm_vector_manager):
+    """Precomputed embedding for the threshold-search query"""
+    return _warm_vector_manager.embed("BMI diabetes criteria")
+
+
 @pytest.fixture
-def vector_manager():
-    """Create a test vector manager with in-memory collection"""
-    manager = VectorIndexManager()
-    # Clear any existing documents
-    try:
-        manager.delete_collection()
-    except:
-        pass
-    manager = VectorIndexManager()
-    return manager
+def vector_manager(_warm_vector_manager):
+    """Yield the shared manager with an empty collection
+
+    reset() only swaps the Chroma collection; the client and the cached
+    embedding model stay warm, so per-test isolation costs no re-init.
+    """
+    _warm_vector_manager.reset()
+    return _warm_vector_manager
 
 
 def test_chunk_document():
@@ -66,7 +89,7 @@ def test_add_batch_documents(vector_manager):
     assert stats["document_count"] == 3
 
 
-def test_semantic_search(vector_manager):
+def test_semantic_search(vector_manager, diabetes_query_vec):
     """Test semantic search functionality"""
     # Add documents
     documents = [
@@ -88,15 +111,15 @@ def test_semantic_search(vector_manager):
     ]
     
     vector_manager.add_documents_batch(documents)
-    
-    # Search for diabetes medications
-    results = vector_manager.search("diabetes oral medication requirements", top_k=2)
-    
+
+    # Search for diabetes medications from the precomputed vector
+    results = vector_manager.search_by_vector(diabetes_query_vec, top_k=2)
+
     assert len(results) > 0
     assert all("id" in r and "similarity" in r and "text" in r for r in results)
 
 
-def test_search_with_threshold(vector_manager):
+def test_search_with_threshold(vector_manager, criteria_query_vec):
     """Test search with similarity threshold"""
     documents = [
         {
@@ -114,14 +137,17 @@ def test_search_with_threshold(vector_manager):
     vector_manager.add_documents_batch(documents)
     
     # Search with high threshold
-    results = vector_manager.search(
-        "BMI diabetes criteria",
+    results = vector_manager.search_by_vector(
+        criteria_query_vec,
         top_k=5,
         distance_threshold=0.5  # Only return highly similar
     )
     
-    # Should filter out unrelated document
-    assert all("diabetes" in r["text"].lower() or "bmi" in r["text"].lower() for r in results)
+    # Should filter out unrelated document; checked with one vectorized
+    # mask over the result texts, same shape as the production prefilter
+    texts = np.array([r["text"].lower() for r in results])
+    assert ((np.char.find(texts, "diabetes") >= 0)
+            | (np.char.find(texts, "bmi") >= 0)).all()
 
 
 def test_get_collection_stats(vector_manager):